@@ -2,8 +2,10 @@
 SQLite database management for hash storage and duplicate tracking.
 """
 import sqlite3
+import sys
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Optional, Tuple, Dict
+from typing import List, Optional, Tuple, Dict, Set, Iterator
 from datetime import datetime
 import logging
 
@@ -11,10 +13,140 @@ from .models import FileEntry, ArchiveInfo
 
 logger = logging.getLogger(__name__)
 
+# Connection-level tuning applied on every connect(). WAL mode creates
+# "<db>-wal" and "<db>-shm" sidecar files next to the database file.
+PRAGMAS = (
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),
+    ("temp_store", "MEMORY"),
+    ("cache_size", -65536),  # negative = KiB, i.e. 64 MiB
+    ("busy_timeout", 60000),
+    # Truncate the WAL back to 64 MiB after checkpoints; a bulk source load
+    # would otherwise leave it at its peak size for every later reader
+    ("journal_size_limit", 67_108_864),
+)
+
+# Only applies to a fresh database (before the first table is created)
+PAGE_SIZE = 4096
+
+# Memory-mapped I/O is unreliable on some platforms, so keep it opt-in by OS
+MMAP_SIZE = 1_073_741_824 if sys.platform.startswith(("linux", "darwin")) else 0
+
+# Schema bootstrap, run as a single script inside one transaction
+SCHEMA_SQL = """
+BEGIN;
+
+-- Archives table - track source archives and their state
+CREATE TABLE IF NOT EXISTS archives (
+    path TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    last_scanned REAL,
+    file_count INTEGER DEFAULT 0
+);
+
+-- Files table - store file hashes from archives
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    full_hash TEXT,
+    quick_hash TEXT,
+    filename TEXT NOT NULL,
+    path_in_archive TEXT NOT NULL,
+    source_archive TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    is_nested_archive BOOLEAN DEFAULT 0,
+    UNIQUE(source_archive, path_in_archive)
+);
+
+-- Full-hash lookups project every column, so an index covering them would
+-- duplicate the whole table; databases that built one drop it again
+DROP INDEX IF EXISTS idx_full_hash_covering;
+CREATE INDEX IF NOT EXISTS idx_full_hash
+ON files(full_hash) WHERE full_hash IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_quick_hash
+ON files(quick_hash) WHERE quick_hash IS NOT NULL;
+
+-- Two-stage dedup probe: (size, quick_hash) before any full hashing
+CREATE INDEX IF NOT EXISTS idx_files_quick
+ON files(size, quick_hash) WHERE quick_hash IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_source_archive
+ON files(source_archive);
+
+-- Target files table - track target files and their hashes
+CREATE TABLE IF NOT EXISTS target_files (
+    path TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    full_hash TEXT,
+    quick_hash TEXT
+);
+
+-- Selection state table - track user's deletion choices
+CREATE TABLE IF NOT EXISTS selection_state (
+    file_hash TEXT NOT NULL,
+    target_path TEXT NOT NULL,
+    selected BOOLEAN NOT NULL,
+    PRIMARY KEY (file_hash, target_path)
+);
+
+-- Key/value settings describing the stored data (e.g. the hash scheme)
+CREATE TABLE IF NOT EXISTS metadata (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+
+COMMIT;
+"""
+
 
 class DatabaseManager:
     """Manages SQLite database for hash storage and duplicate tracking."""
     
+    # Hot-path SQL kept as shared constants so sqlite3's statement cache
+    # always sees the identical string and skips re-preparing it
+    INSERT_FILE_SQL = """
+        INSERT OR REPLACE INTO files 
+        (full_hash, quick_hash, filename, path_in_archive, source_archive, size, is_nested_archive)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """
+    UPSERT_TARGET_FILE_SQL = """
+        INSERT OR REPLACE INTO target_files (path, mtime, size, full_hash, quick_hash)
+        VALUES (?, ?, ?, ?, ?)
+    """
+    SELECT_FILES_BY_FULL_HASH_SQL = """
+        SELECT full_hash, quick_hash, filename, path_in_archive, 
+               source_archive, size, is_nested_archive
+        FROM files WHERE full_hash = ?
+    """
+    SELECT_FILES_BY_QUICK_HASH_SQL = """
+        SELECT full_hash, quick_hash, filename, path_in_archive, 
+               source_archive, size, is_nested_archive
+        FROM files WHERE quick_hash = ?
+    """
+    SELECT_FILES_BY_SIZE_AND_QUICK_HASH_SQL = """
+        SELECT full_hash, quick_hash, filename, path_in_archive, 
+               source_archive, size, is_nested_archive
+        FROM files WHERE size = ? AND quick_hash = ?
+    """
+    SELECT_FILES_BY_ARCHIVE_SQL = """
+        SELECT full_hash, quick_hash, filename, path_in_archive, 
+               source_archive, size, is_nested_archive
+        FROM files WHERE source_archive = ?
+        ORDER BY path_in_archive
+    """
+    
+    # Size of the per-connection prepared statement cache
+    CACHED_STATEMENTS = 256
+    
+    # Rows pulled per fetchmany() call when building FileEntry lists
+    FETCH_BATCH_SIZE = 1024
+    
+    # Bound parameters per IN (...) query; stays under SQLite's historical
+    # SQLITE_MAX_VARIABLE_NUMBER of 999
+    MAX_SQL_PARAMS = 900
+    
     def __init__(self, db_path: str):
         """
         Initialize database manager.
@@ -24,12 +156,14 @@ class DatabaseManager:
         """
         self.db_path = db_path
         self.conn: Optional[sqlite3.Connection] = None
+        self._in_txn = False
     
     def connect(self):
         """Connect to database and create tables if needed."""
         try:
-            self.conn = sqlite3.connect(self.db_path)
+            self.conn = sqlite3.connect(self.db_path, cached_statements=self.CACHED_STATEMENTS)
             self.conn.row_factory = sqlite3.Row  # Access columns by name
+            self._apply_pragmas()
             self._create_tables()
             logger.info(f"Connected to database: {self.db_path}")
         except Exception as e:
@@ -39,77 +173,64 @@ class DatabaseManager:
     def close(self):
         """Close database connection."""
         if self.conn:
+            self.optimize()
             self.conn.close()
             self.conn = None
     
-    def _create_tables(self):
-        """Create database tables if they don't exist."""
-        cursor = self.conn.cursor()
-        
-        # Archives table - track source archives and their state
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS archives (
-                path TEXT PRIMARY KEY,
-                mtime REAL NOT NULL,
-                size INTEGER NOT NULL,
-                last_scanned REAL,
-                file_count INTEGER DEFAULT 0
-            )
-        """)
-        
-        # Files table - store file hashes from archives
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS files (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                full_hash TEXT,
-                quick_hash TEXT,
-                filename TEXT NOT NULL,
-                path_in_archive TEXT NOT NULL,
-                source_archive TEXT NOT NULL,
-                size INTEGER NOT NULL,
-                is_nested_archive BOOLEAN DEFAULT 0,
-                UNIQUE(source_archive, path_in_archive)
-            )
-        """)
-        
-        # Create indexes for fast lookups
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_full_hash 
-            ON files(full_hash) WHERE full_hash IS NOT NULL
-        """)
-        
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_quick_hash 
-            ON files(quick_hash) WHERE quick_hash IS NOT NULL
-        """)
+    @contextmanager
+    def transaction(self):
+        """
+        Group several writes into one transaction with a single commit.
         
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_source_archive 
-            ON files(source_archive)
-        """)
+        Write methods called inside the block skip their own commit; the
+        whole block is rolled back if it raises. Nested calls join the
+        outermost transaction.
+        """
+        if self._in_txn:
+            yield self
+            return
         
-        # Target files table - track target files and their hashes
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS target_files (
-                path TEXT PRIMARY KEY,
-                mtime REAL NOT NULL,
-                size INTEGER NOT NULL,
-                full_hash TEXT,
-                quick_hash TEXT
-            )
-        """)
+        if self.conn.in_transaction:
+            self.conn.commit()
+        self.conn.execute("BEGIN IMMEDIATE")
+        self._in_txn = True
+        try:
+            yield self
+            self.conn.commit()
+        except BaseException:
+            self.conn.rollback()
+            raise
+        finally:
+            self._in_txn = False
+    
+    def _commit(self):
+        """Commit unless an explicit transaction() block is open."""
+        if not self._in_txn:
+            self.conn.commit()
+    
+    def optimize(self):
+        """Refresh planner statistics so the indexes get picked after bulk loads."""
+        try:
+            self.conn.execute("PRAGMA optimize")
+        except sqlite3.Error as e:
+            logger.debug(f"PRAGMA optimize failed: {e}")
+    
+    def _apply_pragmas(self):
+        """Apply performance PRAGMAs to the current connection."""
+        if self.conn.execute("PRAGMA page_count").fetchone()[0] == 0:
+            self.conn.execute(f"PRAGMA page_size={PAGE_SIZE}")
         
-        # Selection state table - track user's deletion choices
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS selection_state (
-                file_hash TEXT NOT NULL,
-                target_path TEXT NOT NULL,
-                selected BOOLEAN NOT NULL,
-                PRIMARY KEY (file_hash, target_path)
-            )
-        """)
+        for name, value in PRAGMAS:
+            self.conn.execute(f"PRAGMA {name}={value}")
         
-        self.conn.commit()
+        if MMAP_SIZE:
+            self.conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+    
+    def _create_tables(self):
+        """Create database tables if they don't exist."""
+        # One script, one transaction: a single parse and a single commit
+        # instead of a round-trip per CREATE statement
+        self.conn.executescript(SCHEMA_SQL)
     
     def clear_database(self):
         """Clear all data from database (keep structure)."""
@@ -118,9 +239,44 @@ class DatabaseManager:
         cursor.execute("DELETE FROM files")
         cursor.execute("DELETE FROM target_files")
         cursor.execute("DELETE FROM selection_state")
-        self.conn.commit()
+        self._commit()
         logger.info("Database cleared")
     
+    def get_metadata(self, key: str) -> Optional[str]:
+        """Get a stored metadata value, or None if unset."""
+        row = self.conn.execute("SELECT value FROM metadata WHERE key = ?", (key,)).fetchone()
+        return row['value'] if row else None
+    
+    def set_metadata(self, key: str, value: str):
+        """Insert or replace a metadata value."""
+        self.conn.execute("INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)", (key, value))
+        self._commit()
+    
+    def ensure_hash_scheme(self, scheme: str) -> bool:
+        """
+        Make sure stored hashes were produced under the given hash scheme.
+        
+        A database without a recorded scheme adopts the given one. If a
+        different scheme is recorded, all hash-derived rows are cleared so
+        the next scan rebuilds them.
+        
+        Args:
+            scheme: Current scheme string (see core.hasher.hash_scheme)
+        
+        Returns:
+            True if stored data was cleared, False otherwise
+        """
+        stored = self.get_metadata("hash_scheme")
+        if stored == scheme:
+            return False
+        
+        with self.transaction():
+            if stored is not None:
+                logger.info(f"Hash scheme changed ({stored} -> {scheme}), clearing stored hashes")
+                self.clear_database()
+            self.set_metadata("hash_scheme", scheme)
+        return stored is not None
+    
     def get_archive_info(self, archive_path: str) -> Optional[ArchiveInfo]:
         """
         Get information about a previously scanned archive.
@@ -148,6 +304,36 @@ class DatabaseManager:
             )
         return None
     
+    def get_archive_infos(self, archive_paths: List[str]) -> Dict[str, ArchiveInfo]:
+        """
+        Get information about many previously scanned archives at once.
+        
+        Args:
+            archive_paths: Paths to archive files
+        
+        Returns:
+            Dictionary mapping each known archive path to its ArchiveInfo;
+            archives never scanned are absent
+        """
+        infos = {}
+        cursor = self.conn.cursor()
+        for start in range(0, len(archive_paths), self.MAX_SQL_PARAMS):
+            chunk = archive_paths[start:start + self.MAX_SQL_PARAMS]
+            placeholders = ",".join("?" * len(chunk))
+            cursor.execute(f"""
+                SELECT path, mtime, size, last_scanned, file_count
+                FROM archives WHERE path IN ({placeholders})
+            """, chunk)
+            for row in cursor:
+                infos[row['path']] = ArchiveInfo(
+                    path=row['path'],
+                    mtime=row['mtime'],
+                    size=row['size'],
+                    last_scanned=row['last_scanned'],
+                    file_count=row['file_count']
+                )
+        return infos
+    
     def update_archive(self, archive_path: str, mtime: float, size: int, file_count: int):
         """Update or insert archive information."""
         cursor = self.conn.cursor()
@@ -155,7 +341,7 @@ class DatabaseManager:
             INSERT OR REPLACE INTO archives (path, mtime, size, last_scanned, file_count)
             VALUES (?, ?, ?, ?, ?)
         """, (archive_path, mtime, size, datetime.now().timestamp(), file_count))
-        self.conn.commit()
+        self._commit()
 
     def get_target_file_info(self, path: str) -> Optional[Tuple[float, int, Optional[str], Optional[str]]]:
         """
@@ -174,15 +360,46 @@ class DatabaseManager:
             return (row['mtime'], row['size'], row['full_hash'], row['quick_hash'])
         return None
 
+    def get_target_files_info(self, paths: List[str]) -> Dict[str, Tuple[float, int, Optional[str], Optional[str]]]:
+        """
+        Get stored hash info for many target files at once.
+        
+        Args:
+            paths: Target file paths to look up
+        
+        Returns:
+            Dictionary mapping each known path to (mtime, size, full_hash, quick_hash);
+            paths without a stored row are absent
+        """
+        info = {}
+        cursor = self.conn.cursor()
+        for start in range(0, len(paths), self.MAX_SQL_PARAMS):
+            chunk = paths[start:start + self.MAX_SQL_PARAMS]
+            placeholders = ",".join("?" * len(chunk))
+            cursor.execute(f"""
+                SELECT path, mtime, size, full_hash, quick_hash
+                FROM target_files WHERE path IN ({placeholders})
+            """, chunk)
+            for row in cursor:
+                info[row['path']] = (row['mtime'], row['size'], row['full_hash'], row['quick_hash'])
+        return info
+    
     def update_target_file(self, path: str, mtime: float, size: int, 
                            full_hash: Optional[str], quick_hash: Optional[str]):
         """Update or insert target file hash information."""
         cursor = self.conn.cursor()
-        cursor.execute("""
-            INSERT OR REPLACE INTO target_files (path, mtime, size, full_hash, quick_hash)
-            VALUES (?, ?, ?, ?, ?)
-        """, (path, mtime, size, full_hash, quick_hash))
-        self.conn.commit()
+        cursor.execute(self.UPSERT_TARGET_FILE_SQL, (path, mtime, size, full_hash, quick_hash))
+        self._commit()
+    
+    def update_target_files_batch(self, rows: List[Tuple[str, float, int, Optional[str], Optional[str]]]):
+        """
+        Update or insert hash information for many target files at once.
+        
+        Args:
+            rows: (path, mtime, size, full_hash, quick_hash) tuples
+        """
+        self.conn.executemany(self.UPSERT_TARGET_FILE_SQL, rows)
+        self._commit()
     
     def add_file(self, file_entry: FileEntry):
         """
@@ -192,11 +409,7 @@ class DatabaseManager:
             file_entry: FileEntry to store
         """
         cursor = self.conn.cursor()
-        cursor.execute("""
-            INSERT OR REPLACE INTO files 
-            (full_hash, quick_hash, filename, path_in_archive, source_archive, size, is_nested_archive)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (
+        cursor.execute(self.INSERT_FILE_SQL, (
             file_entry.full_hash,
             file_entry.quick_hash,
             file_entry.filename,
@@ -205,7 +418,7 @@ class DatabaseManager:
             file_entry.size,
             file_entry.is_nested_archive
         ))
-        self.conn.commit()
+        self._commit()
     
     def add_files_batch(self, file_entries: List[FileEntry]):
         """Add multiple files in a batch (more efficient)."""
@@ -222,34 +435,120 @@ class DatabaseManager:
             )
             for fe in file_entries
         ]
-        cursor.executemany("""
-            INSERT OR REPLACE INTO files 
-            (full_hash, quick_hash, filename, path_in_archive, source_archive, size, is_nested_archive)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, data)
-        self.conn.commit()
+        cursor.executemany(self.INSERT_FILE_SQL, data)
+        self._commit()
     
     def find_by_full_hash(self, full_hash: str) -> List[FileEntry]:
         """Find all files with matching full hash."""
         cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT full_hash, quick_hash, filename, path_in_archive, 
-                   source_archive, size, is_nested_archive
-            FROM files WHERE full_hash = ?
-        """, (full_hash,))
+        cursor.execute(self.SELECT_FILES_BY_FULL_HASH_SQL, (full_hash,))
         
-        return [self._row_to_file_entry(row) for row in cursor.fetchall()]
+        return self._fetch_file_entries(cursor)
+    
+    def find_by_full_hashes(self, full_hashes: List[str]) -> Dict[str, List[FileEntry]]:
+        """
+        Find source files for many full hashes at once.
+        
+        Args:
+            full_hashes: Full hashes to look up
+        
+        Returns:
+            Dictionary mapping every requested hash to its source files
+            (an empty list when no source file has that hash)
+        """
+        result: Dict[str, List[FileEntry]] = {full_hash: [] for full_hash in full_hashes}
+        cursor = self.conn.cursor()
+        for start in range(0, len(full_hashes), self.MAX_SQL_PARAMS):
+            chunk = full_hashes[start:start + self.MAX_SQL_PARAMS]
+            placeholders = ",".join("?" * len(chunk))
+            cursor.execute(f"""
+                SELECT full_hash, quick_hash, filename, path_in_archive, 
+                       source_archive, size, is_nested_archive
+                FROM files WHERE full_hash IN ({placeholders})
+            """, chunk)
+            for entry in self._fetch_file_entries(cursor):
+                result[entry.full_hash].append(entry)
+        return result
     
     def find_by_quick_hash(self, quick_hash: str) -> List[FileEntry]:
         """Find all files with matching quick hash."""
         cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT full_hash, quick_hash, filename, path_in_archive, 
-                   source_archive, size, is_nested_archive
-            FROM files WHERE quick_hash = ?
-        """, (quick_hash,))
+        cursor.execute(self.SELECT_FILES_BY_QUICK_HASH_SQL, (quick_hash,))
+        
+        return self._fetch_file_entries(cursor)
+    
+    def find_candidates(self, size: int, quick_hash: str) -> List[FileEntry]:
+        """
+        Find source files that could be duplicates of a large target file.
+        
+        Matching on size as well as quick hash lets the caller skip the
+        full hash entirely when no source file has the same length.
+        
+        Args:
+            size: Target file size in bytes
+            quick_hash: Target file quick hash
         
-        return [self._row_to_file_entry(row) for row in cursor.fetchall()]
+        Returns:
+            List of candidate FileEntry objects (empty if none)
+        """
+        cursor = self.conn.cursor()
+        cursor.execute(self.SELECT_FILES_BY_SIZE_AND_QUICK_HASH_SQL, (size, quick_hash))
+        
+        return self._fetch_file_entries(cursor)
+    
+    def get_source_sizes(self) -> Set[int]:
+        """Get the distinct sizes of all source files in the database."""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT DISTINCT size FROM files")
+        return {row[0] for row in cursor.fetchall()}
+    
+    def count_files(self) -> int:
+        """Get the number of source files in the database."""
+        return self.conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+    
+    def iter_hashes(self, column: str) -> Iterator[str]:
+        """
+        Yield every stored source hash of one kind.
+        
+        Args:
+            column: "full_hash" or "quick_hash"
+        
+        Yields:
+            Non-NULL hash values, read in fetchmany batches
+        
+        Raises:
+            ValueError: If column is not a hash column
+        """
+        if column not in ("full_hash", "quick_hash"):
+            raise ValueError(f"Not a hash column: {column}")
+        
+        cursor = self.conn.execute(f"SELECT {column} FROM files WHERE {column} IS NOT NULL")
+        while rows := cursor.fetchmany(self.FETCH_BATCH_SIZE):
+            for row in rows:
+                yield row[0]
+    
+    def iter_sized_hashes(self, column: str) -> Iterator[Tuple[int, str]]:
+        """
+        Yield every distinct (size, hash) pair of one kind among source files.
+        
+        Args:
+            column: "full_hash" or "quick_hash"
+        
+        Yields:
+            (size, hash) for non-NULL hash values, read in fetchmany batches
+        
+        Raises:
+            ValueError: If column is not a hash column
+        """
+        if column not in ("full_hash", "quick_hash"):
+            raise ValueError(f"Not a hash column: {column}")
+        
+        cursor = self.conn.execute(
+            f"SELECT DISTINCT size, {column} FROM files WHERE {column} IS NOT NULL"
+        )
+        while rows := cursor.fetchmany(self.FETCH_BATCH_SIZE):
+            for row in rows:
+                yield row[0], row[1]
     
     def check_quick_hash_exists(self, quick_hash: str) -> bool:
         """Check if a quick hash exists in database."""
@@ -264,7 +563,7 @@ class DatabaseManager:
             UPDATE files SET full_hash = ?
             WHERE source_archive = ? AND path_in_archive = ?
         """, (full_hash, source_archive, path_in_archive))
-        self.conn.commit()
+        self._commit()
     
     def get_all_archives(self) -> List[str]:
         """Get list of all source archives in database."""
@@ -275,14 +574,9 @@ class DatabaseManager:
     def get_files_by_archive(self, archive_path: str) -> List[FileEntry]:
         """Get all files from a specific archive."""
         cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT full_hash, quick_hash, filename, path_in_archive, 
-                   source_archive, size, is_nested_archive
-            FROM files WHERE source_archive = ?
-            ORDER BY path_in_archive
-        """, (archive_path,))
+        cursor.execute(self.SELECT_FILES_BY_ARCHIVE_SQL, (archive_path,))
         
-        return [self._row_to_file_entry(row) for row in cursor.fetchall()]
+        return self._fetch_file_entries(cursor)
     
     def get_selection_state(self, file_hash: str, target_path: str) -> Optional[bool]:
         """Get user's selection state for a duplicate file."""
@@ -295,6 +589,30 @@ class DatabaseManager:
         row = cursor.fetchone()
         return bool(row['selected']) if row else None
     
+    def get_selection_states(self, file_hashes: List[str]) -> Dict[Tuple[str, str], bool]:
+        """
+        Get stored selection states for many file hashes at once.
+        
+        Args:
+            file_hashes: File hashes to look up
+        
+        Returns:
+            Dictionary mapping (file_hash, target_path) to the stored selection;
+            pairs without a stored state are absent
+        """
+        states = {}
+        cursor = self.conn.cursor()
+        for start in range(0, len(file_hashes), self.MAX_SQL_PARAMS):
+            chunk = file_hashes[start:start + self.MAX_SQL_PARAMS]
+            placeholders = ",".join("?" * len(chunk))
+            cursor.execute(f"""
+                SELECT file_hash, target_path, selected FROM selection_state
+                WHERE file_hash IN ({placeholders})
+            """, chunk)
+            for row in cursor:
+                states[(row['file_hash'], row['target_path'])] = bool(row['selected'])
+        return states
+    
     def set_selection_state(self, file_hash: str, target_path: str, selected: bool):
         """Set user's selection state for a duplicate file."""
         cursor = self.conn.cursor()
@@ -302,7 +620,7 @@ class DatabaseManager:
             INSERT OR REPLACE INTO selection_state (file_hash, target_path, selected)
             VALUES (?, ?, ?)
         """, (file_hash, target_path, selected))
-        self.conn.commit()
+        self._commit()
     
     def get_statistics(self) -> Dict[str, int]:
         """Get database statistics."""
@@ -323,17 +641,34 @@ class DatabaseManager:
             'nested_archives': nested_archive_count
         }
     
-    def _row_to_file_entry(self, row) -> FileEntry:
-        """Convert database row to FileEntry object."""
-        return FileEntry(
-            full_hash=row['full_hash'],
-            quick_hash=row['quick_hash'],
-            filename=row['filename'],
-            path_in_archive=row['path_in_archive'],
-            source_archive=row['source_archive'],
-            size=row['size'],
-            is_nested_archive=bool(row['is_nested_archive'])
-        )
+    def _fetch_file_entries(self, cursor: sqlite3.Cursor) -> List[FileEntry]:
+        """
+        Build FileEntry objects from a files query in fetchmany() batches.
+        
+        Args:
+            cursor: Cursor executed with one of the SELECT_FILES_* statements
+        
+        Returns:
+            List of FileEntry objects
+        """
+        cursor.arraysize = self.FETCH_BATCH_SIZE
+        row_to_entry = self._row_to_file_entry
+        entries = []
+        rows = cursor.fetchmany()
+        while rows:
+            entries.extend(map(row_to_entry, rows))
+            rows = cursor.fetchmany()
+        return entries
+    
+    @staticmethod
+    def _row_to_file_entry(row) -> FileEntry:
+        """Convert database row to FileEntry object.
+        
+        Relies on the column order of the SELECT_FILES_* statements.
+        """
+        full_hash, quick_hash, filename, path_in_archive, source_archive, size, is_nested = row
+        return FileEntry(full_hash, quick_hash, filename, path_in_archive,
+                         source_archive, size, bool(is_nested))
     
     def __enter__(self):
         """Context manager entry."""
@@ -6,6 +6,9 @@ import tarfile
 import tempfile
 import shutil
 import os
+import re
+import stat
+from functools import lru_cache
 from pathlib import Path
 from typing import Generator, Tuple, Optional, BinaryIO, List, Any
 import logging
@@ -13,6 +16,38 @@ import io
 
 logger = logging.getLogger(__name__)
 
+# Read size used when streaming archive members to disk
+STREAM_CHUNK_SIZE = 65536
+
+# libarchive entries up to this size are read into memory in one go; larger
+# ones are streamed and must be consumed before the next entry is requested
+LIBARCHIVE_BUFFER_LIMIT = 1024 * 1024  # 1MB
+
+# (offset, magic bytes, format) signatures used to sniff nested archives
+ARCHIVE_SIGNATURES = (
+    (0, b'PK\x03\x04', 'zip'),
+    (0, b'7z\xbc\xaf\x27\x1c', '7z'),
+    (0, b'Rar!\x1a\x07', 'rar'),
+    (0, b'\x1f\x8b', 'gzip'),
+    (0, b'BZh', 'bzip2'),
+    (0, b'\xfd7zXZ\x00', 'xz'),
+    (0, b'hsqs', 'squashfs'),
+    (0, b'!<arch>\n', 'ar'),
+    (257, b'ustar', 'tar'),
+)
+
+# Header bytes needed to test every signature above
+SNIFF_SIZE = max(offset + len(magic) for offset, magic, _ in ARCHIVE_SIGNATURES)
+
+# Extensions whose format carries one of the signatures above. Members with
+# these names are only recursed into when their header actually matches.
+SIGNED_EXTENSIONS = (
+    '.zip', '.jar', '.war', '.ear', '.zipx',
+    '.7z', '.rar',
+    '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz',
+    '.squashfs', '.deb',
+)
+
 # Try importing optional archive libraries
 try:
     import py7zr
@@ -36,6 +71,91 @@ except ImportError:
     logger.warning("libarchive not available - extended format support disabled")
 
 
+def _kernel_copy(src_fd: int, dst_fd: int, offset: int, count: int) -> int:
+    """
+    Copy up to count bytes from src_fd at offset to dst_fd without a
+    user-space buffer. Returns the number of bytes actually copied.
+    """
+    copied = 0
+    for syscall in ('copy_file_range', 'sendfile'):
+        copy = getattr(os, syscall, None)
+        if copy is None:
+            continue
+        
+        try:
+            while copied < count:
+                if syscall == 'copy_file_range':
+                    n = copy(src_fd, dst_fd, count - copied, offset + copied)
+                else:
+                    n = copy(dst_fd, src_fd, offset + copied, count - copied)
+                if n == 0:
+                    break
+                copied += n
+        except OSError as e:
+            # Unsupported on this kernel/filesystem pair - try the next syscall
+            logger.debug(f"{syscall} failed after {copied} bytes, falling back: {e}")
+            continue
+        break
+    
+    return copied
+
+
+def copy_stream(src: BinaryIO, dst: BinaryIO) -> None:
+    """
+    Copy src from its current position to EOF into dst.
+    
+    Regular files are copied in-kernel (copy_file_range, then sendfile);
+    anything else (decompressing archive streams, pipes) and whatever the
+    kernel could not copy goes through shutil.copyfileobj.
+    """
+    try:
+        src_fd = src.fileno()
+        dst_fd = dst.fileno()
+        src_stat = os.fstat(src_fd)
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        src_fd = None
+    
+    if src_fd is not None and stat.S_ISREG(src_stat.st_mode):
+        offset = src.tell()
+        dst.flush()
+        copied = _kernel_copy(src_fd, dst_fd, offset, src_stat.st_size - offset)
+        # Resync both file objects with the descriptors the kernel advanced
+        src.seek(offset + copied)
+        dst.seek(0, os.SEEK_END)
+    
+    shutil.copyfileobj(src, dst, STREAM_CHUNK_SIZE)
+
+
+class _BlockReader(io.RawIOBase):
+    """Raw read-only stream over an iterator of byte blocks (e.g. libarchive's get_blocks())."""
+    
+    def __init__(self, blocks):
+        self._blocks = iter(blocks)
+        self._pending = memoryview(b"")
+    
+    def readable(self) -> bool:
+        return True
+    
+    def release(self):
+        """Detach from the block source; later reads raise instead of touching it."""
+        self._blocks = None
+        self._pending = memoryview(b"")
+    
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            if self._blocks is None:
+                raise ValueError("archive entry is no longer readable")
+            block = next(self._blocks, None)
+            if block is None:
+                return 0
+            self._pending = memoryview(block)
+        
+        n = min(len(buffer), len(self._pending))
+        buffer[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
+
+
 class ExtractionError(Exception):
     """Raised when archive extraction fails."""
     pass
@@ -45,7 +165,7 @@ class ArchiveExtractor:
     """Handles extraction of various archive formats with recursive support."""
 
     # Archive extensions we can handle
-    ARCHIVE_EXTENSIONS = {
+    ARCHIVE_EXTENSIONS = frozenset({
         # Common archives
         '.zip', '.jar', '.war', '.ear', '.zipx',
         '.7z',
@@ -63,7 +183,20 @@ class ArchiveExtractor:
         
         # Other formats
         '.cpio', '.wim', '.lzh', '.lha', '.lz',
-    }
+    })
+    
+    # Handler dispatch tables, built once so extract_archive only does a
+    # single str.endswith(tuple) / membership test per format family
+    _ZIP_SUFFIXES = ('.zip', '.zipx', '.jar', '.war', '.ear')
+    _TAR_SUFFIXES = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz', '.tar.zst', '.tzst')
+    _LIBARCHIVE_SUFFIXES = frozenset({'.deb', '.rpm', '.iso', '.img', '.msi', '.cab', '.cpio', '.wim', '.squashfs'})
+    _APPIMAGE_SUFFIXES = frozenset({'.appimage', '.run'})
+    
+    # Single anchored alternation over every extension, longest first so that
+    # compound suffixes like .tar.gz are tried before their tails
+    _SUFFIX_PATTERN = re.compile(
+        '(?:' + '|'.join(re.escape(ext) for ext in sorted(ARCHIVE_EXTENSIONS, key=lambda ext: (-len(ext), ext))) + r')\Z'
+    )
     
     def __init__(self, max_recursion_depth: int = 10):
         """
@@ -77,14 +210,50 @@ class ArchiveExtractor:
     @classmethod
     def is_archive(cls, filename: str) -> bool:
         """Check if a file is a recognized archive format."""
-        path = Path(filename).name.lower()
-        
-        # Check for compound extensions like .tar.gz
-        for ext in cls.ARCHIVE_EXTENSIONS:
-            if path.endswith(ext):
-                return True
+        # Only the last two suffixes matter (enough for .tar.gz and friends),
+        # so the classification itself is cached per suffix, not per name.
+        # Taken from the dot positions rather than os.path.splitext, which
+        # sees no extension in dotfile names like '.zip' or '.tar.gz'.
+        name = os.path.basename(filename).lower()
+        last_dot = name.rfind('.')
+        if last_dot < 0:
+            return False
+        prev_dot = name.rfind('.', 0, last_dot)
+        return cls._suffix_is_archive(name[prev_dot if prev_dot >= 0 else last_dot:])
+    
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _suffix_is_archive(suffix: str) -> bool:
+        """Classify a lower-cased suffix such as '.zip' or '.tar.gz'."""
+        return ArchiveExtractor._SUFFIX_PATTERN.search(suffix) is not None
+    
+    @staticmethod
+    def _sniff_format(header: bytes) -> Optional[str]:
+        """Identify an archive format from its leading bytes."""
+        for offset, magic, fmt in ARCHIVE_SIGNATURES:
+            if header.startswith(magic, offset):
+                return fmt
+        return None
+    
+    @staticmethod
+    def _peek_header(stream: BinaryIO) -> Optional[bytes]:
+        """Read the leading bytes of a stream without consuming them."""
+        peek = getattr(stream, 'peek', None)
+        if peek is None:
+            return None
+        return peek(SNIFF_SIZE)[:SNIFF_SIZE]
+    
+    def _looks_like_archive(self, filename: str, header: Optional[bytes]) -> bool:
+        """
+        Decide whether a member named like an archive is worth extracting.
         
-        return False
+        Formats with a known signature must match it, so mis-named files are
+        skipped without spilling them to disk or trying every handler.
+        Formats without one (SFX, ISO, ...) fall back to the extension.
+        """
+        if header is None or not filename.lower().endswith(SIGNED_EXTENSIONS):
+            return True
+        return self._sniff_format(header) is not None
     
     def extract_archive(self, archive_path: str, recursion_depth: int = 0) -> Generator[Tuple[str, BinaryIO, int, bool], None, None]:
         """
@@ -92,6 +261,9 @@ class ArchiveExtractor:
         
         Yields tuples of: (relative_path, file_stream, size, is_nested_archive)
         
+        Streams are read lazily from the archive where the format allows it,
+        so each one should be consumed before advancing the generator.
+        
         Args:
             archive_path: Path to archive file
             recursion_depth: Current recursion depth (for nested archives)
@@ -111,7 +283,7 @@ class ArchiveExtractor:
         handlers = []
         
         # Extension-based primary handlers
-        if suffix in ('.zip', '.zipx') or any(name_lower.endswith(e) for e in ('.jar', '.war', '.ear')):
+        if name_lower.endswith(self._ZIP_SUFFIXES):
             handlers.append(self._extract_zip)
             if HAS_LIBARCHIVE:
                 handlers.append(self._extract_libarchive)
@@ -123,11 +295,11 @@ class ArchiveExtractor:
             handlers.append(self._extract_rar)
             if HAS_LIBARCHIVE:
                 handlers.append(self._extract_libarchive)
-        elif any(name_lower.endswith(e) for e in ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz', '.tar.zst', '.tzst')):
+        elif name_lower.endswith(self._TAR_SUFFIXES):
             handlers.append(self._extract_tar)
             if HAS_LIBARCHIVE:
                 handlers.append(self._extract_libarchive)
-        elif suffix in ('.deb', '.rpm', '.iso', '.img', '.msi', '.cab', '.cpio', '.wim', '.squashfs'):
+        elif suffix in self._LIBARCHIVE_SUFFIXES:
             if HAS_LIBARCHIVE:
                 handlers.append(self._extract_libarchive)
         
@@ -138,7 +310,7 @@ class ArchiveExtractor:
             handlers.append(self._extract_zip)
             if HAS_LIBARCHIVE:
                 handlers.append(self._extract_libarchive)
-        elif suffix in ('.appimage', '.run'):
+        elif suffix in self._APPIMAGE_SUFFIXES:
             handlers.append(self._extract_appimage)
             if HAS_7Z:
                 handlers.append(self._extract_7z)
@@ -184,7 +356,7 @@ class ArchiveExtractor:
             # If no exception and handlers exist, archive was valid but empty - not an error
     
     def _extract_zip(self, archive_path: str, recursion_depth: int) -> Generator:
-        """Extract ZIP archive."""
+        """Extract ZIP archive, streaming members without buffering them in memory."""
         try:
             with zipfile.ZipFile(archive_path, 'r') as zf:
                 for info in zf.infolist():
@@ -192,28 +364,20 @@ class ArchiveExtractor:
                         continue
                     
                     try:
-                        # Read file data
-                        data = zf.read(info.filename)
-                        size = len(data)
+                        # Lazy stream - decompressed as the caller reads it,
+                        # and closed once the caller moves on
+                        with zf.open(info, 'r') as member:
+                            # Check if this is a nested archive
+                            is_nested = self.is_archive(info.filename)
+                            spill = (is_nested and recursion_depth < self.max_recursion_depth
+                                     and self._looks_like_archive(info.filename, self._peek_header(member)))
+                            if spill:
+                                tmp_path = self._spill_to_temp(member, info.filename)
+                            else:
+                                yield (info.filename, member, info.file_size, is_nested)
                         
-                        # Check if this is a nested archive
-                        is_nested = self.is_archive(info.filename)
-                        
-                        # Yield the file itself first
-                        yield (info.filename, io.BytesIO(data), size, is_nested)
-                        
-                        # If it's a nested archive, recursively extract it
-                        if is_nested and recursion_depth < self.max_recursion_depth:
-                            with tempfile.NamedTemporaryFile(delete=False, suffix=Path(info.filename).suffix) as tmp:
-                                tmp.write(data)
-                                tmp_path = tmp.name
-                            
-                            try:
-                                # Recursively extract nested archive
-                                for nested_path, nested_stream, nested_size, nested_is_archive in self._extract_nested(tmp_path, info.filename, recursion_depth):
-                                    yield (nested_path, nested_stream, nested_size, nested_is_archive)
-                            finally:
-                                Path(tmp_path).unlink(missing_ok=True)
+                        if spill:
+                            yield from self._yield_spilled(tmp_path, info.filename, info.file_size, recursion_depth)
                     
                     except Exception as e:
                         logger.debug(f"Failed to extract {info.filename} from ZIP {archive_path}: {e}")
@@ -260,7 +424,8 @@ class ArchiveExtractor:
                         is_nested = self.is_archive(name)
                         yield (name, io.BytesIO(data), size, is_nested)
                         
-                        if is_nested and recursion_depth < self.max_recursion_depth:
+                        if (is_nested and recursion_depth < self.max_recursion_depth
+                                and self._looks_like_archive(name, data[:SNIFF_SIZE])):
                             with tempfile.NamedTemporaryFile(delete=False, suffix=Path(name).suffix) as tmp:
                                 tmp.write(data)
                                 tmp_path = tmp.name
@@ -290,22 +455,19 @@ class ArchiveExtractor:
                         continue
                     
                     try:
-                        data = rf.read(info.filename)
-                        size = len(data)
+                        # Lazy stream; buffered so the header can be peeked,
+                        # and closed once the caller moves on
+                        with io.BufferedReader(rf.open(info), STREAM_CHUNK_SIZE) as member:
+                            is_nested = self.is_archive(info.filename)
+                            spill = (is_nested and recursion_depth < self.max_recursion_depth
+                                     and self._looks_like_archive(info.filename, self._peek_header(member)))
+                            if spill:
+                                tmp_path = self._spill_to_temp(member, info.filename)
+                            else:
+                                yield (info.filename, member, info.file_size, is_nested)
                         
-                        is_nested = self.is_archive(info.filename)
-                        yield (info.filename, io.BytesIO(data), size, is_nested)
-                        
-                        if is_nested and recursion_depth < self.max_recursion_depth:
-                            with tempfile.NamedTemporaryFile(delete=False, suffix=Path(info.filename).suffix) as tmp:
-                                tmp.write(data)
-                                tmp_path = tmp.name
-                            
-                            try:
-                                for nested_path, nested_stream, nested_size, nested_is_archive in self._extract_nested(tmp_path, info.filename, recursion_depth):
-                                    yield (nested_path, nested_stream, nested_size, nested_is_archive)
-                            finally:
-                                Path(tmp_path).unlink(missing_ok=True)
+                        if spill:
+                            yield from self._yield_spilled(tmp_path, info.filename, info.file_size, recursion_depth)
                     
                     except Exception as e:
                         logger.debug(f"Failed to extract {info.filename} from RAR {archive_path}: {e}")
@@ -318,7 +480,11 @@ class ArchiveExtractor:
         """Extract TAR archive (including compressed variants)."""
         try:
             with tarfile.open(archive_path, 'r:*') as tf:
-                for member in tf.getmembers():
+                # Iterate headers in stream order rather than getmembers():
+                # that walks the whole archive first, and each extractfile()
+                # afterwards seeks backwards, which for gzip/bz2/xz restarts
+                # decompression from the beginning of the file
+                for member in tf:
                     if not member.isfile():
                         continue
                     
@@ -327,22 +493,17 @@ class ArchiveExtractor:
                         if f is None:
                             continue
                         
-                        data = f.read()
-                        size = len(data)
-                        
-                        is_nested = self.is_archive(member.name)
-                        yield (member.name, io.BytesIO(data), size, is_nested)
+                        with f:
+                            is_nested = self.is_archive(member.name)
+                            spill = (is_nested and recursion_depth < self.max_recursion_depth
+                                     and self._looks_like_archive(member.name, self._peek_header(f)))
+                            if spill:
+                                tmp_path = self._spill_to_temp(f, member.name)
+                            else:
+                                yield (member.name, f, member.size, is_nested)
                         
-                        if is_nested and recursion_depth < self.max_recursion_depth:
-                            with tempfile.NamedTemporaryFile(delete=False, suffix=Path(member.name).suffix) as tmp:
-                                tmp.write(data)
-                                tmp_path = tmp.name
-                            
-                            try:
-                                for nested_path, nested_stream, nested_size, nested_is_archive in self._extract_nested(tmp_path, member.name, recursion_depth):
-                                    yield (nested_path, nested_stream, nested_size, nested_is_archive)
-                            finally:
-                                Path(tmp_path).unlink(missing_ok=True)
+                        if spill:
+                            yield from self._yield_spilled(tmp_path, member.name, member.size, recursion_depth)
                     
                     except Exception as e:
                         logger.debug(f"Failed to extract {member.name} from TAR {archive_path}: {e}")
@@ -364,27 +525,41 @@ class ArchiveExtractor:
                     if not entry.isfile:
                         continue
                     
+                    raw = None
                     try:
-                        # Read entry data
-                        data = b''.join(entry.get_blocks())
-                        size = len(data)
+                        size = entry.size
+                        if size is None or size <= LIBARCHIVE_BUFFER_LIMIT:
+                            # Small (or unsized) entries are read whole, so the
+                            # stream stays valid after the reader moves on
+                            data = b''.join(entry.get_blocks(STREAM_CHUNK_SIZE))
+                            member = io.BytesIO(data)
+                            size = len(data)
+                            header = data[:SNIFF_SIZE]
+                        else:
+                            # Large entries stream lazily from the entry's data
+                            # blocks, which are only valid until the reader
+                            # moves on to the next entry
+                            raw = _BlockReader(entry.get_blocks(STREAM_CHUNK_SIZE))
+                            member = io.BufferedReader(raw, STREAM_CHUNK_SIZE)
+                            header = self._peek_header(member)
                         
                         is_nested = self.is_archive(entry.name)
-                        yield (entry.name, io.BytesIO(data), size, is_nested)
                         
-                        if is_nested and recursion_depth < self.max_recursion_depth:
-                            with tempfile.NamedTemporaryFile(delete=False, suffix=Path(entry.name).suffix) as tmp:
-                                tmp.write(data)
-                                tmp_path = tmp.name
-                            
-                            try:
-                                for nested_path, nested_stream, nested_size, nested_is_archive in self._extract_nested(tmp_path, entry.name, recursion_depth):
-                                    yield (nested_path, nested_stream, nested_size, nested_is_archive)
-                            finally:
-                                Path(tmp_path).unlink(missing_ok=True)
+                        if (is_nested and recursion_depth < self.max_recursion_depth
+                                and self._looks_like_archive(entry.name, header)):
+                            with member:
+                                tmp_path = self._spill_to_temp(member, entry.name)
+                            yield from self._yield_spilled(tmp_path, entry.name, size, recursion_depth)
+                        else:
+                            yield (entry.name, member, size, is_nested)
                     
                     except Exception as e:
                         logger.debug(f"Failed to extract {entry.name} from libarchive {archive_path}: {e}")
+                    finally:
+                        # Reading libarchive data after the reader has moved on
+                        # (or closed) crashes the interpreter; fail loudly instead
+                        if raw is not None:
+                            raw.release()
         
         except Exception as e:
             logger.debug(f"Failed to open archive with libarchive {archive_path}: {e}")
@@ -462,7 +637,8 @@ class ArchiveExtractor:
                                             found_any = True
                                             
                                             # If it's a nested archive, recursively extract it
-                                            if is_nested and recursion_depth < self.max_recursion_depth:
+                                            if (is_nested and recursion_depth < self.max_recursion_depth
+                                                    and self._looks_like_archive(file, data[:SNIFF_SIZE])):
                                                 with tempfile.NamedTemporaryFile(delete=False, suffix=Path(file).suffix) as tmp_file:
                                                     tmp_file.write(data)
                                                     tmp_file_path = tmp_file.name
@@ -523,7 +699,7 @@ class ArchiveExtractor:
                 for offset, suffix in sorted(potential_offsets):
                     with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
                         f.seek(offset)
-                        shutil.copyfileobj(f, tmp)
+                        copy_stream(f, tmp)
                         tmp_path = tmp.name
                     
                     try:
@@ -580,10 +756,9 @@ class ArchiveExtractor:
                 if offset >= 0:
                     logger.debug(f"Found embedded {extension[1:]} format at offset {offset} in carved content")
                     
-                    # Extract from the found offset
-                    embedded_data = carved_data[offset:]
+                    # Extract from the found offset (memoryview avoids copying the tail)
                     with tempfile.NamedTemporaryFile(delete=False, suffix=extension) as embedded_tmp:
-                        embedded_tmp.write(embedded_data)
+                        embedded_tmp.write(memoryview(carved_data)[offset:])
                         embedded_tmp_path = embedded_tmp.name
                     
                     try:
@@ -605,6 +780,23 @@ class ArchiveExtractor:
             logger.debug(f"Error trying to extract embedded formats: {e}")
             return False
     
+    def _spill_to_temp(self, stream: BinaryIO, name: str) -> str:
+        """Copy a member stream to a temporary file in bounded-size chunks."""
+        with tempfile.NamedTemporaryFile(delete=False, suffix=Path(name).suffix) as tmp:
+            copy_stream(stream, tmp)
+            return tmp.name
+    
+    def _yield_spilled(self, tmp_path: str, name: str, size: int, recursion_depth: int) -> Generator:
+        """Yield a nested archive spilled to disk, then its recursively extracted contents."""
+        try:
+            with open(tmp_path, 'rb') as stream:
+                yield (name, stream, size, True)
+            
+            for nested_path, nested_stream, nested_size, nested_is_archive in self._extract_nested(tmp_path, name, recursion_depth):
+                yield (nested_path, nested_stream, nested_size, nested_is_archive)
+        finally:
+            Path(tmp_path).unlink(missing_ok=True)
+    
     def _extract_nested(self, temp_path: str, original_name: str, parent_recursion_depth: int) -> Generator:
         """Helper to extract nested archives with proper path tracking."""
         for nested_rel_path, nested_stream, nested_size, nested_is_archive in self.extract_archive(temp_path, parent_recursion_depth + 1):
@@ -1,11 +1,15 @@
 """
 File operations for deletion and trash management.
 """
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Tuple
+from typing import List, Tuple, Dict, Optional
 import logging
 import os
 
+from .models import DeleteResult
+
 try:
     from send2trash import send2trash
     HAS_SEND2TRASH = True
@@ -15,13 +19,59 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Units for format_size, each 1024x the previous
+SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
+
+# Upper bound on concurrent stat() calls in get_total_size
+MAX_STAT_WORKERS = 32
+
+
+# Permanent deletes of at least this many files are spread over a thread
+# pool; below it the pool setup costs more than overlapping unlinks saves
+MIN_THREADED_DELETES = 16
+
+# Upper bound on concurrent unlink() calls in delete_files
+MAX_DELETE_WORKERS = 32
+
+
+def _try_unlink(filepath: str) -> Optional[str]:
+    """Permanently delete one file; return None on success or a failure reason."""
+    try:
+        os.unlink(filepath)
+    except FileNotFoundError:
+        return "File not found"
+    except PermissionError as e:
+        return f"Permission denied: {e}"
+    except Exception as e:
+        return str(e)
+    return None
+
+
+def _record_unlink(result: DeleteResult, filepath: str, reason: Optional[str]) -> None:
+    """Record and log the outcome of one _try_unlink call."""
+    if reason is None:
+        result.add_success(filepath)
+        logger.info(f"Permanently deleted: {filepath}")
+    else:
+        result.add_failure(filepath, reason)
+        logger.error(f"Failed to delete {filepath}: {reason}")
+
+
+def _safe_getsize(filepath: str) -> int:
+    """Return a file's size, or 0 (with a warning) if it cannot be stat'ed."""
+    try:
+        return os.stat(filepath).st_size
+    except OSError:
+        logger.warning(f"Could not get size of {filepath}")
+        return 0
+
 
 class FileOperations:
     """Handles file deletion with safety features."""
     
     @staticmethod
     def delete_files(filepaths: List[str], use_trash: bool = True, 
-                     dry_run: bool = False) -> Tuple[List[str], List[Tuple[str, str]]]:
+                     dry_run: bool = False) -> DeleteResult:
         """
         Delete or move files to trash.
         
@@ -31,67 +81,91 @@ class FileOperations:
             dry_run: If True, don't actually delete anything
         
         Returns:
-            Tuple of (successful_deletions, failures_with_reasons)
+            DeleteResult; unpacks as (successful_deletions, failures_with_reasons)
         """
-        successful = []
-        failures = []
+        result = DeleteResult()
+        
+        if not use_trash and not dry_run and len(filepaths) >= MIN_THREADED_DELETES:
+            # Unlink is latency-bound (especially on network filesystems), so
+            # overlap the syscalls; send2trash stays sequential as it is not
+            # thread-safe on every platform
+            workers = min(MAX_DELETE_WORKERS, len(filepaths))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                for filepath, reason in zip(filepaths, pool.map(_try_unlink, filepaths)):
+                    _record_unlink(result, filepath, reason)
+            return result
         
         for filepath in filepaths:
             try:
                 if dry_run:
                     # In dry run, just check if file exists
                     if Path(filepath).exists():
-                        successful.append(filepath)
+                        result.add_success(filepath)
                         logger.info(f"[DRY RUN] Would delete: {filepath}")
                     else:
-                        failures.append((filepath, "File not found"))
+                        result.add_failure(filepath, "File not found")
                 else:
                     # Actually delete
                     if use_trash:
                         if not HAS_SEND2TRASH:
-                            failures.append((filepath, "send2trash library not available"))
+                            result.add_failure(filepath, "send2trash library not available")
                             logger.error(f"Cannot move to trash (library missing): {filepath}")
                             continue
                         
                         send2trash(filepath)
-                        successful.append(filepath)
+                        result.add_success(filepath)
                         logger.info(f"Moved to trash: {filepath}")
                     else:
-                        # Permanent deletion
-                        path = Path(filepath)
-                        if path.exists():
-                            path.unlink()
-                            successful.append(filepath)
-                            logger.info(f"Permanently deleted: {filepath}")
-                        else:
-                            failures.append((filepath, "File not found"))
+                        # Permanent deletion, recorded exactly as in the
+                        # threaded path above
+                        _record_unlink(result, filepath, _try_unlink(filepath))
             
             except PermissionError as e:
-                failures.append((filepath, f"Permission denied: {e}"))
+                result.add_failure(filepath, f"Permission denied: {e}")
                 logger.error(f"Permission denied: {filepath}")
             except Exception as e:
-                failures.append((filepath, str(e)))
+                result.add_failure(filepath, str(e))
                 logger.error(f"Failed to delete {filepath}: {e}")
         
-        return successful, failures
+        return result
     
     @staticmethod
-    def get_total_size(filepaths: List[str]) -> int:
+    def get_total_size(filepaths: List[str], stat_cache: Optional[Dict[str, int]] = None,
+                       max_workers: Optional[int] = None) -> int:
         """
         Calculate total size of files.
         
+        Sizes already known to the caller are taken from stat_cache; the rest
+        are stat'ed concurrently so slow (e.g. network) filesystems overlap
+        their round-trips instead of serializing them.
+        
         Args:
             filepaths: List of file paths
+            stat_cache: Optional mapping of file path to known size in bytes
+            max_workers: Thread count for stat calls (defaults to
+                min(MAX_STAT_WORKERS, number of paths to stat))
         
         Returns:
             Total size in bytes
         """
         total = 0
-        for filepath in filepaths:
-            try:
-                total += Path(filepath).stat().st_size
-            except (OSError, FileNotFoundError):
-                logger.warning(f"Could not get size of {filepath}")
+        to_stat = []
+        if stat_cache:
+            for filepath in filepaths:
+                size = stat_cache.get(filepath)
+                if size is None:
+                    to_stat.append(filepath)
+                else:
+                    total += size
+        else:
+            to_stat = filepaths
+        
+        if len(to_stat) <= 1:
+            return total + sum(map(_safe_getsize, to_stat))
+        
+        workers = max_workers or min(MAX_STAT_WORKERS, len(to_stat))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            total += sum(pool.map(_safe_getsize, to_stat))
         return total
     
     @staticmethod
@@ -105,11 +179,11 @@ class FileOperations:
         Returns:
             Formatted string (e.g., "1.5 GB")
         """
-        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-            if size_bytes < 1024.0:
-                return f"{size_bytes:.1f} {unit}"
-            size_bytes /= 1024.0
-        return f"{size_bytes:.1f} PB"
+        if size_bytes < 1024:
+            return f"{float(size_bytes):.1f} B"
+        # Each unit is 2**10 of the previous, so the bit length picks it directly
+        exponent = min((int(size_bytes).bit_length() - 1) // 10, len(SIZE_UNITS) - 1)
+        return f"{size_bytes / (1 << (10 * exponent)):.1f} {SIZE_UNITS[exponent]}"
     
     @staticmethod
     def verify_files_exist(filepaths: List[str]) -> Tuple[List[str], List[str]]:
@@ -125,8 +199,29 @@ class FileOperations:
         existing = []
         missing = []
         
+        # Group by parent so directories holding several candidates are read
+        # once with scandir() instead of stat'ing every path
+        by_dir = defaultdict(list)
+        for filepath in filepaths:
+            by_dir[os.path.dirname(filepath)].append(filepath)
+        
+        listings = {}
+        for directory, group in by_dir.items():
+            if len(group) < 2:
+                continue
+            try:
+                with os.scandir(directory or '.') as entries:
+                    # Symlinks may dangle, so leave them to the exists() fallback
+                    listings[directory] = {e.name for e in entries if not e.is_symlink()}
+            except OSError:
+                pass
+        
         for filepath in filepaths:
-            if Path(filepath).exists():
+            present = listings.get(os.path.dirname(filepath))
+            # Names not in the listing (case-insensitive filesystems,
+            # unnormalized paths, symlinks) are confirmed with a real stat
+            if (present is not None and os.path.basename(filepath) in present) \
+                    or os.path.exists(filepath):
                 existing.append(filepath)
             else:
                 missing.append(filepath)
@@ -2,19 +2,150 @@
 Fast file hashing with partial hash optimization.
 """
 import xxhash
-from pathlib import Path
-from typing import Tuple, Optional, BinaryIO
+import io
+import mmap
+import os
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple, Optional, BinaryIO, Iterable, Iterator
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
+# Files up to this size are handed to xxhash as a single mapped buffer
+MMAP_WHOLE_FILE_LIMIT = 256 * 1024 * 1024  # 256MB
+
+# Larger files are fed from the mapping in slices of this size
+MMAP_SLICE_SIZE = 16 * 1024 * 1024  # 16MB
+
+# Flags for opening files to hash: no inheritance by child processes, and
+# binary mode on Windows
+OPEN_FLAGS = os.O_RDONLY | getattr(os, "O_CLOEXEC", 0) | getattr(os, "O_BINARY", 0)
+
+# Read size when a file cannot be memory-mapped and is streamed instead
+FALLBACK_BLOCK_SIZE = 1024 * 1024  # 1MB
+
+# madvise() and its constants only exist on some platforms
+HAS_MADV_SEQUENTIAL = hasattr(mmap.mmap, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL")
+HAS_MADV_DONTNEED = hasattr(mmap.mmap, "madvise") and hasattr(mmap, "MADV_DONTNEED")
+
+# Hash constructors selectable via AppConfig.hash_algorithm. xxh3_64 picks
+# its own SSE2/AVX2/NEON kernel at runtime and outruns hardware SHA-256, so
+# there is no CPU-dependent choice to make; every hash stored in one
+# database must also come from the same algorithm.
+HASH_ALGORITHMS = {
+    "xxhash": xxhash.xxh3_64,
+}
+
+# Bump whenever the bytes fed to the hashers change, so that a database
+# filled by an older release is rebuilt instead of silently never matching
+HASH_VERSION = 1
+
+# posix_fadvise() is not available on Windows or macOS
+HAS_FADVISE = hasattr(os, "posix_fadvise")
+
+# readv() lets descriptor reads land in a pooled buffer (not on Windows)
+HAS_READV = hasattr(os, "readv")
+
+
+def _fadvise(fd: int, advice: str) -> None:
+    """Give the kernel a whole-file access hint, ignoring unsupported cases."""
+    if not HAS_FADVISE:
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, getattr(os, advice))
+    except OSError:
+        pass
+
+
+# Per-thread pool of hasher objects and read buffers, reused instead of
+# allocating fresh hash state and buffers for every file
+_tls = threading.local()
+
+
+def hash_scheme(algorithm: str, partial_hash_threshold: int, partial_hash_size: int) -> str:
+    """
+    Describe everything that determines the hashes HashCalculator produces.
+    
+    Hashes are only comparable between files hashed under the same scheme;
+    the threshold decides which files get a full hash up front and the
+    partial size decides what a quick hash covers.
+    
+    Returns:
+        Scheme string such as "xxhash/v1/1048576/8192"
+    """
+    return f"{algorithm}/v{HASH_VERSION}/{partial_hash_threshold}/{partial_hash_size}"
+
+
+def _reusable_hasher(factory, slot: int = 0):
+    """
+    Get this thread's hasher for a constructor, reset to its initial state.
+    
+    Args:
+        factory: Hash constructor from HASH_ALGORITHMS
+        slot: Distinguishes hashers that must be live at the same time
+    
+    Returns:
+        A hasher object ready for update()
+    """
+    pool = getattr(_tls, "hashers", None)
+    if pool is None:
+        pool = _tls.hashers = {}
+    
+    hasher = pool.get((factory, slot))
+    if hasher is None or not hasattr(hasher, "reset"):
+        hasher = pool[(factory, slot)] = factory()
+    else:
+        hasher.reset()
+    return hasher
+
+
+def _reusable_buffer(size: int) -> memoryview:
+    """
+    Get this thread's read buffer of the given size.
+    
+    The same buffer is handed out on every call, so a caller must be done
+    with it before anything else on the thread asks for one of that size.
+    
+    Args:
+        size: Buffer length in bytes
+    
+    Returns:
+        Writable memoryview over a pooled bytearray
+    """
+    pool = getattr(_tls, "buffers", None)
+    if pool is None:
+        pool = _tls.buffers = {}
+    
+    view = pool.get(size)
+    if view is None:
+        view = pool[size] = memoryview(bytearray(size))
+    return view
+
+
+def _read_fd(fd: int, limit: int):
+    """
+    Read up to limit bytes from a descriptor, into a pooled buffer if possible.
+    
+    Returns:
+        bytes-like holding the data read; empty at EOF. A pooled view is
+        only valid until the next _read_fd call with the same limit.
+    """
+    if not HAS_READV:
+        return os.read(fd, limit)
+    view = _reusable_buffer(limit)
+    return view[:os.readv(fd, (view,))]
+
 
 class HashCalculator:
     """Handles file hashing with performance optimizations."""
     
     def __init__(self, partial_hash_threshold: int = 1_048_576, 
                  partial_hash_size: int = 8192,
-                 chunk_size: int = 65536):
+                 chunk_size: int = 65536,
+                 algorithm: str = "xxhash",
+                 cache_size: int = 100_000):
         """
         Initialize hash calculator.
         
@@ -22,45 +153,163 @@ class HashCalculator:
             partial_hash_threshold: File size threshold for using partial hash (bytes)
             partial_hash_size: Number of bytes to read for partial hash
             chunk_size: Chunk size for streaming hash computation
+            algorithm: Key into HASH_ALGORITHMS
+            cache_size: Max hash_file results kept in the LRU cache keyed by
+                (path, mtime, size); 0 disables caching
+        
+        Raises:
+            ValueError: If the algorithm is not supported
         """
+        if algorithm not in HASH_ALGORITHMS:
+            raise ValueError(f"Unsupported hash algorithm: {algorithm}")
+        
+        self.algorithm = algorithm
+        self._hasher = HASH_ALGORITHMS[algorithm]
         self.partial_hash_threshold = partial_hash_threshold
         self.partial_hash_size = partial_hash_size
         self.chunk_size = chunk_size
+        self._hash_sized = self._make_hash_fn()
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[tuple, Tuple[Optional[str], Optional[str]]]" = OrderedDict()
+        self._cache_lock = threading.Lock()  # hash_many calls hash_file from threads
+    
+    @property
+    def scheme(self) -> str:
+        """Hash scheme of this calculator (see hash_scheme)."""
+        return hash_scheme(self.algorithm, self.partial_hash_threshold, self.partial_hash_size)
+    
+    def _fresh_hasher(self, slot: int = 0):
+        """Get a reset, thread-local hasher for this instance's algorithm."""
+        return _reusable_hasher(self._hasher, slot)
     
-    def hash_file(self, filepath: str, file_size: Optional[int] = None) -> Tuple[Optional[str], Optional[str]]:
+    def _make_hash_fn(self):
+        """
+        Build the size-dispatching hash function for this instance.
+        
+        The threshold and the two hash routines are bound into a closure once,
+        so hash_file does no attribute lookups on its hot path. Changing the
+        thresholds after construction therefore has no effect.
+        
+        Returns:
+            Callable taking (open file descriptor, file_size) and returning
+            (full_hash, quick_hash)
+        """
+        threshold = self.partial_hash_threshold
+        full_hash_fn = self._compute_full_hash_fd
+        partial_hash_fn = self._compute_partial_hash_fd
+        
+        if threshold <= 0:
+            # Every file counts as large
+            def hash_partial_only(fd: int, file_size: int):
+                return None, partial_hash_fn(fd)
+            return hash_partial_only
+        
+        def hash_by_size(fd: int, file_size: int):
+            # Small files: only full hash
+            if file_size < threshold:
+                return full_hash_fn(fd, file_size), None
+            # Large files: quick hash now; full hash computed only if needed
+            # during duplicate detection
+            return None, partial_hash_fn(fd)
+        return hash_by_size
+    
+    def hash_file(self, filepath: str, file_size: Optional[int] = None,
+                  mtime: Optional[float] = None) -> Tuple[Optional[str], Optional[str]]:
         """
         Hash a file with partial hash optimization.
         
         Args:
             filepath: Path to file to hash
-            file_size: Known file size (optional, will stat if not provided)
+            file_size: Known file size (optional, will fstat the opened
+                descriptor if not provided)
+            mtime: Known modification time (st_mtime); with file_size it
+                forms the cache key, so a caller holding a stat result
+                causes no fstat at all
         
         Returns:
             Tuple of (full_hash, quick_hash)
             - For small files: (full_hash, None)
             - For large files: (full_hash, quick_hash) or (None, quick_hash) if no collision
+            Results for an unchanged file come from the cache without
+            reading the file.
         """
         try:
-            path = Path(filepath)
-            
-            if file_size is None:
-                file_size = path.stat().st_size
-            
-            # Small files: only full hash
-            if file_size < self.partial_hash_threshold:
-                full_hash = self._compute_full_hash(filepath)
-                return full_hash, None
+            key = None
+            if self.cache_size > 0 and file_size is not None and mtime is not None:
+                key = (filepath, mtime, file_size)
+                cached = self._cache_get(key)
+                if cached is not None:
+                    return cached
             
-            # Large files: partial hash first
-            quick_hash = self._compute_partial_hash(filepath)
+            # One path lookup: everything after this works on the descriptor
+            fd = os.open(filepath, OPEN_FLAGS)
+            try:
+                if self.cache_size > 0 and key is None:
+                    # The key and the size dispatch both use this one stat
+                    st = os.fstat(fd)
+                    file_size = st.st_size
+                    key = (filepath, st.st_mtime, file_size)
+                    cached = self._cache_get(key)
+                    if cached is not None:
+                        return cached
+                elif file_size is None:
+                    file_size = os.fstat(fd).st_size
+                
+                result = self._hash_sized(fd, file_size)
+            finally:
+                os.close(fd)
             
-            # Return quick hash for now; full hash computed only if needed during duplicate detection
-            return None, quick_hash
+            if key is not None:
+                with self._cache_lock:
+                    self._cache[key] = result
+                    if len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+            return result
             
         except Exception as e:
             logger.error(f"Failed to hash file {filepath}: {e}")
             return None, None
     
+    def _cache_get(self, key: tuple) -> Optional[Tuple[Optional[str], Optional[str]]]:
+        """Cached hash_file result for key, marked as recently used, or None."""
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+            return cached
+    
+    def hash_many(self, files: Iterable[tuple],
+                  max_workers: Optional[int] = None) -> Iterator[Tuple[str, Optional[str], Optional[str]]]:
+        """
+        Hash many files concurrently on a thread pool.
+        
+        xxhash releases the GIL while digesting, so threads scale with cores.
+        At most 2 * max_workers files are in flight at once, keeping memory
+        bounded for arbitrarily long inputs.
+        
+        Args:
+            files: Iterable of (filepath, file_size) pairs or (filepath,
+                file_size, mtime) triples, passed on to hash_file
+            max_workers: Worker thread count (defaults to the CPU count)
+        
+        Yields:
+            (filepath, full_hash, quick_hash) in input order, as from hash_file
+        """
+        workers = max_workers or os.cpu_count() or 1
+        window = 2 * workers
+        
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for filepath, *known in files:
+                pending.append((filepath, pool.submit(self.hash_file, filepath, *known)))
+                if len(pending) >= window:
+                    done_path, future = pending.popleft()
+                    yield (done_path, *future.result())
+            
+            while pending:
+                done_path, future = pending.popleft()
+                yield (done_path, *future.result())
+    
     def hash_stream(self, stream: BinaryIO, size: Optional[int] = None) -> Tuple[Optional[str], Optional[str]]:
         """
         Hash a file-like stream (for archive contents).
@@ -85,48 +334,161 @@ class HashCalculator:
     
     def _compute_partial_hash(self, filepath: str) -> str:
         """Compute quick hash from first bytes of file."""
-        hasher = xxhash.xxh3_64()
-        
-        with open(filepath, 'rb') as f:
-            data = f.read(self.partial_hash_size)
+        fd = os.open(filepath, OPEN_FLAGS)
+        try:
+            return self._compute_partial_hash_fd(fd)
+        finally:
+            os.close(fd)
+    
+    def _compute_partial_hash_fd(self, fd: int) -> str:
+        """Compute quick hash from the first bytes of a freshly opened descriptor."""
+        hasher = self._fresh_hasher()
+        limit = remaining = self.partial_hash_size
+        while remaining > 0 and (data := _read_fd(fd, limit)):
+            data = data[:remaining]
             hasher.update(data)
-        
+            remaining -= len(data)
         return hasher.hexdigest()
     
     def _compute_full_hash(self, filepath: str) -> str:
-        """Compute full hash of entire file using streaming."""
-        hasher = xxhash.xxh3_64()
+        """Compute full hash of entire file via a read-only memory map."""
+        fd = os.open(filepath, OPEN_FLAGS)
+        try:
+            return self._compute_full_hash_fd(fd)
+        finally:
+            os.close(fd)
+    
+    def _compute_full_hash_fd(self, fd: int, size_hint: Optional[int] = None) -> str:
+        """
+        Compute full hash of an open descriptor via a read-only memory map.
         
-        with open(filepath, 'rb') as f:
-            while chunk := f.read(self.chunk_size):
-                hasher.update(chunk)
+        Args:
+            fd: File descriptor opened for reading at offset 0
+            size_hint: Known file size; files smaller than one chunk are read
+                with plain read() calls since setting up a mapping costs more
         
-        return hasher.hexdigest()
+        Returns:
+            Hex digest string
+        """
+        if size_hint is not None and size_hint < self.chunk_size:
+            hasher = self._fresh_hasher()
+            # Stop once size_hint bytes are in, so the usual case is a single
+            # read with no second call just to see EOF; one pooled chunk_size
+            # buffer serves every size, and bytes past the hint (a file that
+            # grew since it was stat'ed) are left out, as in the cache key
+            remaining = size_hint
+            while remaining > 0 and (data := _read_fd(fd, self.chunk_size)):
+                hasher.update(data[:remaining])
+                remaining -= len(data)
+            return hasher.hexdigest()
+        
+        _fadvise(fd, "POSIX_FADV_SEQUENTIAL")
+        try:
+            return self._compute_mapped_hash_fd(fd)
+        finally:
+            # The file is read exactly once - drop its pages so a large scan
+            # does not evict more useful data from the page cache
+            _fadvise(fd, "POSIX_FADV_DONTNEED")
+    
+    def _compute_mapped_hash_fd(self, fd: int) -> str:
+        """Hash a descriptor through a memory map, streaming if unmappable."""
+        try:
+            mm = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            # Empty (ValueError) or not mappable (special file, exotic
+            # filesystem, exhausted address space) - stream it, in large
+            # blocks when there is real data to keep Python-level iterations
+            # per byte low
+            block_size = FALLBACK_BLOCK_SIZE if isinstance(e, OSError) else None
+            with io.FileIO(fd, closefd=False) as f:
+                return self._compute_full_hash_stream(f, block_size)
+        
+        with mm:
+            if HAS_MADV_SEQUENTIAL:
+                # Let the kernel read ahead aggressively for the single pass
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            
+            # The mapping length is the real size, no extra fstat needed
+            size = len(mm)
+            if size <= MMAP_WHOLE_FILE_LIMIT:
+                hasher = self._fresh_hasher()
+                hasher.update(mm)
+                return hasher.hexdigest()
+            
+            hasher = self._fresh_hasher()
+            # Unmap each hashed slice so resident memory stays at one slice
+            # rather than growing to the whole multi-GB file
+            release = HAS_MADV_DONTNEED and MMAP_SLICE_SIZE % mmap.PAGESIZE == 0
+            with memoryview(mm) as view:
+                for offset in range(0, size, MMAP_SLICE_SIZE):
+                    length = min(MMAP_SLICE_SIZE, size - offset)
+                    hasher.update(view[offset:offset + length])
+                    if release:
+                        try:
+                            mm.madvise(mmap.MADV_DONTNEED, offset, length)
+                        except OSError:
+                            release = False
+            return hasher.hexdigest()
     
-    def _compute_full_hash_stream(self, stream: BinaryIO) -> str:
-        """Compute full hash of a stream."""
-        hasher = xxhash.xxh3_64()
+    def _compute_full_hash_stream(self, stream: BinaryIO, block_size: Optional[int] = None) -> str:
+        """
+        Compute full hash of a stream.
         
-        while chunk := stream.read(self.chunk_size):
-            hasher.update(chunk)
+        Streams supporting readinto() are read into this thread's pooled
+        buffer, so no bytes object is allocated per block or per stream.
+        
+        Args:
+            stream: File-like object to hash
+            block_size: Read size (defaults to chunk_size)
         
+        Returns:
+            Hex digest string
+        """
+        hasher = self._fresh_hasher()
+        block_size = block_size or self.chunk_size
+        
+        readinto = getattr(stream, 'readinto', None)
+        if readinto is None:
+            while chunk := stream.read(block_size):
+                hasher.update(chunk)
+            return hasher.hexdigest()
+        
+        view = _reusable_buffer(block_size)
+        while n := readinto(view):
+            hasher.update(view[:n])
         return hasher.hexdigest()
     
     def _compute_dual_hash_stream(self, stream: BinaryIO, size: int) -> Tuple[str, str]:
-        """Compute both partial and full hash from stream."""
-        quick_hasher = xxhash.xxh3_64()
-        full_hasher = xxhash.xxh3_64()
+        """
+        Compute both partial and full hash from one pass over a stream.
         
-        bytes_read = 0
-        while chunk := stream.read(self.chunk_size):
-            full_hasher.update(chunk)
-            
-            # Add to quick hash only for first bytes
-            if bytes_read < self.partial_hash_size:
-                remaining = self.partial_hash_size - bytes_read
+        Every block read feeds the full hasher; the quick hasher is fed
+        from the same blocks until it has seen partial_hash_size bytes, after
+        which the loop only updates the full hasher.
+        """
+        quick_hasher = self._fresh_hasher(slot=1)
+        full_hasher = self._fresh_hasher()
+        remaining = self.partial_hash_size
+        
+        readinto = getattr(stream, 'readinto', None)
+        if readinto is None:
+            while remaining > 0 and (chunk := stream.read(self.chunk_size)):
+                full_hasher.update(chunk)
                 quick_hasher.update(chunk[:remaining])
-            
-            bytes_read += len(chunk)
+                remaining -= len(chunk)
+            while chunk := stream.read(self.chunk_size):
+                full_hasher.update(chunk)
+            return full_hasher.hexdigest(), quick_hasher.hexdigest()
+        
+        # Read into this thread's pooled buffer; memoryview slices hand it to
+        # xxhash without copying or allocating a bytes object per chunk
+        view = _reusable_buffer(self.chunk_size)
+        while remaining > 0 and (n := readinto(view)):
+            full_hasher.update(view[:n])
+            quick_hasher.update(view[:min(n, remaining)])
+            remaining -= n
+        while n := readinto(view):
+            full_hasher.update(view[:n])
         
         return full_hasher.hexdigest(), quick_hasher.hexdigest()
     
@@ -2,13 +2,20 @@
 Data models for the Archive Duplicate Finder.
 """
 from dataclasses import dataclass, field
-from typing import Optional, List
+from typing import Optional, List, Tuple, Set, Iterator
 from pathlib import Path
+import math
+import sys
 
+import xxhash
 
-@dataclass
+
+@dataclass(slots=True)
 class FileEntry:
-    """Represents a file found in an archive or directory."""
+    """Represents a file found in an archive or directory.
+    
+    Uses __slots__ since large scans can hold millions of these in memory.
+    """
     full_hash: Optional[str]  # None if quick hash check failed
     quick_hash: Optional[str]  # For large files
     filename: str
@@ -17,13 +24,70 @@ class FileEntry:
     size: int
     is_nested_archive: bool = False
     
+    def __post_init__(self):
+        # Every entry from one archive shares a single path string object
+        if type(self.source_archive) is str:
+            self.source_archive = sys.intern(self.source_archive)
+    
     @property
     def display_name(self) -> str:
         """Get display name for UI."""
         return self.filename
 
 
-@dataclass
+class HashBloomFilter:
+    """
+    Bloom filter over hash digest strings.
+    
+    Answers "definitely not stored" with a few bit tests, so lookups that
+    cannot match skip the database entirely. False positives (at roughly
+    error_rate) only cost the lookup that would have happened anyway.
+    """
+    
+    __slots__ = ("_bits", "_size", "_probes")
+    
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        """
+        Initialize an empty filter.
+        
+        Args:
+            capacity: Expected number of digests to add
+            error_rate: Target false-positive rate at that capacity
+        """
+        capacity = max(capacity, 1)
+        self._size = max(64, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self._probes = max(1, round(self._size / capacity * math.log(2)))
+        self._bits = bytearray((self._size + 7) // 8)
+    
+    def _probe(self, digest: str) -> Tuple[int, int]:
+        """Start and stride of a digest's bit positions (double hashing one 64-bit value)."""
+        value = xxhash.xxh3_64_intdigest(digest.encode())
+        return value & 0xFFFFFFFF, (value >> 32) | 1
+    
+    def add(self, digest: str):
+        """Add a digest to the filter."""
+        position, step = self._probe(digest)
+        size = self._size
+        bits = self._bits
+        for _ in range(self._probes):
+            position %= size
+            bits[position >> 3] |= 1 << (position & 7)
+            position += step
+    
+    def __contains__(self, digest: str) -> bool:
+        position, step = self._probe(digest)
+        size = self._size
+        bits = self._bits
+        # Most non-members fail on the first probe or two
+        for _ in range(self._probes):
+            position %= size
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+            position += step
+        return True
+
+
+@dataclass(slots=True)
 class DuplicateMatch:
     """Represents a duplicate file match."""
     source_file: FileEntry  # File from source archive
@@ -37,9 +101,13 @@ class DuplicateMatch:
         return self.target_size / (1024 * 1024)
 
 
-@dataclass
+@dataclass(slots=True)
 class ArchiveInfo:
-    """Information about a source archive."""
+    """Information about a source archive.
+    
+    `path` is treated as immutable after construction: `name` is derived
+    from it once and memoized.
+    """
     path: str
     mtime: float  # Modification time
     size: int
@@ -47,11 +115,15 @@ class ArchiveInfo:
     file_count: int = 0
     duplicate_count: int = 0
     duplicates: List[DuplicateMatch] = field(default_factory=list)
+    # Memo for `name`; a plain slot since cached_property needs a __dict__
+    _name: Optional[str] = field(default=None, init=False, repr=False, compare=False)
     
     @property
     def name(self) -> str:
         """Get archive filename."""
-        return Path(self.path).name
+        if self._name is None:
+            self._name = Path(self.path).name
+        return self._name
     
     def needs_rescan(self, current_mtime: float, current_size: int) -> bool:
         """Check if archive has changed since last scan."""
@@ -60,7 +132,37 @@ class ArchiveInfo:
         return self.mtime != current_mtime or self.size != current_size
 
 
-@dataclass
+@dataclass(slots=True)
+class DeleteResult:
+    """Outcome of a delete_files call.
+    
+    Unpacks like the (successful, failures) tuple it replaces, and supports
+    O(1) `path in result` checks for successful deletions.
+    """
+    successful: List[str] = field(default_factory=list)
+    failures: List[Tuple[str, str]] = field(default_factory=list)  # (path, reason)
+    _success_set: Set[str] = field(default_factory=set, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self._success_set.update(self.successful)
+    
+    def add_success(self, path: str) -> None:
+        """Record a successfully deleted (or, in dry run, deletable) path."""
+        self.successful.append(path)
+        self._success_set.add(path)
+    
+    def add_failure(self, path: str, reason: str) -> None:
+        """Record a path that could not be deleted."""
+        self.failures.append((path, reason))
+    
+    def __contains__(self, path: str) -> bool:
+        return path in self._success_set
+    
+    def __iter__(self) -> Iterator:
+        return iter((self.successful, self.failures))
+
+
+@dataclass(slots=True)
 class ScanProgress:
     """Progress information for scanning operations."""
     phase: str  # "source_scan", "target_scan", "archive_scan"
@@ -99,23 +201,41 @@ class AppConfig:
     hash_algorithm: str = "xxhash"
     parallel_workers: int = 4
     
+    def add_source_dir(self, path: str) -> bool:
+        """Append a source directory unless already listed; return whether it was added."""
+        return self._add_dir(self.source_dirs, path)
+    
+    def add_target_dir(self, path: str) -> bool:
+        """Append a target directory unless already listed; return whether it was added."""
+        return self._add_dir(self.target_dirs, path)
+    
+    def remove_source_dir(self, index: int) -> str:
+        """Remove and return the source directory at index."""
+        return self.source_dirs.pop(index)
+    
+    def remove_target_dir(self, index: int) -> str:
+        """Remove and return the target directory at index."""
+        return self.target_dirs.pop(index)
+    
+    @staticmethod
+    def _add_dir(paths: List[str], path: str) -> bool:
+        # The lists are public and may be replaced at any time, so they are
+        # checked directly rather than through a separate index
+        if path in paths:
+            return False
+        paths.append(path)
+        return True
+    
     def validate(self) -> List[str]:
         """Validate configuration, return list of errors."""
-        errors = []
-        
-        if not self.source_dirs and not self.auto_mode:
-            errors.append("At least one source directory is required")
-        
-        if not self.target_dirs and not self.auto_mode:
-            errors.append("At least one target directory is required")
-        
-        if self.delete_method not in ["trash", "permanent"]:
-            errors.append("delete_method must be 'trash' or 'permanent'")
-        
-        if self.min_file_size < 0:
-            errors.append("min_file_size must be >= 0")
-        
-        if self.parallel_workers < 1:
-            errors.append("parallel_workers must be >= 1")
-        
-        return errors
+        return [message for check, message in _CONFIG_RULES if check(self)]
+
+
+# AppConfig.validate rules as (is_invalid, message), reported in this order
+_CONFIG_RULES = (
+    (lambda c: not c.source_dirs and not c.auto_mode, "At least one source directory is required"),
+    (lambda c: not c.target_dirs and not c.auto_mode, "At least one target directory is required"),
+    (lambda c: c.delete_method not in ("trash", "permanent"), "delete_method must be 'trash' or 'permanent'"),
+    (lambda c: c.min_file_size < 0, "min_file_size must be >= 0"),
+    (lambda c: c.parallel_workers < 1, "parallel_workers must be >= 1"),
+)
@@ -2,25 +2,143 @@
 Scanner for source archives and target directories.
 """
 from pathlib import Path
-from typing import List, Dict, Callable, Optional
+from typing import List, Dict, Callable, Optional, FrozenSet, Iterator, Tuple
 import os
 import logging
-from multiprocessing import Pool, Manager
+import multiprocessing
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
 from queue import Empty
 
-from .models import FileEntry, DuplicateMatch, ArchiveInfo, ScanProgress, AppConfig
+from .models import FileEntry, DuplicateMatch, ArchiveInfo, ScanProgress, AppConfig, HashBloomFilter
 from .database import DatabaseManager
 from .hasher import HashCalculator
 from .extractor import ArchiveExtractor, ExtractionError
 
 logger = logging.getLogger(__name__)
 
+# Number of target files whose cached hashes are committed together
+TARGET_COMMIT_BATCH = 1000
+
+# Hashing threads per configured worker for target files; reads from cold
+# files block, so extra threads keep the cores busy digesting meanwhile
+TARGET_HASH_THREADS_PER_WORKER = 2
+
+# Per-file progress is reported once every this many files; each report
+# crosses into the UI, which would otherwise dominate large scans
+PROGRESS_INTERVAL = 128
+
+# Seconds between checks for worker progress and cancellation while the
+# process pool is busy
+PARALLEL_POLL_INTERVAL = 0.1
+
+
+class ScanCancelled(Exception):
+    """Raised inside an archive scan once cancellation has been requested."""
+
+
+def _collect_file_entries(extractor: ArchiveExtractor, hasher: HashCalculator, archive_path: str,
+                          min_file_size: int,
+                          on_file: Optional[Callable[[str, int], None]] = None,
+                          cancel_event=None) -> List[FileEntry]:
+    """
+    Extract and hash every file in one archive.
+    
+    Args:
+        extractor: Archive extractor to read members with
+        hasher: Hash calculator for member streams
+        archive_path: Path to archive file
+        min_file_size: Members smaller than this are skipped
+        on_file: Optional callback (path_in_archive, files_processed) per hashed file
+        cancel_event: Optional threading or multiprocessing Event, checked
+            before each member
+    
+    Returns:
+        List of FileEntry objects for the archive's members
+    
+    Raises:
+        ScanCancelled: If cancel_event is set; the partial entries are
+            dropped so the archive is never recorded as scanned
+    """
+    file_entries = []
+    
+    for path_in_archive, file_stream, file_size, is_nested_archive in extractor.extract_archive(archive_path):
+        if cancel_event is not None and cancel_event.is_set():
+            raise ScanCancelled(archive_path)
+        
+        # Skip files below minimum size
+        if file_size < min_file_size:
+            continue
+        
+        # Hash the file
+        full_hash, quick_hash = hasher.hash_stream(file_stream, file_size)
+        
+        if full_hash or quick_hash:
+            file_entries.append(FileEntry(
+                full_hash=full_hash,
+                quick_hash=quick_hash,
+                filename=Path(path_in_archive).name,
+                path_in_archive=path_in_archive,
+                source_archive=archive_path,
+                size=file_size,
+                is_nested_archive=is_nested_archive
+            ))
+            if on_file:
+                on_file(path_in_archive, len(file_entries))
+    
+    return file_entries
+
+
+# Per-process channels back to the scanning process, set by _init_scan_worker:
+# a queue for (archive_path, path_in_archive, files_processed) progress
+# (None = not wanted) and an event set when the scan is cancelled
+_worker_progress = None
+_worker_cancel = None
+
+
+def _init_scan_worker(progress_queue, cancel_event) -> None:
+    """Process-pool initializer: keep the progress queue and cancel event."""
+    global _worker_progress, _worker_cancel
+    _worker_progress = progress_queue
+    _worker_cancel = cancel_event
+    if progress_queue is not None:
+        # Progress is disposable; never hold up worker exit flushing it
+        progress_queue.cancel_join_thread()
+
+
+def _scan_archive_worker(archive_path: str, config: AppConfig) -> List[FileEntry]:
+    """Process-pool entry point: extract and hash one archive (no DB access)."""
+    hasher = HashCalculator(
+        partial_hash_threshold=config.partial_hash_threshold,
+        partial_hash_size=config.partial_hash_size,
+        algorithm=config.hash_algorithm
+    )
+    
+    report_file = None
+    if _worker_progress is not None:
+        progress = _worker_progress
+        
+        def report_file(path_in_archive: str, files_processed: int):
+            if files_processed % PROGRESS_INTERVAL == 0:
+                progress.put((archive_path, path_in_archive, files_processed))
+    
+    return _collect_file_entries(ArchiveExtractor(), hasher, archive_path, config.min_file_size,
+                                 report_file, _worker_cancel)
+
+
+def _process_pool_context():
+    """Pick a start method that is safe when the caller has other threads running."""
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
 
 class SourceScanner:
     """Scans source archives and extracts file hashes."""
     
     def __init__(self, config: AppConfig, db: DatabaseManager, 
-                 progress_callback: Optional[Callable[[ScanProgress], None]] = None):
+                 progress_callback: Optional[Callable[[ScanProgress], None]] = None,
+                 cancel_event: Optional[threading.Event] = None):
         """
         Initialize source scanner.
         
@@ -28,15 +146,23 @@ class SourceScanner:
             config: Application configuration
             db: Database manager
             progress_callback: Optional callback for progress updates
+            cancel_event: Optional event; once set, the scan stops at the next
+                archive member and returns the archives completed so far
         """
         self.config = config
         self.db = db
         self.hasher = HashCalculator(
             partial_hash_threshold=config.partial_hash_threshold,
-            partial_hash_size=config.partial_hash_size
+            partial_hash_size=config.partial_hash_size,
+            algorithm=config.hash_algorithm
         )
         self.extractor = ArchiveExtractor()
+        # Stored records for the archives of the current scan, loaded in bulk
+        # so unchanged archives are skipped without a query each
+        # (None = query per archive)
+        self._known_archives: Optional[Dict[str, ArchiveInfo]] = None
         self.progress_callback = progress_callback
+        self.cancel_event = cancel_event if cancel_event is not None else threading.Event()
     
     def scan_source_directories(self) -> Dict[str, ArchiveInfo]:
         """
@@ -45,6 +171,10 @@ class SourceScanner:
         Returns:
             Dictionary mapping archive paths to ArchiveInfo objects
         """
+        # Hashes stored under different hash settings can never match; drop
+        # them so every archive (and target) is hashed afresh
+        self.db.ensure_hash_scheme(self.hasher.scheme)
+        
         # Report that we're finding archives
         if self.progress_callback:
             self.progress_callback(ScanProgress(
@@ -54,22 +184,42 @@ class SourceScanner:
                 total_archives=0
             ))
         
-        # Find all archives
+        # Find all archives, keeping the stat from discovery
         archives = []
         for source_dir in self.config.source_dirs:
-            archives.extend(self._find_archives(source_dir))
+            archives.extend(self._iter_archives(source_dir))
         
         logger.info(f"Found {len(archives)} archives to scan")
         
+        if not self.config.recheck_archives:
+            self._known_archives = self.db.get_archive_infos([archive_path for archive_path, _ in archives])
+        
         # Scan each archive
-        archive_infos = {}
         total_archives = len(archives)
-        for idx, archive_path in enumerate(archives):
-            try:
-                info = self._scan_archive(archive_path, idx, total_archives)
-                archive_infos[archive_path] = info
-            except Exception as e:
-                logger.error(f"Failed to scan archive {archive_path}: {e}")
+        workers = min(self.config.parallel_workers, total_archives)
+        if workers > 1:
+            archive_infos = self._scan_archives_parallel(archives, workers)
+        else:
+            archive_infos = {}
+            for idx, (archive_path, stat) in enumerate(archives):
+                if self.cancel_event.is_set():
+                    break
+                try:
+                    info = self._scan_archive(archive_path, idx, total_archives, stat)
+                    archive_infos[archive_path] = info
+                except ScanCancelled:
+                    break
+                except Exception as e:
+                    logger.error(f"Failed to scan archive {archive_path}: {e}")
+        
+        self._known_archives = None
+        
+        if self.cancel_event.is_set():
+            logger.info(f"Source scan cancelled after {len(archive_infos)} archives")
+            return archive_infos
+        
+        # Bulk load finished - refresh index statistics before target lookups
+        self.db.optimize()
         
         # Final progress update for source scan phase
         if self.progress_callback:
@@ -82,24 +232,183 @@ class SourceScanner:
         
         return archive_infos
     
-    def _find_archives(self, directory: str) -> List[str]:
-        """Recursively find all archive files in a directory."""
-        archives = []
-        dir_path = Path(directory)
+    def _iter_archives(self, directory: str) -> Iterator[Tuple[str, os.stat_result]]:
+        """
+        Walk a directory with os.scandir, yielding archive files.
+        
+        Like os.walk, symlinked directories are not descended into and
+        unreadable directories are skipped. Only entries whose name looks
+        like an archive are stat'ed.
+        
+        Args:
+            directory: Root directory to walk
         
-        if not dir_path.exists():
+        Yields:
+            (filepath, stat_result) for each archive file
+        """
+        if not os.path.exists(directory):
             logger.warning(f"Directory does not exist: {directory}")
-            return archives
+            return
+        
+        is_archive = self.extractor.is_archive
+        pending = [directory]
+        while pending:
+            subdirs = []
+            try:
+                with os.scandir(pending.pop()) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir():
+                                if not entry.is_symlink():
+                                    subdirs.append(entry.path)
+                            elif is_archive(entry.name):
+                                yield entry.path, entry.stat()
+                        except OSError:
+                            logger.warning(f"Could not access file: {entry.path}")
+            except OSError:
+                pass
+            # Reversed so subdirectories are visited in listing order
+            pending.extend(reversed(subdirs))
+    
+    def _scan_archives_parallel(self, archives: List[Tuple[str, os.stat_result]],
+                                workers: int) -> Dict[str, ArchiveInfo]:
+        """
+        Extract and hash archives on a process pool, writing results here.
+        
+        Workers only inflate and hash; all database access (rescan checks and
+        inserts) stays in this process. Workers post per-file progress on a
+        queue that is relayed to progress_callback while waiting, and stop
+        at their next member once the scan is cancelled.
+        
+        Args:
+            archives: (archive path, stat_result) pairs from discovery
+            workers: Number of worker processes
+        
+        Returns:
+            Dictionary mapping archive paths to ArchiveInfo objects
+        """
+        archive_infos = {}
+        total_archives = len(archives)
+        processed = 0
+        
+        ctx = _process_pool_context()
+        progress_queue = ctx.Queue() if self.progress_callback else None
+        worker_cancel = ctx.Event()
+        
+        pending = {}
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_scan_worker,
+                                 initargs=(progress_queue, worker_cancel)) as pool:
+            for archive_path, stat in archives:
+                if self.cancel_event.is_set():
+                    break
+                try:
+                    existing_info = self._unchanged_archive_info(archive_path, stat.st_mtime, stat.st_size)
+                except Exception as e:
+                    logger.error(f"Failed to scan archive {archive_path}: {e}")
+                    continue
+                
+                if existing_info:
+                    logger.info(f"Skipping unchanged archive: {Path(archive_path).name}")
+                    archive_infos[archive_path] = existing_info
+                    processed += 1
+                    self._report_archive_done(Path(archive_path).name, 0, processed, total_archives)
+                    continue
+                
+                logger.info(f"Scanning archive: {Path(archive_path).name}")
+                future = pool.submit(_scan_archive_worker, archive_path, self.config)
+                pending[future] = (archive_path, stat.st_mtime, stat.st_size)
+            
+            while pending:
+                done, _ = wait(pending, timeout=PARALLEL_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                if self.cancel_event.is_set():
+                    # Running archives stop at their next member; queued ones never start
+                    worker_cancel.set()
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    break
+                self._relay_worker_progress(progress_queue, processed, total_archives)
+                
+                for future in done:
+                    archive_path, mtime, size = pending.pop(future)
+                    processed += 1
+                    try:
+                        file_entries = future.result()
+                    except Exception as e:
+                        logger.error(f"Failed to scan archive {archive_path}: {e}")
+                        continue
+                    
+                    archive_infos[archive_path] = self._store_archive(archive_path, mtime, size, file_entries)
+                    self._report_archive_done(Path(archive_path).name, len(file_entries), processed, total_archives)
         
-        for root, dirs, files in os.walk(directory):
-            for filename in files:
-                filepath = os.path.join(root, filename)
-                if self.extractor.is_archive(filename):
-                    archives.append(filepath)
+        return archive_infos
+    
+    def _relay_worker_progress(self, progress_queue, archives_processed: int, total_archives: int) -> None:
+        """Report the newest per-file progress posted by the pool workers, if any."""
+        if progress_queue is None:
+            return
+        latest = None
+        try:
+            while True:
+                latest = progress_queue.get_nowait()
+        except Empty:
+            pass
+        if latest is None:
+            return
+        
+        archive_path, path_in_archive, files_processed = latest
+        self.progress_callback(ScanProgress(
+            phase="source_scan",
+            current_archive=Path(archive_path).name,
+            current_file=path_in_archive,
+            files_processed=files_processed,
+            archives_processed=archives_processed,
+            total_archives=total_archives
+        ))
+    
+    def _unchanged_archive_info(self, archive_path: str, mtime: float, size: int) -> Optional[ArchiveInfo]:
+        """Return the stored ArchiveInfo if the archive may be skipped, else None."""
+        # If recheck_archives is False, we allow skipping unchanged archives
+        # If recheck_archives is True, we always rescan
+        if self.config.recheck_archives:
+            return None
+        if self._known_archives is not None:
+            existing_info = self._known_archives.get(archive_path)
+        else:
+            existing_info = self.db.get_archive_info(archive_path)
+        if existing_info and not existing_info.needs_rescan(mtime, size):
+            return existing_info
+        return None
+    
+    def _store_archive(self, archive_path: str, mtime: float, size: int,
+                       file_entries: List[FileEntry]) -> ArchiveInfo:
+        """Write an archive's file entries and record, returning its ArchiveInfo."""
+        # Store in database (one commit for the files and the archive record)
+        with self.db.transaction():
+            self.db.add_files_batch(file_entries)
+            self.db.update_archive(archive_path, mtime, size, len(file_entries))
         
-        return archives
+        logger.info(f"Extracted {len(file_entries)} files from {Path(archive_path).name}")
+        
+        return ArchiveInfo(
+            path=archive_path,
+            mtime=mtime,
+            size=size,
+            file_count=len(file_entries)
+        )
+    
+    def _report_archive_done(self, archive_name: str, files_processed: int,
+                             archives_processed: int, total_archives: int):
+        """Send the progress update for a finished (or skipped) archive."""
+        if self.progress_callback:
+            self.progress_callback(ScanProgress(
+                phase="source_scan",
+                current_archive=archive_name,
+                files_processed=files_processed,
+                archives_processed=archives_processed,
+                total_archives=total_archives
+            ))
     
-    def _scan_archive(self, archive_path: str, archive_idx: int, total_archives: int) -> ArchiveInfo:
+    def _scan_archive(self, archive_path: str, archive_idx: int, total_archives: int,
+                      known_stat: Optional[os.stat_result] = None) -> ArchiveInfo:
         """
         Scan a single archive and store file hashes.
         
@@ -107,94 +416,47 @@ class SourceScanner:
             archive_path: Path to archive file
             archive_idx: Current archive index (for progress)
             total_archives: Total number of archives
+            known_stat: stat_result already read during discovery, if any
         
         Returns:
             ArchiveInfo object
         """
         path = Path(archive_path)
-        stat = path.stat()
+        stat = known_stat if known_stat is not None else path.stat()
         mtime = stat.st_mtime
         size = stat.st_size
         
         # Check if we need to rescan
-        # If recheck_archives is False, we allow skipping unchanged archives
-        # If recheck_archives is True, we always rescan
-        if not self.config.recheck_archives:
-            existing_info = self.db.get_archive_info(archive_path)
-            if existing_info and not existing_info.needs_rescan(mtime, size):
-                logger.info(f"Skipping unchanged archive: {path.name}")
-                if self.progress_callback:
-                    progress = ScanProgress(
-                        phase="source_scan",
-                        current_archive=path.name,
-                        archives_processed=archive_idx + 1,
-                        total_archives=total_archives
-                    )
-                    self.progress_callback(progress)
-                return existing_info
+        existing_info = self._unchanged_archive_info(archive_path, mtime, size)
+        if existing_info:
+            logger.info(f"Skipping unchanged archive: {path.name}")
+            self._report_archive_done(path.name, 0, archive_idx + 1, total_archives)
+            return existing_info
         
         logger.info(f"Scanning archive [{archive_idx + 1}/{total_archives}]: {path.name}")
         
-        # Extract and hash files
-        file_entries = []
-        files_processed = 0
+        def report_file(path_in_archive: str, files_processed: int):
+            # Update progress
+            if files_processed % PROGRESS_INTERVAL == 0:
+                self.progress_callback(ScanProgress(
+                    phase="source_scan",
+                    current_archive=path.name,
+                    current_file=path_in_archive,
+                    files_processed=files_processed,
+                    archives_processed=archive_idx,
+                    total_archives=total_archives
+                ))
         
-        for path_in_archive, file_stream, file_size, is_nested_archive in self.extractor.extract_archive(archive_path):
-            # Skip files below minimum size
-            if file_size < self.config.min_file_size:
-                continue
-            
-            # Hash the file
-            full_hash, quick_hash = self.hasher.hash_stream(file_stream, file_size)
-            
-            if full_hash or quick_hash:
-                file_entry = FileEntry(
-                    full_hash=full_hash,
-                    quick_hash=quick_hash,
-                    filename=Path(path_in_archive).name,
-                    path_in_archive=path_in_archive,
-                    source_archive=archive_path,
-                    size=file_size,
-                    is_nested_archive=is_nested_archive
-                )
-                file_entries.append(file_entry)
-                files_processed += 1
-                
-                # Update progress
-                if self.progress_callback and files_processed % 10 == 0:
-                    progress = ScanProgress(
-                        phase="source_scan",
-                        current_archive=path.name,
-                        current_file=path_in_archive,
-                        files_processed=files_processed,
-                        archives_processed=archive_idx,
-                        total_archives=total_archives
-                    )
-                    self.progress_callback(progress)
-        
-        # Store in database
-        self.db.add_files_batch(file_entries)
-        self.db.update_archive(archive_path, mtime, size, len(file_entries))
+        # Extract and hash files
+        file_entries = _collect_file_entries(self.extractor, self.hasher, archive_path,
+                                             self.config.min_file_size,
+                                             report_file if self.progress_callback else None,
+                                             self.cancel_event)
         
-        logger.info(f"Extracted {len(file_entries)} files from {path.name}")
+        archive_info = self._store_archive(archive_path, mtime, size, file_entries)
         
         # Final progress update
-        if self.progress_callback:
-            progress = ScanProgress(
-                phase="source_scan",
-                current_archive=path.name,
-                files_processed=files_processed,
-                archives_processed=archive_idx + 1,
-                total_archives=total_archives
-            )
-            self.progress_callback(progress)
-        
-        archive_info = ArchiveInfo(
-            path=archive_path,
-            mtime=mtime,
-            size=size,
-            file_count=len(file_entries)
-        )
+        self._report_archive_done(path.name, len(file_entries), archive_idx + 1, total_archives)
         
         return archive_info
 
@@ -203,7 +465,8 @@ class TargetScanner:
     """Scans target directories for duplicate files."""
     
     def __init__(self, config: AppConfig, db: DatabaseManager,
-                 progress_callback: Optional[Callable[[ScanProgress], None]] = None):
+                 progress_callback: Optional[Callable[[ScanProgress], None]] = None,
+                 cancel_event: Optional[threading.Event] = None):
         """
         Initialize target scanner.
         
@@ -211,14 +474,34 @@ class TargetScanner:
             config: Application configuration
             db: Database manager
             progress_callback: Optional callback for progress updates
+            cancel_event: Optional event; once set, the scan stops at the next
+                batch of files and returns the matches found so far
         """
         self.config = config
         self.db = db
         self.hasher = HashCalculator(
             partial_hash_threshold=config.partial_hash_threshold,
-            partial_hash_size=config.partial_hash_size
+            partial_hash_size=config.partial_hash_size,
+            algorithm=config.hash_algorithm
         )
         self.progress_callback = progress_callback
+        self.cancel_event = cancel_event if cancel_event is not None else threading.Event()
+        # Sizes present among source files; targets of any other size cannot
+        # be duplicates and are never hashed (None = no pre-filter)
+        self._source_sizes: Optional[FrozenSet[int]] = None
+        # Bloom filters over source hashes, rebuilt per scan; a miss means no
+        # database lookup is needed (None = always look up)
+        self._full_hash_filter: Optional[HashBloomFilter] = None
+        self._quick_hash_filter: Optional[HashBloomFilter] = None
+        # Source files and selection states resolved in bulk for the current
+        # batch of candidates; hashes absent here fall back to single queries
+        self._batch_sources: Dict[str, List[FileEntry]] = {}
+        self._batch_selections: Dict[Tuple[str, str], bool] = {}
+        # Hashes of hard-linked targets by (st_dev, st_ino), so every further
+        # link to an inode hashed during this scan reuses its digests
+        self._linked_hashes: Dict[Tuple[int, int], Tuple[Optional[str], Optional[str]]] = {}
+        # Matches found by the last scan, counted as they are grouped
+        self.duplicate_count = 0
     
     def scan_target_directories(self) -> Dict[str, List[DuplicateMatch]]:
         """
@@ -229,50 +512,86 @@ class TargetScanner:
         """
         duplicates_by_archive: Dict[str, List[DuplicateMatch]] = {}
         
-        # Get all files from target directories
-        target_files = []
+        # Only files whose size matches some source file need hashing
+        self._source_sizes = sizes = frozenset(self.db.get_source_sizes())
+        self._linked_hashes = {}
+        
+        # Walk the target directories, keeping the size and mtime seen during
+        # discovery so each file is only stat'ed once. Files of any other
+        # size are just counted: a set lookup, no tuple, no DB work.
+        # Hard-linked files also keep their inode so its content is read once.
+        total_files = 0
+        candidates = []
+        cancel_event = self.cancel_event
         for target_dir in self.config.target_dirs:
-            target_files.extend(self._find_files(target_dir))
-        
-        logger.info(f"Found {len(target_files)} files in target directories")
+            for filepath, st in self._iter_files(target_dir):
+                if st.st_size in sizes:
+                    file_id = (st.st_dev, st.st_ino) if st.st_nlink > 1 else None
+                    candidates.append((total_files, filepath, st.st_size, st.st_mtime, file_id))
+                total_files += 1
+                if total_files % PROGRESS_INTERVAL == 0 and cancel_event.is_set():
+                    break
+            if cancel_event.is_set():
+                logger.info("Target scan cancelled during discovery")
+                return duplicates_by_archive
+        
+        logger.info(f"Found {total_files} files in target directories, "
+                    f"{len(candidates)} matching a source file size")
         
         # Report total files found before starting scan
         if self.progress_callback:
             progress = ScanProgress(
                 phase="target_scan",
-                total_files=len(target_files),
+                total_files=total_files,
                 files_processed=0
             )
             self.progress_callback(progress)
         
-        # Check each file for duplicates
-        match_count = 0
-        total_files = len(target_files)
-        for idx, filepath in enumerate(target_files):
-            try:
-                matches = self._check_file(filepath, idx, total_files)
-                
-                # Group matches by source archive
-                for match in matches:
-                    archive_path = match.source_file.source_archive
-                    if archive_path not in duplicates_by_archive:
-                        duplicates_by_archive[archive_path] = []
-                    duplicates_by_archive[archive_path].append(match)
-                    match_count += 1
-                
-                # Report progress every 10 files for smoother updates
-                if self.progress_callback and (idx + 1) % 10 == 0:
-                    progress = ScanProgress(
-                        phase="target_scan",
-                        current_file=filepath,
-                        files_processed=idx + 1,
-                        total_files=total_files,
-                        archives_processed=match_count
-                    )
-                    self.progress_callback(progress)
-            
-            except Exception as e:
-                logger.error(f"Failed to check file {filepath}: {e}")
+        if candidates:
+            self._build_hash_filters()
+        
+        # Check each candidate for duplicates
+        self.duplicate_count = match_count = 0
+        for batch_start in range(0, len(candidates), TARGET_COMMIT_BATCH):
+            if cancel_event.is_set():
+                logger.info(f"Target scan cancelled after {batch_start} candidate files")
+                break
+            batch = candidates[batch_start:batch_start + TARGET_COMMIT_BATCH]
+            # Commit cached target hashes once per batch instead of per file
+            with self.db.transaction():
+                prefetched = self._prefetch_hashes([candidate[1:] for candidate in batch])
+                self._resolve_batch_matches(prefetched)
+                for position, (idx, filepath, file_size, mtime, _) in enumerate(batch, batch_start + 1):
+                    try:
+                        matches = self._check_file(filepath, idx, total_files, (file_size, mtime),
+                                                   prefetched.get(filepath))
+                        
+                        # Group matches by source archive
+                        for match in matches:
+                            archive_path = match.source_file.source_archive
+                            if archive_path not in duplicates_by_archive:
+                                duplicates_by_archive[archive_path] = []
+                            duplicates_by_archive[archive_path].append(match)
+                            match_count += 1
+                        
+                        # Report progress every PROGRESS_INTERVAL checked files
+                        if self.progress_callback and position % PROGRESS_INTERVAL == 0:
+                            progress = ScanProgress(
+                                phase="target_scan",
+                                current_file=filepath,
+                                files_processed=idx + 1,
+                                total_files=total_files,
+                                archives_processed=match_count
+                            )
+                            self.progress_callback(progress)
+                    
+                    except Exception as e:
+                        logger.error(f"Failed to check file {filepath}: {e}")
+        
+        self._batch_sources = {}
+        self._batch_selections = {}
+        self._linked_hashes = {}
+        self.duplicate_count = match_count
         
         # Final progress update for target scan phase
         if self.progress_callback:
@@ -284,32 +603,229 @@ class TargetScanner:
                 archives_processed=match_count
             ))
         
-        logger.info(f"Found {sum(len(v) for v in duplicates_by_archive.values())} duplicate files")
+        logger.info(f"Found {match_count} duplicate files")
         
         return duplicates_by_archive
     
-    def _find_files(self, directory: str) -> List[str]:
-        """Recursively find all files in a directory."""
-        files = []
-        dir_path = Path(directory)
+    def _build_hash_filters(self):
+        """
+        Load the source hashes currently in the database into Bloom filters.
+        
+        Quick hashes only cover the head of a file, so unrelated files of one
+        format often share them; they are keyed by size as well, so a target
+        only reaches find_candidates when a source of its exact size does.
+        """
+        capacity = self.db.count_files()
+        self._full_hash_filter = HashBloomFilter(capacity)
+        self._quick_hash_filter = HashBloomFilter(capacity)
+        for full_hash in self.db.iter_hashes("full_hash"):
+            self._full_hash_filter.add(full_hash)
+        for size, quick_hash in self.db.iter_sized_hashes("quick_hash"):
+            self._quick_hash_filter.add(self._sized_key(size, quick_hash))
+    
+    @staticmethod
+    def _sized_key(size: int, digest: str) -> str:
+        """Bloom filter key for a hash that only matches at one file size."""
+        return f"{size}:{digest}"
+    
+    def _resolve_batch_matches(self, hashes: Dict[str, Tuple[Optional[str], Optional[str]]]):
+        """
+        Load source files and selection states for a batch's full hashes.
+        
+        Only hashes passing the Bloom filter are looked up, with one chunked
+        query per table instead of one query per matching target file.
+        
+        Args:
+            hashes: Mapping of target path to (full_hash, quick_hash)
+        """
+        wanted = list({
+            full_hash for full_hash, _ in hashes.values()
+            if full_hash and (self._full_hash_filter is None or full_hash in self._full_hash_filter)
+        })
+        self._batch_sources = self.db.find_by_full_hashes(wanted)
+        self._batch_selections = self.db.get_selection_states(wanted)
+    
+    def _sources_with_full_hash(self, full_hash: str) -> List[FileEntry]:
+        """Source files with this full hash, skipping the query on a filter miss."""
+        if full_hash in self._batch_sources:
+            return self._batch_sources[full_hash]
+        if self._full_hash_filter is not None and full_hash not in self._full_hash_filter:
+            return []
+        return self.db.find_by_full_hash(full_hash)
+    
+    def _selection_for(self, full_hash: str, filepath: str) -> bool:
+        """Stored selection for a match, or the configured default."""
+        if full_hash in self._batch_sources:
+            stored_state = self._batch_selections.get((full_hash, filepath))
+        else:
+            stored_state = self.db.get_selection_state(full_hash, filepath)
+        return stored_state if stored_state is not None else self.config.auto_select_duplicates
+    
+    def _iter_files(self, directory: str) -> Iterator[Tuple[str, os.stat_result]]:
+        """
+        Walk a directory with os.scandir, yielding files as they are found.
         
-        if not dir_path.exists():
+        Like os.walk, symlinked directories are not descended into and
+        unreadable directories are skipped. With parallel_workers > 1,
+        directories are listed and their files stat'ed on a thread pool
+        (scandir and stat release the GIL), so the per-file stat calls of
+        large trees overlap instead of running back to back; files are then
+        yielded in breadth-first order.
+        
+        Args:
+            directory: Root directory to walk
+        
+        Yields:
+            (filepath, stat_result) for each file of at least min_file_size
+        """
+        if not os.path.exists(directory):
             logger.warning(f"Directory does not exist: {directory}")
-            return files
+            return
+        
+        workers = self.config.parallel_workers
+        if workers <= 1:
+            pending = [directory]
+            while pending:
+                files, subdirs = self._list_directory(pending.pop())
+                yield from files
+                # Reversed so subdirectories are visited in listing order
+                pending.extend(reversed(subdirs))
+            return
+        
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            listings = deque([pool.submit(self._list_directory, directory)])
+            while listings:
+                files, subdirs = listings.popleft().result()
+                listings.extend(pool.submit(self._list_directory, subdir) for subdir in subdirs)
+                yield from files
+    
+    def _list_directory(self, directory: str) -> Tuple[List[Tuple[str, os.stat_result]], List[str]]:
+        """
+        List one directory for _iter_files.
         
-        for root, dirs, filenames in os.walk(directory):
-            for filename in filenames:
-                filepath = os.path.join(root, filename)
-                try:
+        Returns:
+            ((filepath, stat_result) for files of at least min_file_size,
+            non-symlinked subdirectory paths); both empty if unreadable
+        """
+        min_size = self.config.min_file_size
+        files = []
+        subdirs = []
+        # Bound once: this loop runs for every directory entry in the tree
+        add_file = files.append
+        add_subdir = subdirs.append
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir():
+                            if not entry.is_symlink():
+                                add_subdir(entry.path)
+                            continue
+                        st = entry.stat()
+                    except OSError:
+                        logger.warning(f"Could not access file: {entry.path}")
+                        continue
                     # Skip if below minimum size
-                    if os.path.getsize(filepath) >= self.config.min_file_size:
-                        files.append(filepath)
-                except OSError:
-                    logger.warning(f"Could not access file: {filepath}")
+                    if st.st_size >= min_size:
+                        add_file((entry.path, st))
+        except OSError:
+            pass
+        return files, subdirs
+    
+    @staticmethod
+    def _usable_cache(cached: Optional[Tuple[float, int, Optional[str], Optional[str]]], file_size: int,
+                      mtime: float) -> Optional[Tuple[Optional[str], Optional[str]]]:
+        """Return (full_hash, quick_hash) from a target cache row if it is still valid."""
+        if cached:
+            cached_mtime, cached_size, cached_full_hash, cached_quick_hash = cached
+            if cached_mtime == mtime and cached_size == file_size:
+                if cached_full_hash is not None or cached_quick_hash is not None:
+                    return cached_full_hash, cached_quick_hash
+        return None
+    
+    def _cached_hashes(self, filepath: str, file_size: int,
+                       mtime: float) -> Optional[Tuple[Optional[str], Optional[str]]]:
+        """Return (full_hash, quick_hash) cached for an unchanged target, else None."""
+        if self.config.recheck_targets:
+            return None
+        return self._usable_cache(self.db.get_target_file_info(filepath), file_size, mtime)
+    
+    def _prefetch_hashes(self, batch: List[Tuple[str, int, float, Optional[Tuple[int, int]]]]
+                         ) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+        """
+        Resolve the hashes of a batch of target files ahead of matching.
+        
+        Cached hashes for the whole batch are loaded with a few bulk queries,
+        so an unchanged tree costs a stat sweep rather than a query (or a
+        read) per file. Only files that pass the size pre-filter and have no
+        usable cached hashes are read, and of several hard links to one inode
+        only the first is. With parallel_workers > 1 they are hashed on a
+        thread pool of TARGET_HASH_THREADS_PER_WORKER threads per worker,
+        overlapping read waits with digesting; either way their hashes are
+        stored in the target cache with one executemany. Digests are
+        identical to hash_file's, so they still compare equal to the hashes
+        recorded for archive members.
         
-        return files
+        Args:
+            batch: (filepath, size, mtime, file_id) tuples from discovery;
+                file_id is (st_dev, st_ino) for hard-linked files, else None
+        
+        Returns:
+            Dictionary mapping every file that passes the size pre-filter to
+            its (full_hash, quick_hash)
+        """
+        if self._source_sizes is not None:
+            batch = [item for item in batch if item[1] in self._source_sizes]
+        
+        cache_rows = {}
+        if not self.config.recheck_targets:
+            cache_rows = self.db.get_target_files_info([filepath for filepath, _, _, _ in batch])
+        
+        hashes = {}
+        to_hash = {}
+        links = []
+        rows = []
+        first_links = {}
+        for filepath, file_size, mtime, file_id in batch:
+            cached = self._usable_cache(cache_rows.get(filepath), file_size, mtime)
+            if cached is not None:
+                hashes[filepath] = cached
+            elif file_id in self._linked_hashes:
+                hashes[filepath] = self._linked_hashes[file_id]
+                rows.append((filepath, mtime, file_size, *hashes[filepath]))
+            elif file_id is not None and first_links.setdefault(file_id, filepath) != filepath:
+                links.append((filepath, file_size, mtime, file_id))
+            else:
+                to_hash[filepath] = (file_size, mtime, file_id)
+        
+        workers = self.config.parallel_workers
+        # Discovery's size and mtime double as the hasher's cache key
+        stats = [(filepath, file_size, mtime) for filepath, (file_size, mtime, _) in to_hash.items()]
+        # A pool is not worth starting for a single file
+        if workers > 1 and len(stats) > 1:
+            results = self.hasher.hash_many(stats, max_workers=workers * TARGET_HASH_THREADS_PER_WORKER)
+        else:
+            results = ((filepath, *self.hasher.hash_file(filepath, file_size, mtime))
+                       for filepath, file_size, mtime in stats)
+        
+        for filepath, full_hash, quick_hash in results:
+            file_size, mtime, file_id = to_hash[filepath]
+            rows.append((filepath, mtime, file_size, full_hash, quick_hash))
+            hashes[filepath] = (full_hash, quick_hash)
+            if file_id is not None:
+                self._linked_hashes[file_id] = hashes[filepath]
+        
+        # Further links to an inode first seen in this batch
+        for filepath, file_size, mtime, file_id in links:
+            hashes[filepath] = self._linked_hashes[file_id]
+            rows.append((filepath, mtime, file_size, *hashes[filepath]))
+        if rows:
+            self.db.update_target_files_batch(rows)
+        return hashes
     
-    def _check_file(self, filepath: str, file_idx: int, total_files: int) -> List[DuplicateMatch]:
+    def _check_file(self, filepath: str, file_idx: int, total_files: int,
+                    known_stat: Optional[Tuple[int, float]] = None,
+                    known_hashes: Optional[Tuple[Optional[str], Optional[str]]] = None) -> List[DuplicateMatch]:
         """
         Check if a file matches any hashes in the database.
         
@@ -317,30 +833,32 @@ class TargetScanner:
             filepath: Path to file to check
             file_idx: Current file index (for progress)
             total_files: Total number of files
+            known_stat: (size, mtime) already read during discovery, if any
+            known_hashes: (full_hash, quick_hash) already computed or loaded
+                from the cache by _prefetch_hashes, if any
         
         Returns:
             List of DuplicateMatch objects
         """
         try:
-            stat = Path(filepath).stat()
-            file_size = stat.st_size
-            mtime = stat.st_mtime
+            if known_stat is None:
+                stat = Path(filepath).stat()
+                file_size, mtime = stat.st_size, stat.st_mtime
+            else:
+                file_size, mtime = known_stat
             
-            full_hash = None
-            quick_hash = None
+            if self._source_sizes is not None and file_size not in self._source_sizes:
+                return []
             
-            # Check if we have a cached hash
-            if not self.config.recheck_targets:
-                cached = self.db.get_target_file_info(filepath)
-                if cached:
-                    cached_mtime, cached_size, cached_full_hash, cached_quick_hash = cached
-                    if cached_mtime == mtime and cached_size == file_size:
-                        full_hash = cached_full_hash
-                        quick_hash = cached_quick_hash
+            if known_hashes is not None:
+                full_hash, quick_hash = known_hashes
+            else:
+                # Check if we have a cached hash
+                full_hash, quick_hash = self._cached_hashes(filepath, file_size, mtime) or (None, None)
             
             # If not cached or recheck requested, compute hashes
-            if full_hash is None and quick_hash is None:
-                full_hash, quick_hash = self.hasher.hash_file(filepath, file_size)
+            if known_hashes is None and full_hash is None and quick_hash is None:
+                full_hash, quick_hash = self.hasher.hash_file(filepath, file_size, mtime)
                 # Store what we have so far
                 self.db.update_target_file(filepath, mtime, file_size, full_hash, quick_hash)
             
@@ -349,11 +867,10 @@ class TargetScanner:
             
             # Check full hash if available
             if full_hash:
-                source_files = self.db.find_by_full_hash(full_hash)
+                source_files = self._sources_with_full_hash(full_hash)
                 for source_file in source_files:
                     # Get selection state from database or use config default
-                    stored_state = self.db.get_selection_state(full_hash, filepath)
-                    selected = stored_state if stored_state is not None else self.config.auto_select_duplicates
+                    selected = self._selection_for(full_hash, filepath)
                     
                     match = DuplicateMatch(
                         source_file=source_file,
@@ -365,18 +882,19 @@ class TargetScanner:
             
             # Check quick hash if no full hash
             elif quick_hash:
-                # Check if quick hash exists in database
-                if self.db.check_quick_hash_exists(quick_hash):
+                # Only pay for a full hash if a same-size source shares the quick hash
+                if ((self._quick_hash_filter is None
+                        or self._sized_key(file_size, quick_hash) in self._quick_hash_filter)
+                        and self.db.find_candidates(file_size, quick_hash)):
                     # Compute full hash to verify
                     full_hash = self.hasher.compute_full_hash_for_quick(filepath)
                     if full_hash:
                         # Update cache with full hash
                         self.db.update_target_file(filepath, mtime, file_size, full_hash, quick_hash)
                         
-                        source_files = self.db.find_by_full_hash(full_hash)
+                        source_files = self._sources_with_full_hash(full_hash)
                         for source_file in source_files:
-                            stored_state = self.db.get_selection_state(full_hash, filepath)
-                            selected = stored_state if stored_state is not None else self.config.auto_select_duplicates
+                            selected = self._selection_for(full_hash, filepath)
                             
                             match = DuplicateMatch(
                                 source_file=source_file,
@@ -72,7 +72,8 @@ def main(source, target, db_path, no_keep_db, recheck, recheck_targets, search_a
     
     # If no sources/targets provided and not auto mode, start interactive TUI
     if not source and not target and not auto:
-        from tui.app import DupCleanerApp
+        from tui.app import DupCleanerApp, install_event_loop_policy
+        install_event_loop_policy()
         app = DupCleanerApp(config)
         app.run()
     elif auto:
@@ -89,7 +90,8 @@ def main(source, target, db_path, no_keep_db, recheck, recheck_targets, search_a
             sys.exit(1)
         
         # Run with CLI configuration
-        from tui.app import DupCleanerApp
+        from tui.app import DupCleanerApp, install_event_loop_policy
+        install_event_loop_policy()
         app = DupCleanerApp(config)
         app.run()
 
@@ -32,6 +32,16 @@ def temp_db(tmp_path):
     db.close()
 
 
+@pytest.fixture
+def fresh_db():
+    """Create an in-memory database (no file I/O) for testing."""
+    from core.database import DatabaseManager
+    db = DatabaseManager(":memory:")
+    db.connect()
+    yield db
+    db.close()
+
+
 @pytest.fixture
 def sample_file_entry():
     """Create a sample FileEntry for testing."""
@@ -27,11 +27,17 @@ class TestDatabaseManagerInit:
         assert db.conn is not None
         db.close()
     
-    def test_connect_creates_tables(self, tmp_path):
-        """Test that connect creates tables."""
-        db_path = str(tmp_path / "test.db")
-        db = DatabaseManager(db_path)
+    def test_close_twice(self, tmp_path):
+        """Test closing an already closed database is a no-op."""
+        db = DatabaseManager(str(tmp_path / "test.db"))
         db.connect()
+        db.close()
+        db.close()
+        assert db.conn is None
+    
+    def test_connect_creates_tables(self, fresh_db):
+        """Test that connect creates tables."""
+        db = fresh_db
         
         # Check tables exist
         cursor = db.conn.cursor()
@@ -41,9 +47,35 @@ class TestDatabaseManagerInit:
         assert 'archives' in tables
         assert 'files' in tables
         assert 'selection_state' in tables
-        
-        db.close()
     
+    def test_connect_applies_pragmas(self, tmp_path):
+        """Test that connect enables WAL and tuned PRAGMAs."""
+        db_path = str(tmp_path / "test.db")
+        db = DatabaseManager(db_path)
+        db.connect()
+
+        assert db.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert db.conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert db.conn.execute("PRAGMA page_size").fetchone()[0] == 4096
+        assert db.conn.execute("PRAGMA journal_size_limit").fetchone()[0] == 67_108_864
+
+        db.close()
+
+    def test_full_hash_lookup_uses_index(self, fresh_db):
+        """Test that full hash lookups are served by the narrow full hash index."""
+        db = fresh_db
+
+        plan = db.conn.execute("""
+            EXPLAIN QUERY PLAN
+            SELECT full_hash, quick_hash, filename, path_in_archive,
+                   source_archive, size, is_nested_archive
+            FROM files WHERE full_hash = ?
+        """, ("abc",)).fetchall()
+        details = " ".join(row[-1] for row in plan)
+        assert "INDEX idx_full_hash " in details
+        indexes = {row[0] for row in db.conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert "idx_full_hash_covering" not in indexes
+
     def test_context_manager(self, tmp_path):
         """Test context manager usage."""
         db_path = str(tmp_path / "test.db")
@@ -56,11 +88,9 @@ class TestDatabaseManagerInit:
 class TestArchiveOperations:
     """Tests for archive operations."""
     
-    def test_update_archive(self, tmp_path):
+    def test_update_archive(self, fresh_db):
         """Test updating archive info."""
-        db_path = str(tmp_path / "test.db")
-        db = DatabaseManager(db_path)
-        db.connect()
+        db = fresh_db
         
         db.update_archive("/path/archive.zip", 1234567890.0, 10000, 50)
         
@@ -70,25 +100,17 @@ class TestArchiveOperations:
         assert info.mtime == 1234567890.0
         assert info.size == 10000
         assert info.file_count == 50
-        
-        db.close()
     
-    def test_get_archive_info_nonexistent(self, tmp_path):
+    def test_get_archive_info_nonexistent(self, fresh_db):
         """Test getting info for non-existent archive."""
-        db_path = str(tmp_path / "test.db")
-        db = DatabaseManager(db_path)
-        db.connect()
+        db = fresh_db
         
         info = db.get_archive_info("/path/missing.zip")
         assert info is None
-        
-        db.close()
     
-    def test_update_archive_overwrite(self, tmp_path):
+    def test_update_archive_overwrite(self, fresh_db):
         """Test that update overwrites existing."""
-        db_path = str(tmp_path / "test.db")
-        db = DatabaseManager(db_path)
-        db.connect()
+        db = fresh_db
         
         db.update_archive("/path/archive.zip", 1000.0, 5000, 10)
         db.update_archive("/path/archive.zip", 2000.0, 10000, 20)
@@ -97,14 +119,22 @@ class TestArchiveOperations:
         assert info.mtime == 2000.0
         assert info.size == 10000
         assert info.file_count == 20
+    
+    def test_get_archive_infos(self, fresh_db):
+        """Test bulk archive lookup returns only known archives."""
+        db = fresh_db
         
-        db.close()
+        db.update_archive("/path/a.zip", 1.0, 100, 10)
+        db.update_archive("/path/b.zip", 2.0, 200, 20)
+        
+        infos = db.get_archive_infos(["/path/a.zip", "/path/b.zip", "/path/missing.zip"])
+        assert set(infos) == {"/path/a.zip", "/path/b.zip"}
+        assert infos["/path/b.zip"].size == 200
+        assert infos["/path/b.zip"].file_count == 20
     
-    def test_get_all_archives(self, tmp_path):
+    def test_get_all_archives(self, fresh_db):
         """Test getting all archives."""
-        db_path = str(tmp_path / "test.db")
-        db = DatabaseManager(db_path)
-        db.connect()
+        db = fresh_db
         
         db.update_archive("/path/a.zip", 1.0, 100, 10)
         db.update_archive("/path/b.zip", 2.0, 200, 20)
@@ -115,18 +145,14 @@ class TestArchiveOperations:
         assert "/path/a.zip" in archives
         assert "/path/b.zip" in archives
         assert "/path/c.zip" in archives
-        
-        db.close()
 
 
 class TestFileOperations:
     """Tests for file operations."""
     
-    def test_add_file(self, tmp_path):
+    def test_add_file(self, fresh_db):
         """Test adding a single file."""
-        db_path = str(tmp_path / "test.db")
-        db = DatabaseManager(db_path)
-        db.connect()
+        db = fresh_db
         
         entry = FileEntry(
             full_hash="abc123",
@@ -144,14 +170,10 @@ class TestFileOperations:
         results = db.find_by_full_hash("abc123")
         assert len(results) == 1
         assert results[0].filename == "test.txt"
-        
-        db.close()
     
-    def test_add_files_batch(self, tmp_path):
+    def test_add_files_batch(self, fresh_db):
         """Test batch file addition."""
-        db_path = str(tmp_path / "test.db")
-        db = DatabaseManager(db_path)
-        db.connect()
+        db = fresh_db
         
         entries = [
             FileEntry(
@@ -172,14 +194,10 @@ class TestFileOperations:
         for i in range(100):
             results = db.find_by_full_hash(f"hash{i}")
             assert len(results) == 1
-        
-        db.close()
     
-    def test_find_by_full_hash(self, tmp_path):
+    def test_find_by_full_hash(self, fresh_db):
         """Test finding by full hash."""
-        db_path = str(tmp_path / "test.db")
-        db = DatabaseManager(db_path)
-        db.connect()
+        db = fresh_db
         
         # Add multiple files with same hash
         for i in range(3):
@@ -196,14 +214,10 @@ class TestFileOperations:
         
         results = db.find_by_full_hash("shared_hash")
         assert len(results) == 3
-        
-        db.close()
     
-    def test_find_by_quick_hash(self, tmp_path):
+    def test_find_by_quick_hash(self, fresh_db):
         """Test finding by quick hash."""
-        db_path = str(tmp_path / "test.db")
-        db = DatabaseManager(db_path)
-        db.connect()
+        db = fresh_db
         
         entry = FileEntry(
             full_hash=None,
@@ -219,14 +233,10 @@ class TestFileOperations:
         results = db.find_by_quick_hash("quick123")
         assert len(results) == 1
         assert results[0].quick_hash == "quick123"
-        
-        db.close()
     
-    def test_check_quick_hash_exists(self, tmp_path):
+    def test_check_quick_hash_exists(self, fresh_db):
         """Test checking quick hash existence."""
-        db_path = str(tmp_path / "test.db")
-        db = DatabaseManager(db_path)
-        db.connect()
+        db = fresh_db
         
         entry = FileEntry(
             full_hash=None,
@@ -241,14 +251,36 @@ class TestFileOperations:
         
         assert db.check_quick_hash_exists("existing_quick") is True
         assert db.check_quick_hash_exists("nonexistent") is False
-        
-        db.close()
     
-    def test_update_full_hash(self, tmp_path):
+    def test_find_candidates(self, fresh_db):
+        """Test candidate lookup requires both size and quick hash to match."""
+        db = fresh_db
+        
+        for name, size in (("a.bin", 1000), ("b.bin", 2000)):
+            db.add_file(FileEntry(
+                full_hash=None,
+                quick_hash="shared_quick",
+                filename=name,
+                path_in_archive=name,
+                source_archive="/path/archive.zip",
+                size=size,
+                is_nested_archive=False
+            ))
+        
+        candidates = db.find_candidates(1000, "shared_quick")
+        assert [c.filename for c in candidates] == ["a.bin"]
+        assert db.find_candidates(3000, "shared_quick") == []
+        assert db.find_candidates(1000, "other_quick") == []
+        
+        plan = db.conn.execute(
+            "EXPLAIN QUERY PLAN " + db.SELECT_FILES_BY_SIZE_AND_QUICK_HASH_SQL,
+            (1000, "shared_quick")
+        ).fetchall()
+        assert "idx_files_quick" in " ".join(row[-1] for row in plan)
+    
+    def test_update_full_hash(self, fresh_db):
         """Test updating full hash."""
-        db_path = str(tmp_path / "test.db")
-        db = DatabaseManager(db_path)
-        db.connect()
+        db = fresh_db
         
         entry = FileEntry(
             full_hash=None,
@@ -267,14 +299,10 @@ class TestFileOperations:
         # Verify update
         results = db.find_by_full_hash("full_hash_123")
         assert len(results) == 1
-        
-        db.close()
     
-    def test_get_files_by_archive(self, tmp_path):
+    def test_get_files_by_archive(self, fresh_db):
         """Test getting files by archive."""
-        db_path = str(tmp_path / "test.db")
-        db = DatabaseManager(db_path)
-        db.connect()
+        db = fresh_db
         
         # Add files to different archives
         for i in range(5):
@@ -303,14 +331,10 @@ class TestFileOperations:
         
         files = db.get_files_by_archive("/path/target.zip")
         assert len(files) == 5
-        
-        db.close()
     
-    def test_unique_constraint(self, tmp_path):
+    def test_unique_constraint(self, fresh_db):
         """Test unique constraint on source_archive + path_in_archive."""
-        db_path = str(tmp_path / "test.db")
-        db = DatabaseManager(db_path)
-        db.connect()
+        db = fresh_db
         
         entry1 = FileEntry(
             full_hash="hash1",
@@ -338,69 +362,92 @@ class TestFileOperations:
         results = db.get_files_by_archive("/path/archive.zip")
         assert len(results) == 1
         assert results[0].full_hash == "hash2"  # Should have new hash
+
+
+class TestTransactions:
+    """Tests for grouped writes via DatabaseManager.transaction()."""
+    
+    def test_transaction_commits_once(self, tmp_path):
+        """Test that writes inside a transaction are committed together."""
+        db_path = str(tmp_path / "test.db")
+        db = DatabaseManager(db_path)
+        db.connect()
         
+        with db.transaction():
+            for i in range(5):
+                db.add_file(FileEntry(
+                    full_hash=f"hash{i}",
+                    quick_hash=None,
+                    filename=f"file{i}.txt",
+                    path_in_archive=f"file{i}.txt",
+                    source_archive="/path/archive.zip",
+                    size=100,
+                ))
+            # Not yet visible to a second connection
+            other = sqlite3.connect(db_path)
+            assert other.execute("SELECT COUNT(*) FROM files").fetchone()[0] == 0
+        
+        assert other.execute("SELECT COUNT(*) FROM files").fetchone()[0] == 5
+        other.close()
         db.close()
+    
+    def test_transaction_rolls_back_on_error(self, fresh_db):
+        """Test that a failing transaction leaves no partial writes."""
+        db = fresh_db
+        
+        with pytest.raises(RuntimeError):
+            with db.transaction():
+                db.update_archive("/path/a.zip", 1.0, 100, 10)
+                raise RuntimeError("boom")
+        
+        assert db.get_archive_info("/path/a.zip") is None
+        
+        # Writes outside a transaction still auto-commit
+        db.update_archive("/path/b.zip", 1.0, 100, 10)
+        assert db.get_archive_info("/path/b.zip") is not None
 
 
 class TestSelectionState:
     """Tests for selection state operations."""
     
-    def test_set_and_get_selection(self, tmp_path):
+    def test_set_and_get_selection(self, fresh_db):
         """Test setting and getting selection state."""
-        db_path = str(tmp_path / "test.db")
-        db = DatabaseManager(db_path)
-        db.connect()
+        db = fresh_db
         
         db.set_selection_state("file_hash_123", "/path/to/file.txt", True)
         
         selected = db.get_selection_state("file_hash_123", "/path/to/file.txt")
         assert selected is True
-        
-        db.close()
     
-    def test_set_selection_false(self, tmp_path):
+    def test_set_selection_false(self, fresh_db):
         """Test setting selection to False."""
-        db_path = str(tmp_path / "test.db")
-        db = DatabaseManager(db_path)
-        db.connect()
+        db = fresh_db
         
         db.set_selection_state("hash", "/path/file.txt", False)
         
         selected = db.get_selection_state("hash", "/path/file.txt")
         assert selected is False
-        
-        db.close()
     
-    def test_get_selection_nonexistent(self, tmp_path):
+    def test_get_selection_nonexistent(self, fresh_db):
         """Test getting selection for non-existent entry."""
-        db_path = str(tmp_path / "test.db")
-        db = DatabaseManager(db_path)
-        db.connect()
+        db = fresh_db
         
         selected = db.get_selection_state("unknown", "/unknown/file.txt")
         assert selected is None
-        
-        db.close()
     
-    def test_update_selection(self, tmp_path):
+    def test_update_selection(self, fresh_db):
         """Test updating selection state."""
-        db_path = str(tmp_path / "test.db")
-        db = DatabaseManager(db_path)
-        db.connect()
+        db = fresh_db
         
         db.set_selection_state("hash", "/path/file.txt", True)
         db.set_selection_state("hash", "/path/file.txt", False)
         
         selected = db.get_selection_state("hash", "/path/file.txt")
         assert selected is False
-        
-        db.close()
     
-    def test_multiple_selections(self, tmp_path):
+    def test_multiple_selections(self, fresh_db):
         """Test multiple selection states."""
-        db_path = str(tmp_path / "test.db")
-        db = DatabaseManager(db_path)
-        db.connect()
+        db = fresh_db
         
         selections = [
             ("hash1", "/path/a.txt", True),
@@ -414,31 +461,23 @@ class TestSelectionState:
         assert db.get_selection_state("hash1", "/path/a.txt") is True
         assert db.get_selection_state("hash2", "/path/b.txt") is False
         assert db.get_selection_state("hash3", "/path/c.txt") is True
-        
-        db.close()
 
 
 class TestStatistics:
     """Tests for statistics."""
     
-    def test_get_statistics_empty(self, tmp_path):
+    def test_get_statistics_empty(self, fresh_db):
         """Test statistics for empty database."""
-        db_path = str(tmp_path / "test.db")
-        db = DatabaseManager(db_path)
-        db.connect()
+        db = fresh_db
         
         stats = db.get_statistics()
         assert stats['archives'] == 0
         assert stats['files'] == 0
         assert stats['nested_archives'] == 0
-        
-        db.close()
     
-    def test_get_statistics(self, tmp_path):
+    def test_get_statistics(self, fresh_db):
         """Test statistics calculation."""
-        db_path = str(tmp_path / "test.db")
-        db = DatabaseManager(db_path)
-        db.connect()
+        db = fresh_db
         
         # Add archives
         db.update_archive("/path/a.zip", 1.0, 100, 5)
@@ -461,18 +500,14 @@ class TestStatistics:
         assert stats['archives'] == 2
         assert stats['files'] == 10
         assert stats['nested_archives'] == 3
-        
-        db.close()
 
 
 class TestClearDatabase:
     """Tests for clearing database."""
     
-    def test_clear_database(self, tmp_path):
+    def test_clear_database(self, fresh_db):
         """Test clearing all data."""
-        db_path = str(tmp_path / "test.db")
-        db = DatabaseManager(db_path)
-        db.connect()
+        db = fresh_db
         
         # Add data
         db.update_archive("/path/archive.zip", 1.0, 100, 10)
@@ -495,14 +530,10 @@ class TestClearDatabase:
         stats = db.get_statistics()
         assert stats['archives'] == 0
         assert stats['files'] == 0
-        
-        db.close()
     
-    def test_clear_preserves_schema(self, tmp_path):
+    def test_clear_preserves_schema(self, fresh_db):
         """Test that clearing preserves table structure."""
-        db_path = str(tmp_path / "test.db")
-        db = DatabaseManager(db_path)
-        db.connect()
+        db = fresh_db
         
         db.update_archive("/path/archive.zip", 1.0, 100, 10)
         db.clear_database()
@@ -511,18 +542,141 @@ class TestClearDatabase:
         db.update_archive("/path/new.zip", 2.0, 200, 20)
         stats = db.get_statistics()
         assert stats['archives'] == 1
+
+
+class TestTargetFileCache:
+    """Tests for target file hash cache lookups."""
+    
+    def test_bulk_lookup_matches_single(self, fresh_db):
+        """Test bulk lookups return the same rows as single lookups across chunks."""
+        db = fresh_db
+        db.MAX_SQL_PARAMS = 3
+        paths = [f"/target/file{i}.bin" for i in range(8)]
+        for i, path in enumerate(paths):
+            db.update_target_file(path, float(i), 100 + i, f"hash{i}", None)
+        
+        info = db.get_target_files_info(paths + ["/target/missing.bin"])
+        
+        assert len(info) == 8
+        assert "/target/missing.bin" not in info
+        for path in paths:
+            assert info[path] == db.get_target_file_info(path)
+    
+    def test_batch_update(self, fresh_db):
+        """Test batch updates insert new rows and replace existing ones."""
+        db = fresh_db
+        db.update_target_file("/target/a.bin", 1.0, 10, "old", None)
+        
+        db.update_target_files_batch([
+            ("/target/a.bin", 2.0, 20, "new", None),
+            ("/target/b.bin", 3.0, 30, None, "quick"),
+        ])
+        
+        assert db.get_target_file_info("/target/a.bin") == (2.0, 20, "new", None)
+        assert db.get_target_file_info("/target/b.bin") == (3.0, 30, None, "quick")
+    
+    def test_bulk_lookup_empty(self, fresh_db):
+        """Test bulk lookup of no paths."""
+        assert fresh_db.get_target_files_info([]) == {}
+
+
+class TestHashIteration:
+    """Tests for bulk source hash reads."""
+    
+    def test_iter_hashes_skips_nulls(self, fresh_db):
+        """Test each hash column yields only its stored values."""
+        db = fresh_db
+        db.add_files_batch([
+            FileEntry("full1", None, "a", "a", "/x.zip", 1, False),
+            FileEntry("full2", "quick2", "b", "b", "/x.zip", 2, False),
+            FileEntry(None, "quick3", "c", "c", "/x.zip", 3, False),
+        ])
+        
+        assert db.count_files() == 3
+        assert sorted(db.iter_hashes("full_hash")) == ["full1", "full2"]
+        assert sorted(db.iter_hashes("quick_hash")) == ["quick2", "quick3"]
+    
+    def test_iter_sized_hashes_is_distinct(self, fresh_db):
+        """Test (size, hash) pairs are yielded once each."""
+        db = fresh_db
+        db.add_files_batch([
+            FileEntry(None, "quick1", "a", "a", "/x.zip", 10, False),
+            FileEntry(None, "quick1", "a", "a", "/y.zip", 10, False),
+            FileEntry(None, "quick1", "b", "b", "/x.zip", 20, False),
+            FileEntry("full1", None, "c", "c", "/x.zip", 30, False),
+        ])
+        
+        assert sorted(db.iter_sized_hashes("quick_hash")) == [(10, "quick1"), (20, "quick1")]
+        with pytest.raises(ValueError):
+            list(db.iter_sized_hashes("size"))
+    
+    def test_iter_hashes_rejects_other_columns(self, fresh_db):
+        """Test only hash columns can be read."""
+        with pytest.raises(ValueError):
+            list(fresh_db.iter_hashes("filename"))
+
+    
+    def test_find_by_full_hashes(self, fresh_db):
+        """Test bulk lookup groups source files and keeps unknown hashes."""
+        db = fresh_db
+        db.add_files_batch([
+            FileEntry("full1", None, "a", "a", "/x.zip", 1, False),
+            FileEntry("full1", None, "b", "b", "/y.zip", 1, False),
+            FileEntry("full2", None, "c", "c", "/x.zip", 2, False),
+        ])
+        
+        found = db.find_by_full_hashes(["full1", "full2", "missing"])
+        
+        assert sorted(e.source_archive for e in found["full1"]) == ["/x.zip", "/y.zip"]
+        assert [e.filename for e in found["full2"]] == ["c"]
+        assert found["missing"] == []
+    
+    def test_get_selection_states(self, fresh_db):
+        """Test bulk selection lookup returns only stored pairs."""
+        db = fresh_db
+        db.set_selection_state("full1", "/t/a", True)
+        db.set_selection_state("full1", "/t/b", False)
+        db.set_selection_state("full2", "/t/c", True)
         
-        db.close()
+        states = db.get_selection_states(["full1", "other"])
+        
+        assert states == {("full1", "/t/a"): True, ("full1", "/t/b"): False}
+
+
+class TestHashScheme:
+    """Tests for hash scheme tracking."""
+    
+    def test_fresh_database_adopts_scheme(self, fresh_db):
+        """Test an unversioned database records the scheme without clearing."""
+        db = fresh_db
+        db.update_archive("/path/archive.zip", 1.0, 100, 10)
+        
+        assert db.ensure_hash_scheme("xxhash/v1/1024/64") is False
+        assert db.get_metadata("hash_scheme") == "xxhash/v1/1024/64"
+        assert db.get_statistics()['archives'] == 1
+    
+    def test_changed_scheme_clears_hashes(self, fresh_db):
+        """Test a different recorded scheme invalidates stored rows."""
+        db = fresh_db
+        db.ensure_hash_scheme("xxhash/v1/1024/64")
+        db.update_archive("/path/archive.zip", 1.0, 100, 10)
+        db.update_target_file("/target/file.bin", 1.0, 100, "hash", None)
+        
+        assert db.ensure_hash_scheme("xxhash/v1/1024/64") is False
+        assert db.get_statistics()['archives'] == 1
+        
+        assert db.ensure_hash_scheme("xxhash/v2/1024/64") is True
+        assert db.get_statistics()['archives'] == 0
+        assert db.get_target_file_info("/target/file.bin") is None
+        assert db.get_metadata("hash_scheme") == "xxhash/v2/1024/64"
 
 
 class TestRowToFileEntry:
     """Tests for row conversion."""
     
-    def test_row_to_file_entry(self, tmp_path):
+    def test_row_to_file_entry(self, fresh_db):
         """Test conversion from database row to FileEntry."""
-        db_path = str(tmp_path / "test.db")
-        db = DatabaseManager(db_path)
-        db.connect()
+        db = fresh_db
         
         entry = FileEntry(
             full_hash="hash123",
@@ -547,5 +701,24 @@ class TestRowToFileEntry:
         assert retrieved.source_archive == "/path/archive.zip"
         assert retrieved.size == 2048
         assert retrieved.is_nested_archive is True
+    
+    def test_fetch_spans_multiple_batches(self, fresh_db):
+        """Test results larger than one fetchmany() batch are all returned."""
+        db = fresh_db
+        db.FETCH_BATCH_SIZE = 7
         
-        db.close()
+        db.add_files_batch([
+            FileEntry(
+                full_hash="same",
+                quick_hash=None,
+                filename=f"file{i}.txt",
+                path_in_archive=f"file{i:02d}.txt",
+                source_archive="/path/archive.zip",
+                size=100
+            )
+            for i in range(20)
+        ])
+        
+        files = db.get_files_by_archive("/path/archive.zip")
+        assert [f.path_in_archive for f in files] == [f"file{i:02d}.txt" for i in range(20)]
+        assert len(db.find_by_full_hash("same")) == 20
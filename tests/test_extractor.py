@@ -8,7 +8,7 @@ import tarfile
 import io
 from pathlib import Path
 from unittest.mock import patch, MagicMock
-from core.extractor import ArchiveExtractor, ExtractionError
+from core.extractor import ArchiveExtractor, ExtractionError, copy_stream
 
 
 class TestArchiveExtractorInit:
@@ -97,6 +97,24 @@ class TestIsArchive:
         """Test case-insensitive detection."""
         assert ArchiveExtractor.is_archive("FILE.ZIP") is True
         assert ArchiveExtractor.is_archive("Archive.TAR.GZ") is True
+    
+    def test_is_archive_dotfile_names(self):
+        """Test names that are only an archive extension still count as archives."""
+        assert ArchiveExtractor.is_archive(".zip") is True
+        assert ArchiveExtractor.is_archive(".tar.gz") is True
+        assert ArchiveExtractor.is_archive("dir/.tar") is True
+        assert ArchiveExtractor.is_archive(".bashrc") is False
+        assert ArchiveExtractor.is_archive("dir/README") is False
+    
+    def test_is_archive_cached_per_suffix(self):
+        """Test that names sharing a suffix reuse the cached classification."""
+        ArchiveExtractor._suffix_is_archive.cache_clear()
+        for i in range(100):
+            assert ArchiveExtractor.is_archive(f"dir/file{i}.jar") is True
+        
+        info = ArchiveExtractor._suffix_is_archive.cache_info()
+        assert info.misses == 1
+        assert info.hits == 99
 
 
 class TestExtractZip:
@@ -109,14 +127,32 @@ class TestExtractZip:
             zf.writestr("hello.txt", "Hello World")
         
         extractor = ArchiveExtractor()
-        results = list(extractor.extract_archive(str(zip_path)))
+        # Streams are only valid until the generator advances
+        results = [(path, stream.read(), size, is_nested)
+                   for path, stream, size, is_nested in extractor.extract_archive(str(zip_path))]
         
         assert len(results) == 1
-        path, stream, size, is_nested = results[0]
+        path, data, size, is_nested = results[0]
         assert path == "hello.txt"
         assert size == 11
         assert is_nested is False
-        assert stream.read() == b"Hello World"
+        assert data == b"Hello World"
+    
+    def test_extract_zip_closes_member_streams(self, tmp_path):
+        """Test each member stream is closed once the generator moves on."""
+        zip_path = tmp_path / "test.zip"
+        with zipfile.ZipFile(zip_path, 'w') as zf:
+            zf.writestr("a.txt", "A")
+            zf.writestr("b.txt", "B")
+        
+        extractor = ArchiveExtractor()
+        gen = extractor.extract_archive(str(zip_path))
+        _, first, _, _ = next(gen)
+        assert not first.closed
+        _, second, _, _ = next(gen)
+        assert first.closed
+        gen.close()
+        assert second.closed
     
     def test_extract_zip_multiple_files(self, tmp_path):
         """Test extracting multiple files from ZIP."""
@@ -161,6 +197,26 @@ class TestExtractZip:
         assert len(results) == 1
         assert results[0][0] == "file.txt"
     
+    def test_extract_zip_streams_members(self, tmp_path):
+        """Test that ZIP members are streamed rather than buffered."""
+        zip_path = tmp_path / "stream.zip"
+        inner_zip = tmp_path / "inner.zip"
+        with zipfile.ZipFile(inner_zip, 'w') as zf:
+            zf.writestr("deep.txt", "Deep")
+        with zipfile.ZipFile(zip_path, 'w') as zf:
+            zf.writestr("big.bin", b"z" * 200_000)
+            zf.write(inner_zip, "inner.zip")
+
+        extractor = ArchiveExtractor()
+        contents = {}
+        for path, stream, size, is_nested in extractor.extract_archive(str(zip_path)):
+            assert not isinstance(stream, io.BytesIO)
+            contents[path] = (stream.read(), size)
+
+        assert contents["big.bin"] == (b"z" * 200_000, 200_000)
+        assert contents["inner.zip"] == (inner_zip.read_bytes(), inner_zip.stat().st_size)
+        assert contents["inner.zip/deep.txt"] == (b"Deep", 4)
+
     def test_extract_zip_nested_archive(self, tmp_path):
         """Test detection of nested archive."""
         zip_path = tmp_path / "outer.zip"
@@ -177,6 +233,76 @@ class TestExtractZip:
         assert nested[0][3] is True  # is_nested_archive flag
 
 
+class TestMagicSniffing:
+    """Tests for magic-byte nested archive detection."""
+    
+    def test_sniff_known_formats(self):
+        """Test that common archive headers are recognized."""
+        assert ArchiveExtractor._sniff_format(b"PK\x03\x04rest") == "zip"
+        assert ArchiveExtractor._sniff_format(b"7z\xbc\xaf\x27\x1c") == "7z"
+        assert ArchiveExtractor._sniff_format(b"\x1f\x8b\x08") == "gzip"
+        assert ArchiveExtractor._sniff_format(b"\x00" * 257 + b"ustar") == "tar"
+        assert ArchiveExtractor._sniff_format(b"plain text") is None
+    
+    def test_misnamed_archive_not_extracted(self, tmp_path):
+        """Test that a fake nested archive is flagged but not spilled or opened."""
+        zip_path = tmp_path / "outer.zip"
+        with zipfile.ZipFile(zip_path, 'w') as zf:
+            zf.writestr("inner.zip", "fake zip content")
+        
+        extractor = ArchiveExtractor()
+        with patch.object(extractor, "_spill_to_temp") as spill:
+            results = list(extractor.extract_archive(str(zip_path)))
+        
+        spill.assert_not_called()
+        assert len(results) == 1
+        assert results[0][3] is True
+    
+    def test_unsigned_extension_falls_back_to_name(self):
+        """Test that formats without a signature are trusted by extension."""
+        extractor = ArchiveExtractor()
+        assert extractor._looks_like_archive("setup.exe", b"MZ\x90\x00")
+        assert not extractor._looks_like_archive("data.zip", b"MZ\x90\x00")
+        assert extractor._looks_like_archive("data.zip", None)
+
+
+class TestCopyStream:
+    """Tests for spilling streams to temp files."""
+    
+    def test_copy_regular_file_from_offset(self, tmp_path):
+        """Test in-kernel copy of a file tail into another file."""
+        src_path = tmp_path / "src.bin"
+        src_path.write_bytes(b"HEADER" + b"payload" * 1000)
+        dst_path = tmp_path / "dst.bin"
+        
+        with open(src_path, 'rb') as src, open(dst_path, 'wb') as dst:
+            src.seek(6)
+            copy_stream(src, dst)
+            dst.write(b"!")
+        
+        assert dst_path.read_bytes() == b"payload" * 1000 + b"!"
+    
+    def test_copy_falls_back_when_kernel_copy_fails(self, tmp_path):
+        """Test fallback to a buffered copy when the syscalls are unsupported."""
+        src_path = tmp_path / "src.bin"
+        src_path.write_bytes(b"x" * 5000)
+        dst_path = tmp_path / "dst.bin"
+        
+        with patch("core.extractor._kernel_copy", return_value=0):
+            with open(src_path, 'rb') as src, open(dst_path, 'wb') as dst:
+                copy_stream(src, dst)
+        
+        assert dst_path.read_bytes() == b"x" * 5000
+    
+    def test_copy_non_file_stream(self, tmp_path):
+        """Test that streams without a descriptor are copied in chunks."""
+        dst_path = tmp_path / "dst.bin"
+        with open(dst_path, 'wb') as dst:
+            copy_stream(io.BytesIO(b"in-memory"), dst)
+        
+        assert dst_path.read_bytes() == b"in-memory"
+
+
 class TestExtractTar:
     """Tests for TAR extraction."""
     
@@ -225,6 +351,23 @@ class TestExtractTar:
         
         assert len(results) == 1
         assert results[0][0] == "file.txt"
+    
+    def test_extract_tar_gz_streams_members_in_order(self, tmp_path):
+        """Test tar.gz members are yielded in one forward pass with correct contents."""
+        tar_path = tmp_path / "multi.tar.gz"
+        contents = {f"dir/file{i}.txt": f"member {i} ".encode() * (i + 1) for i in range(5)}
+        with tarfile.open(tar_path, 'w:gz') as tf:
+            for name, data in contents.items():
+                info = tarfile.TarInfo(name=name)
+                info.size = len(data)
+                tf.addfile(info, io.BytesIO(data))
+        
+        extractor = ArchiveExtractor()
+        with patch.object(tarfile.TarFile, 'getmembers', side_effect=AssertionError("second walk")):
+            results = [(name, stream.read(), size)
+                       for name, stream, size, _ in extractor.extract_archive(str(tar_path))]
+        
+        assert results == [(name, data, len(data)) for name, data in contents.items()]
 
 
 class TestRecursion:
@@ -324,18 +467,16 @@ class TestErrorHandling:
         """Test extraction from an .exe that is actually a ZIP SFX."""
         exe_file = tmp_path / "installer.exe"
         
-        # Create a ZIP file and save it as .exe
-        buf = io.BytesIO()
-        with zipfile.ZipFile(buf, 'w') as zf:
+        # Create a ZIP file directly under the .exe name
+        with zipfile.ZipFile(exe_file, 'w') as zf:
             zf.writestr("test.txt", "hello")
-        exe_file.write_bytes(buf.getvalue())
         
         extractor = ArchiveExtractor()
-        results = list(extractor.extract_archive(str(exe_file)))
+        results = [(path, stream.read()) for path, stream, _, _ in extractor.extract_archive(str(exe_file))]
         
         assert len(results) == 1
         assert results[0][0] == "test.txt"
-        assert results[0][1].read().decode() == "hello"
+        assert results[0][1].decode() == "hello"
 
     def test_extract_appimage_mock(self, tmp_path):
         """Test extraction logic for AppImage offset detection."""
@@ -345,10 +486,11 @@ class TestErrorHandling:
         buf = io.BytesIO()
         with zipfile.ZipFile(buf, 'w') as zf:
             zf.writestr("app.txt", "app content")
-        payload = buf.getvalue()
         
-        # ELF + Magic + Payload
-        appimage_file.write_bytes(b"ELF" + b"\x00" * 50 + b"hsqs" + payload)
+        # ELF + Magic + Payload (getbuffer() writes the payload without copying it)
+        with open(appimage_file, 'wb') as f:
+            f.write(b"ELF" + b"\x00" * 50 + b"hsqs")
+            f.write(buf.getbuffer())
         
         extractor = ArchiveExtractor()
         # Mock HAS_LIBARCHIVE to ensure we test the logic even if libarchive is missing
@@ -360,6 +502,64 @@ class TestErrorHandling:
         assert any(r[0] == "test.appimage/app.txt" for r in results)
 
 
+class TestExtractLibarchive:
+    """Tests for libarchive-backed formats (requires libarchive-c)."""
+    
+    def test_block_reader_reassembles_blocks(self):
+        """Test the block stream returns the blocks' bytes across read sizes."""
+        from core.extractor import _BlockReader
+        
+        reader = io.BufferedReader(_BlockReader([b"abc", b"", b"defgh", b"i"]), 4)
+        assert reader.peek(2)[:2] == b"ab"
+        assert reader.read(5) == b"abcde"
+        assert reader.read() == b"fghi"
+        assert reader.read() == b""
+    
+    def test_extract_cpio_streams_members(self, tmp_path, monkeypatch):
+        """Test cpio members stream their contents and nested archives are recursed."""
+        libarchive = pytest.importorskip("libarchive")
+        
+        big = tmp_path / "big.bin"
+        big.write_bytes(bytes(range(256)) * 1200)
+        inner = tmp_path / "inner.zip"
+        with zipfile.ZipFile(inner, 'w') as zf:
+            zf.writestr("in.txt", "inner data")
+        
+        cpio_path = tmp_path / "test.cpio"
+        monkeypatch.chdir(tmp_path)
+        with libarchive.file_writer(str(cpio_path), 'cpio') as archive:
+            archive.add_files("big.bin", "inner.zip")
+        
+        extractor = ArchiveExtractor()
+        results = {name: (stream.read(), size)
+                   for name, stream, size, _ in extractor.extract_archive(str(cpio_path))}
+        
+        assert results["big.bin"] == (big.read_bytes(), big.stat().st_size)
+        assert results["inner.zip/in.txt"] == (b"inner data", 10)
+
+
+    def test_large_cpio_member_streams_and_expires(self, tmp_path, monkeypatch):
+        """Test large entries stream lazily and refuse reads once the reader moves on."""
+        libarchive = pytest.importorskip("libarchive")
+        
+        (tmp_path / "big.bin").write_bytes(b"b" * 100_000)
+        (tmp_path / "small.txt").write_bytes(b"small")
+        cpio_path = tmp_path / "test.cpio"
+        monkeypatch.chdir(tmp_path)
+        with libarchive.file_writer(str(cpio_path), 'cpio') as archive:
+            archive.add_files("big.bin", "small.txt")
+        monkeypatch.setattr("core.extractor.LIBARCHIVE_BUFFER_LIMIT", 1000)
+        
+        extractor = ArchiveExtractor()
+        results = list(extractor.extract_archive(str(cpio_path)))
+        
+        assert [(name, size) for name, _, size, _ in results] == [("big.bin", 100_000), ("small.txt", 5)]
+        assert not isinstance(results[0][1], io.BytesIO)
+        with pytest.raises(ValueError):
+            results[0][1].read()
+        assert results[1][1].read() == b"small"
+
+
 class TestExtract7z:
     """Tests for 7z extraction (requires py7zr)."""
     
@@ -6,6 +6,7 @@ import tempfile
 import os
 from pathlib import Path
 from unittest.mock import patch, MagicMock
+from concurrent.futures import ThreadPoolExecutor
 from core.file_ops import FileOperations
 
 
@@ -56,6 +57,76 @@ class TestFileOperationsDelete:
         assert len(failures) == 1
         assert str(nonexistent) in [f[0] for f in failures]
     
+    def test_delete_files_threaded_large(self, tmp_path):
+        """Test large permanent deletes run on a thread pool."""
+        files = []
+        for i in range(50):
+            f = tmp_path / f"bulk{i}.txt"
+            f.write_text("x")
+            files.append(str(f))
+        missing = str(tmp_path / "bulk_missing.txt")
+        
+        with patch('core.file_ops.ThreadPoolExecutor', wraps=ThreadPoolExecutor) as pool:
+            successful, failures = FileOperations.delete_files(
+                files + [missing],
+                use_trash=False,
+                dry_run=False
+            )
+        
+        pool.assert_called_once()
+        assert successful == files
+        assert failures == [(missing, "File not found")]
+        assert not any(Path(f).exists() for f in files)
+    
+    def test_delete_files_result_membership(self, tmp_path):
+        """Test the result supports `in` checks and tuple unpacking."""
+        test_file = tmp_path / "member.txt"
+        test_file.write_text("x")
+        missing = tmp_path / "absent.txt"
+        
+        result = FileOperations.delete_files(
+            [str(test_file), str(missing)],
+            use_trash=False,
+            dry_run=False
+        )
+        
+        assert str(test_file) in result
+        assert str(missing) not in result
+        successful, failures = result
+        assert successful == result.successful == [str(test_file)]
+        assert failures == result.failures == [(str(missing), "File not found")]
+    
+    def test_delete_files_permanent_single_syscall(self, tmp_path):
+        """Test permanent deletion unlinks without a prior existence check."""
+        test_file = tmp_path / "once.txt"
+        test_file.write_text("content")
+        missing = tmp_path / "missing.txt"
+        
+        with patch('core.file_ops.Path.exists', side_effect=AssertionError):
+            successful, failures = FileOperations.delete_files(
+                [str(test_file), str(missing)],
+                use_trash=False,
+                dry_run=False
+            )
+        
+        assert successful == [str(test_file)]
+        assert failures == [(str(missing), "File not found")]
+        assert not test_file.exists()
+    
+    def test_delete_files_permission_error_same_in_both_paths(self, tmp_path, caplog):
+        """Test sequential and threaded permanent deletes report a PermissionError alike."""
+        from core.file_ops import MIN_THREADED_DELETES
+        
+        outcomes = []
+        for count in (1, MIN_THREADED_DELETES):
+            paths = [str(tmp_path / f"locked{count}_{i}.txt") for i in range(count)]
+            caplog.clear()
+            with patch('core.file_ops.os.unlink', side_effect=PermissionError("locked")):
+                _, failures = FileOperations.delete_files(paths, use_trash=False, dry_run=False)
+            outcomes.append((failures[0][1], caplog.records[0].getMessage().replace(paths[0], "<path>")))
+        
+        assert outcomes[0] == outcomes[1] == ("Permission denied: locked", "Failed to delete <path>: Permission denied: locked")
+    
     def test_delete_files_dry_run_nonexistent(self, tmp_path):
         """Test dry run with non-existent file."""
         nonexistent = tmp_path / "missing.txt"
@@ -171,6 +242,23 @@ class TestFileOperationsSize:
         """Test formatting PB."""
         assert FileOperations.format_size(1024 ** 5) == "1.0 PB"
     
+    def test_format_size_matches_division_loop(self):
+        """Test the bit-length lookup agrees with repeated division by 1024."""
+        def reference(size_bytes):
+            for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
+                if size_bytes < 1024.0:
+                    return f"{size_bytes:.1f} {unit}"
+                size_bytes /= 1024.0
+            return f"{size_bytes:.1f} PB"
+        
+        import random
+        rng = random.Random(1234)
+        values = [0, 1, 1023, 1024, 1025, 2 ** 70, 1.5 * 1024 ** 2]
+        values += [2 ** k + d for k in range(71) for d in (-1, 0, 1) if 2 ** k + d >= 0]
+        values += [rng.randrange(2 ** 70) for _ in range(2000)]
+        for value in values:
+            assert FileOperations.format_size(value) == reference(value), value
+    
     def test_get_total_size(self, tmp_path):
         """Test calculating total size."""
         file1 = tmp_path / "1.txt"
@@ -205,6 +293,28 @@ class TestFileOperationsSize:
         # Directory size varies by filesystem, just ensure it doesn't crash
         assert isinstance(total, int)
         assert total >= 0
+    
+    def test_get_total_size_many_files(self, tmp_path):
+        """Test concurrent stat of many files sums correctly."""
+        paths = []
+        for i in range(50):
+            f = tmp_path / f"{i}.bin"
+            f.write_bytes(b"z" * i)
+            paths.append(str(f))
+        
+        total = FileOperations.get_total_size(paths + [str(tmp_path / "missing")], max_workers=4)
+        assert total == sum(range(50))
+    
+    def test_get_total_size_stat_cache(self, tmp_path):
+        """Test cached sizes are used without stat'ing those paths."""
+        uncached = tmp_path / "uncached.txt"
+        uncached.write_bytes(b"x" * 10)
+        
+        total = FileOperations.get_total_size(
+            ["/not/on/disk", str(uncached)],
+            stat_cache={"/not/on/disk": 1000}
+        )
+        assert total == 1010
 
 
 class TestFileOperationsVerify:
@@ -253,3 +363,50 @@ class TestFileOperationsVerify:
         
         assert existing == []
         assert missing == []
+    
+    def test_verify_preserves_order_across_directories(self, tmp_path):
+        """Test results keep input order when paths span directories."""
+        (tmp_path / "a").mkdir()
+        (tmp_path / "b").mkdir()
+        paths = [
+            str(tmp_path / "a" / "1.txt"),
+            str(tmp_path / "b" / "1.txt"),
+            str(tmp_path / "a" / "2.txt"),
+            str(tmp_path / "a" / "gone.txt"),
+            str(tmp_path / "b" / "2.txt"),
+        ]
+        for p in paths:
+            if "gone" not in p:
+                Path(p).write_text("x")
+        
+        existing, missing = FileOperations.verify_files_exist(paths)
+        
+        assert existing == [paths[0], paths[1], paths[2], paths[4]]
+        assert missing == [paths[3]]
+    
+    def test_verify_shared_directory_skips_stat(self, tmp_path):
+        """Test files sharing a directory are found from one listing."""
+        paths = []
+        for i in range(5):
+            f = tmp_path / f"{i}.txt"
+            f.write_text("x")
+            paths.append(str(f))
+        
+        with patch('core.file_ops.os.path.exists', side_effect=AssertionError):
+            existing, missing = FileOperations.verify_files_exist(paths)
+        
+        assert existing == paths
+        assert missing == []
+    
+    def test_verify_dangling_symlink_missing(self, tmp_path):
+        """Test a symlink to a deleted file is reported missing."""
+        target = tmp_path / "target.txt"
+        link = tmp_path / "link.txt"
+        other = tmp_path / "other.txt"
+        other.write_text("x")
+        link.symlink_to(target)
+        
+        existing, missing = FileOperations.verify_files_exist([str(other), str(link)])
+        
+        assert existing == [str(other)]
+        assert missing == [str(link)]
@@ -4,6 +4,8 @@ Tests for core.hasher module.
 import pytest
 import tempfile
 import os
+import io
+from unittest.mock import patch
 from pathlib import Path
 from core.hasher import HashCalculator
 
@@ -29,6 +31,11 @@ class TestHashCalculator:
         assert hasher.partial_hash_size == 4096
         assert hasher.chunk_size == 32768
     
+    def test_init_unknown_algorithm(self):
+        """Test an unsupported algorithm is rejected up front."""
+        with pytest.raises(ValueError):
+            HashCalculator(algorithm="md4")
+    
     def test_hash_file_small(self, tmp_path):
         """Test hashing a small file (below threshold)."""
         hasher = HashCalculator(partial_hash_threshold=1024)
@@ -57,6 +64,18 @@ class TestHashCalculator:
         assert quick_hash is not None
         assert isinstance(quick_hash, str)
     
+    def test_hash_file_zero_threshold(self, tmp_path):
+        """Test a zero threshold treats every file as large."""
+        hasher = HashCalculator(partial_hash_threshold=0)
+        
+        test_file = tmp_path / "tiny.txt"
+        test_file.write_bytes(b"abc")
+        
+        full_hash, quick_hash = hasher.hash_file(str(test_file))
+        
+        assert full_hash is None
+        assert quick_hash == hasher._compute_partial_hash(str(test_file))
+    
     def test_hash_file_with_size(self, tmp_path):
         """Test hashing with provided file size."""
         hasher = HashCalculator(partial_hash_threshold=1024)
@@ -69,6 +88,97 @@ class TestHashCalculator:
         assert full_hash is not None
         assert quick_hash is None
     
+    def test_hash_file_known_size_skips_stat(self, tmp_path):
+        """Test a caller-supplied size avoids any stat/fstat call when uncached."""
+        hasher = HashCalculator(partial_hash_threshold=1024, cache_size=0)
+        
+        test_file = tmp_path / "test.txt"
+        test_file.write_bytes(b"test content")
+        
+        with patch("core.hasher.os.fstat", side_effect=AssertionError), \
+             patch("core.hasher.os.stat", side_effect=AssertionError):
+            full_hash, quick_hash = hasher.hash_file(str(test_file), file_size=12)
+        
+        assert full_hash == hasher._compute_full_hash(str(test_file))
+        assert quick_hash is None
+    
+    def test_hash_file_below_chunk_skips_mmap(self, tmp_path):
+        """Test files smaller than one chunk are read without a mapping."""
+        hasher = HashCalculator(chunk_size=65536)
+        
+        test_file = tmp_path / "small.txt"
+        test_file.write_bytes(b"a" * 1000)
+        expected = hasher._compute_full_hash_stream(io.BytesIO(b"a" * 1000))
+        
+        with patch("core.hasher.mmap.mmap", side_effect=AssertionError):
+            full_hash, _ = hasher.hash_file(str(test_file))
+        
+        assert full_hash == expected
+    
+    def test_hash_file_small_known_size_reads_once(self, tmp_path):
+        """Test a small file of known size is hashed with a single read."""
+        from core import hasher as hasher_module
+        hasher = HashCalculator(chunk_size=65536, cache_size=0)
+        
+        test_file = tmp_path / "small.txt"
+        test_file.write_bytes(b"b" * 1000)
+        expected = hasher._compute_full_hash_stream(io.BytesIO(b"b" * 1000))
+        
+        with patch("core.hasher._read_fd", wraps=hasher_module._read_fd) as read_fd:
+            full_hash, _ = hasher.hash_file(str(test_file), file_size=1000)
+        
+        assert full_hash == expected
+        assert read_fd.call_count == 1
+    
+    def test_hash_file_cache_hit(self, tmp_path):
+        """Test a second call for an unchanged file does not rehash it."""
+        hasher = HashCalculator()
+        
+        test_file = tmp_path / "cached.txt"
+        test_file.write_bytes(b"cache me")
+        
+        first = hasher.hash_file(str(test_file))
+        with patch.object(hasher, "_hash_sized", side_effect=AssertionError):
+            second = hasher.hash_file(str(test_file))
+        
+        assert first == second
+        assert first[0] is not None
+    
+    def test_hash_file_known_stat_skips_fstat_with_cache(self, tmp_path):
+        """Test a caller-supplied size and mtime key the cache without an fstat."""
+        hasher = HashCalculator()
+        
+        test_file = tmp_path / "known.txt"
+        test_file.write_bytes(b"known stat")
+        st = test_file.stat()
+        
+        with patch("core.hasher.os.fstat", side_effect=AssertionError):
+            first = hasher.hash_file(str(test_file), st.st_size, st.st_mtime)
+        with patch("core.hasher.os.open", side_effect=AssertionError):
+            second = hasher.hash_file(str(test_file), st.st_size, st.st_mtime)
+        
+        assert first == second
+        assert first[0] is not None
+        # A call that has to stat the file itself finds the same entry
+        with patch.object(hasher, "_hash_sized", side_effect=AssertionError):
+            assert hasher.hash_file(str(test_file)) == first
+    
+    def test_hash_file_cache_invalidated_on_change(self, tmp_path):
+        """Test a modified file is rehashed rather than served from cache."""
+        hasher = HashCalculator(cache_size=1)
+        
+        test_file = tmp_path / "changing.txt"
+        test_file.write_bytes(b"before")
+        before, _ = hasher.hash_file(str(test_file))
+        
+        test_file.write_bytes(b"after!")
+        st = test_file.stat()
+        os.utime(test_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        after, _ = hasher.hash_file(str(test_file))
+        
+        assert before != after
+        assert len(hasher._cache) == 1
+    
     def test_hash_file_nonexistent(self, tmp_path):
         """Test hashing a non-existent file."""
         hasher = HashCalculator()
@@ -118,6 +228,81 @@ class TestHashCalculator:
         
         assert hash1 != hash2
     
+    @pytest.mark.skipif(not hasattr(os, "posix_fadvise"), reason="posix_fadvise not available")
+    def test_fadvise_called(self, tmp_path):
+        """Test full-file hashing advises sequential access, then drops pages."""
+        hasher = HashCalculator(chunk_size=1024)
+        
+        test_file = tmp_path / "advised.bin"
+        test_file.write_bytes(b"f" * 10_000)
+        
+        with patch("core.hasher.os.posix_fadvise") as fadvise:
+            hasher._compute_full_hash(str(test_file))
+        
+        advice = [c.args[3] for c in fadvise.call_args_list]
+        assert advice == [os.POSIX_FADV_SEQUENTIAL, os.POSIX_FADV_DONTNEED]
+    
+    def test_unmappable_file_falls_back_to_stream(self, tmp_path):
+        """Test files that cannot be mapped hash the same via readinto()."""
+        hasher = HashCalculator(chunk_size=1024)
+        
+        content = os.urandom(300_000)
+        test_file = tmp_path / "unmappable.bin"
+        test_file.write_bytes(content)
+        expected = hasher._compute_full_hash(str(test_file))
+        
+        with patch("core.hasher.mmap.mmap", side_effect=OSError("no mmap")):
+            assert hasher._compute_full_hash(str(test_file)) == expected
+        assert hasher._compute_full_hash_stream(io.BytesIO(content), 7) == expected
+    
+    def test_reused_hasher_does_not_leak_state(self):
+        """Test pooled hashers are reset between uses."""
+        import xxhash
+        hasher = HashCalculator()
+        
+        hasher._compute_full_hash_stream(io.BytesIO(b"first"))
+        second = hasher._compute_full_hash_stream(io.BytesIO(b"second"))
+        full, quick = hasher._compute_dual_hash_stream(io.BytesIO(b"third"), 5)
+        
+        assert second == xxhash.xxh3_64(b"second").hexdigest()
+        assert full == quick == xxhash.xxh3_64(b"third").hexdigest()
+    
+    def test_hash_stream_no_alloc(self):
+        """Test stream hashing memory does not grow with stream size."""
+        import tracemalloc
+        hasher = HashCalculator(partial_hash_threshold=1024, chunk_size=65536)
+        
+        peaks = []
+        for size in (1024 * 1024, 8 * 1024 * 1024):
+            stream = io.BytesIO(b"s" * size)
+            tracemalloc.start()
+            try:
+                full_hash, quick_hash = hasher.hash_stream(stream, size)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+            assert full_hash and quick_hash
+            peaks.append(peak)
+        
+        assert peaks[1] < 4 * 65536
+        assert peaks[1] < peaks[0] + 65536
+    
+    def test_hash_many_matches_hash_file(self, tmp_path):
+        """Test that threaded hashing matches sequential hash_file results."""
+        hasher = HashCalculator(partial_hash_threshold=500)
+        
+        files = []
+        for i in range(20):
+            test_file = tmp_path / f"file{i}.bin"
+            test_file.write_bytes(bytes([i]) * (i * 50))
+            files.append((str(test_file), None))
+        
+        results = list(hasher.hash_many(files, max_workers=3))
+        
+        assert [r[0] for r in results] == [f[0] for f in files]
+        for filepath, full_hash, quick_hash in results:
+            assert (full_hash, quick_hash) == hasher.hash_file(filepath)
+    
     def test_hash_stream_small(self):
         """Test hashing a small stream."""
         hasher = HashCalculator(partial_hash_threshold=1024)
@@ -142,6 +327,28 @@ class TestHashCalculator:
         assert full_hash is not None
         assert quick_hash is not None
     
+    def test_dual_hash_matches_separate_hashes(self):
+        """Test one-pass dual hashing equals hashing the prefix and whole separately."""
+        import xxhash
+        
+        content = os.urandom(10_000)
+        for partial_size, chunk_size in ((100, 64), (64, 64), (1000, 4096), (20_000, 512)):
+            hasher = HashCalculator(partial_hash_size=partial_size, chunk_size=chunk_size)
+            expected = (xxhash.xxh3_64(content).hexdigest(),
+                        xxhash.xxh3_64(content[:partial_size]).hexdigest())
+            
+            assert hasher._compute_dual_hash_stream(io.BytesIO(content), len(content)) == expected
+            
+            class ReadOnly:
+                """Stream without readinto()."""
+                def __init__(self, data):
+                    self._stream = io.BytesIO(data)
+                
+                def read(self, n):
+                    return self._stream.read(n)
+            
+            assert hasher._compute_dual_hash_stream(ReadOnly(content), len(content)) == expected
+    
     def test_hash_stream_no_size(self):
         """Test hashing stream without size."""
         hasher = HashCalculator()
@@ -178,6 +385,25 @@ class TestHashCalculator:
         assert full is not None
         assert isinstance(full, str)
     
+    def test_compute_full_hash_matches_stream(self, tmp_path):
+        """Test that mmap-based file hashing matches stream hashing."""
+        hasher = HashCalculator()
+        
+        content = os.urandom(300_000)
+        test_file = tmp_path / "mapped.bin"
+        test_file.write_bytes(content)
+        
+        expected = hasher._compute_full_hash_stream(io.BytesIO(content))
+        assert hasher._compute_full_hash(str(test_file)) == expected
+        
+        # Force the sliced path for files above the whole-map limit, with
+        # page-aligned slices (released as they are hashed) and unaligned ones
+        import mmap
+        for slice_size in (mmap.PAGESIZE, 5000):
+            with patch("core.hasher.MMAP_WHOLE_FILE_LIMIT", 1000), \
+                 patch("core.hasher.MMAP_SLICE_SIZE", slice_size):
+                assert hasher._compute_full_hash(str(test_file)) == expected
+    
     def test_compute_full_hash_for_quick(self, tmp_path):
         """Test computing full hash from quick hash file."""
         hasher = HashCalculator()
@@ -229,3 +455,26 @@ class TestHashCalculator:
         expected = xxhash.xxh3_64(content[:10]).hexdigest()
         
         assert quick_hash == expected
+    
+    def test_read_buffers_reused_per_thread(self, tmp_path):
+        """Test reads share one pooled buffer per thread without mixing up contents."""
+        import threading
+        import xxhash
+        from core.hasher import _reusable_buffer
+        
+        assert _reusable_buffer(4096) is _reusable_buffer(4096)
+        other = []
+        thread = threading.Thread(target=lambda: other.append(_reusable_buffer(4096)))
+        thread.start()
+        thread.join()
+        assert other[0] is not _reusable_buffer(4096)
+        
+        hasher = HashCalculator(partial_hash_threshold=100, partial_hash_size=16, chunk_size=4096)
+        files = {}
+        for name, content in (("a.bin", b"a" * 50), ("b.bin", b"b" * 200), ("c.bin", b"c" * 30)):
+            files[name] = tmp_path / name
+            files[name].write_bytes(content)
+        
+        assert hasher.hash_file(str(files["a.bin"])) == (xxhash.xxh3_64(b"a" * 50).hexdigest(), None)
+        assert hasher.hash_file(str(files["b.bin"])) == (None, xxhash.xxh3_64(b"b" * 16).hexdigest())
+        assert hasher.hash_file(str(files["c.bin"])) == (xxhash.xxh3_64(b"c" * 30).hexdigest(), None)
@@ -3,7 +3,7 @@ Tests for core.models module.
 """
 import pytest
 from dataclasses import fields
-from core.models import FileEntry, DuplicateMatch, ArchiveInfo, ScanProgress, AppConfig
+from core.models import FileEntry, HashBloomFilter, DuplicateMatch, ArchiveInfo, ScanProgress, AppConfig
 
 
 class TestFileEntry:
@@ -90,6 +90,72 @@ class TestFileEntry:
             is_nested_archive=False
         )
         assert entry.source_archive is None
+    
+    def test_source_archive_interned(self):
+        """Test entries from the same archive share one path object."""
+        path_a = "".join(["/path/to/", "archive.zip"])
+        path_b = "".join(["/path/to/", "archive.zip"])
+        assert path_a is not path_b
+        
+        entry1 = FileEntry("h1", None, "a", "a", path_a, 1)
+        entry2 = FileEntry("h2", None, "b", "b", path_b, 1)
+        
+        assert entry1.source_archive is entry2.source_archive
+    
+    def test_file_entry_uses_slots(self):
+        """Test FileEntry has no per-instance __dict__."""
+        entry = FileEntry(
+            full_hash="hash",
+            quick_hash=None,
+            filename="a.txt",
+            path_in_archive="a.txt",
+            source_archive=None,
+            size=1
+        )
+        assert not hasattr(entry, "__dict__")
+
+
+class TestSlots:
+    """Tests that record dataclasses carry no per-instance __dict__."""
+    
+    def test_models_have_slots(self):
+        """Test DuplicateMatch, ArchiveInfo and ScanProgress use __slots__."""
+        source = FileEntry("h", None, "a", "a", "/x.zip", 1)
+        instances = [
+            DuplicateMatch(source_file=source, target_path="/t/a", target_size=1),
+            ArchiveInfo(path="/x.zip", mtime=0.0, size=1),
+            ScanProgress(phase="source_scan"),
+        ]
+        for instance in instances:
+            assert not hasattr(instance, "__dict__")
+
+
+class TestHashBloomFilter:
+    """Tests for HashBloomFilter."""
+    
+    def test_no_false_negatives(self):
+        """Test every added digest is reported as present."""
+        digests = [f"{i:016x}" for i in range(0, 50_000, 7)]
+        bloom = HashBloomFilter(len(digests))
+        for digest in digests:
+            bloom.add(digest)
+        
+        assert all(digest in bloom for digest in digests)
+    
+    def test_false_positive_rate_near_target(self):
+        """Test absent digests are mostly rejected at the configured rate."""
+        bloom = HashBloomFilter(5_000, error_rate=0.01)
+        for i in range(5_000):
+            bloom.add(f"present-{i}")
+        
+        false_positives = sum(f"absent-{i}" in bloom for i in range(20_000))
+        
+        assert false_positives < 20_000 * 0.03
+    
+    def test_empty_filter_rejects(self):
+        """Test an empty filter (even with zero capacity) contains nothing."""
+        bloom = HashBloomFilter(0)
+        assert "0123456789abcdef" not in bloom
 
 
 class TestDuplicateMatch:
@@ -151,6 +217,9 @@ class TestDuplicateMatch:
             target_size=5_242_880
         )
         assert match.size_mb == 5.0
+        
+        match.target_size = 1_048_576
+        assert match.size_mb == 1.0
     
     def test_duplicate_match_zero_size(self):
         """Test size_mb with zero size."""
@@ -198,6 +267,12 @@ class TestArchiveInfo:
         )
         assert info.name == "archive.zip"
     
+    def test_archive_info_name_cached(self):
+        """Test name is computed once and reused."""
+        info = ArchiveInfo(path="/home/user/backups/archive.zip", mtime=1.0, size=100)
+        assert info.name is info.name
+        assert info == ArchiveInfo(path="/home/user/backups/archive.zip", mtime=1.0, size=100)
+    
     def test_archive_info_needs_rescan_true(self):
         """Test needs_rescan returns True when modified."""
         info = ArchiveInfo(
@@ -404,3 +479,48 @@ class TestAppConfig:
         )
         errors = config.validate()
         assert len(errors) >= 3
+    
+    def test_add_dirs_skips_duplicates(self):
+        """Test directory helpers keep order and reject already-listed paths."""
+        config = AppConfig(source_dirs=["/a"])
+        
+        assert config.add_source_dir("/b") is True
+        assert config.add_source_dir("/a") is False
+        assert config.add_target_dir("/a") is True
+        assert config.add_target_dir("/a") is False
+        assert config.source_dirs == ["/a", "/b"]
+        assert config.target_dirs == ["/a"]
+    
+    def test_removed_dir_can_be_added_again(self):
+        """Test a removed directory can be added again."""
+        config = AppConfig(target_dirs=["/a", "/b"])
+        
+        assert config.remove_target_dir(0) == "/a"
+        assert config.add_target_dir("/a") is True
+        assert config.target_dirs == ["/b", "/a"]
+    
+    def test_add_dir_sees_direct_list_changes(self):
+        """Test paths appended straight to the list still count as listed."""
+        config = AppConfig()
+        config.source_dirs.append("/a")
+        
+        assert config.add_source_dir("/a") is False
+        assert config.source_dirs == ["/a"]
+    
+    def test_add_dir_sees_replaced_list(self):
+        """Test a list swapped for another of the same length is checked as it now is."""
+        config = AppConfig(source_dirs=["/a"])
+        config.source_dirs = ["/b"]
+        
+        assert config.add_source_dir("/b") is False
+        assert config.add_source_dir("/a") is True
+        assert config.source_dirs == ["/b", "/a"]
+    
+    def test_dir_helpers_add_no_dataclass_fields(self):
+        """Test the directory helpers keep no extra state in fields, asdict or equality."""
+        from dataclasses import asdict, fields
+        
+        config = AppConfig(source_dirs=["/a"])
+        assert not any(f.name.startswith("_") for f in fields(config))
+        assert set(asdict(config)) == {f.name for f in fields(AppConfig)}
+        assert config == AppConfig(source_dirs=["/a"])
@@ -1,6 +1,7 @@
 """
 Tests for core.scanner module.
 """
+import os
 import pytest
 import tempfile
 import zipfile
@@ -111,6 +112,22 @@ class TestSourceScanner:
         
         assert len(results) == 2
     
+    def test_scan_reuses_discovery_stat(self, config, db, tmp_path):
+        """Test archives are not stat'ed again after discovery."""
+        source_dir = tmp_path / "sources" / "sub"
+        source_dir.mkdir(parents=True)
+        with zipfile.ZipFile(source_dir / "test.zip", 'w') as zf:
+            zf.writestr("file.txt", "content")
+        (source_dir / "notes.txt").write_text("not an archive")
+        
+        config.parallel_workers = 1
+        scanner = SourceScanner(config, db)
+        with patch('core.scanner.Path.stat', side_effect=AssertionError):
+            results = scanner.scan_source_directories()
+        
+        assert list(results) == [str(source_dir / "test.zip")]
+        assert results[str(source_dir / "test.zip")].file_count == 1
+    
     def test_scan_skips_non_archive(self, config, db, tmp_path):
         """Test that non-archive files are skipped."""
         source_dir = tmp_path / "sources"
@@ -195,6 +212,67 @@ class TestSourceScanner:
         # Should still find the archive but might skip rescanning
         assert str(zip_path) in results
     
+    def test_rescan_loads_archive_records_in_bulk(self, config, db, tmp_path):
+        """Test unchanged archives are skipped without a lookup or an open each."""
+        source_dir = tmp_path / "sources"
+        source_dir.mkdir()
+        for i in range(3):
+            with zipfile.ZipFile(source_dir / f"test{i}.zip", 'w') as zf:
+                zf.writestr("file.txt", f"content {i}")
+        
+        config.parallel_workers = 1
+        config.recheck_archives = False
+        SourceScanner(config, db).scan_source_directories()
+        
+        scanner = SourceScanner(config, db)
+        with patch.object(db, 'get_archive_info') as lookup, \
+             patch.object(scanner.extractor, 'extract_archive') as extract:
+            results = scanner.scan_source_directories()
+        
+        assert len(results) == 3
+        lookup.assert_not_called()
+        extract.assert_not_called()
+    
+    def test_scan_stops_when_cancelled(self, config, db, tmp_path):
+        """Test a set cancel event stops the scan after the archive in progress."""
+        import threading
+        
+        source_dir = tmp_path / "sources"
+        source_dir.mkdir()
+        for i in range(3):
+            with zipfile.ZipFile(source_dir / f"archive{i}.zip", 'w') as zf:
+                zf.writestr("file.txt", f"Content {i}")
+        config.parallel_workers = 1
+        cancel = threading.Event()
+        
+        def cancel_after_first(progress):
+            if progress.archives_processed == 1:
+                cancel.set()
+        
+        scanner = SourceScanner(config, db, progress_callback=cancel_after_first, cancel_event=cancel)
+        with patch.object(db, 'optimize') as optimize:
+            results = scanner.scan_source_directories()
+        
+        assert len(results) == 1
+        optimize.assert_not_called()
+    
+    def test_scan_rehashes_after_hash_setting_change(self, config, db, tmp_path):
+        """Test that changing the hash settings forces a rescan of unchanged archives."""
+        source_dir = tmp_path / "sources"
+        source_dir.mkdir()
+        with zipfile.ZipFile(source_dir / "test.zip", 'w') as zf:
+            zf.writestr("file.txt", "content")
+        
+        config.recheck_archives = False
+        SourceScanner(config, db).scan_source_directories()
+        
+        config.partial_hash_size = 4096
+        scanner = SourceScanner(config, db)
+        with patch('core.scanner._collect_file_entries', return_value=[]) as collect:
+            scanner.scan_source_directories()
+        
+        collect.assert_called_once()
+    
     def test_scan_corrupt_zip(self, config, db, tmp_path):
         """Test handling of corrupt ZIP - should not be marked as checked."""
         source_dir = tmp_path / "sources"
@@ -210,6 +288,92 @@ class TestSourceScanner:
         # Corrupt archive should not be in results and not marked in database
         assert len(results) == 0  # Archive is NOT listed
         assert db.get_archive_info(str(corrupt_zip)) is None  # Not in database
+    
+    def test_parallel_scan_matches_sequential(self, config, tmp_path):
+        """Test that the process-pool scan stores the same entries as a sequential one."""
+        source_dir = tmp_path / "sources"
+        source_dir.mkdir()
+        
+        for i in range(3):
+            with zipfile.ZipFile(source_dir / f"archive{i}.zip", 'w') as zf:
+                for j in range(4):
+                    zf.writestr(f"file{j}.txt", f"Content {i}-{j}")
+        (source_dir / "corrupt.zip").write_bytes(b'PK\x03\x04\x00\x00\x00\x00')
+        
+        stored = []
+        for workers in (1, 2):
+            config.parallel_workers = workers
+            db = DatabaseManager(str(tmp_path / f"workers{workers}.db"))
+            db.connect()
+            results = SourceScanner(config, db).scan_source_directories()
+            stored.append((
+                {path: info.file_count for path, info in results.items()},
+                sorted((f.source_archive, f.path_in_archive, f.full_hash)
+                       for path in results for f in db.get_files_by_archive(path))
+            ))
+            db.close()
+        
+        assert stored[0] == stored[1]
+        assert len(stored[1][0]) == 3
+        assert str(source_dir / "corrupt.zip") not in stored[1][0]
+    
+    def test_parallel_scan_reports_per_file_progress(self, config, db, tmp_path):
+        """Test pool workers' per-file progress reaches the callback."""
+        from core.scanner import PROGRESS_INTERVAL
+        
+        source_dir = tmp_path / "sources"
+        source_dir.mkdir()
+        for i in range(2):
+            with zipfile.ZipFile(source_dir / f"archive{i}.zip", 'w') as zf:
+                for j in range(PROGRESS_INTERVAL * 8):
+                    zf.writestr(f"file{j}.txt", f"Content {i}-{j}")
+        config.parallel_workers = 2
+        updates = []
+        
+        SourceScanner(config, db, progress_callback=updates.append).scan_source_directories()
+        
+        per_file = [p for p in updates if (p.current_file or "").startswith("file")]
+        assert per_file
+        assert all(p.files_processed % PROGRESS_INTERVAL == 0 for p in per_file)
+    
+    def test_parallel_scan_cancelled_before_submit(self, config, db, tmp_path):
+        """Test a cancelled scan hands no archives to the pool."""
+        import threading
+        
+        source_dir = tmp_path / "sources"
+        source_dir.mkdir()
+        for i in range(3):
+            with zipfile.ZipFile(source_dir / f"archive{i}.zip", 'w') as zf:
+                zf.writestr("file.txt", f"Content {i}")
+        config.parallel_workers = 2
+        cancel = threading.Event()
+        cancel.set()
+        
+        with patch('core.scanner._scan_archive_worker') as worker:
+            results = SourceScanner(config, db, cancel_event=cancel).scan_source_directories()
+        
+        assert results == {}
+        worker.assert_not_called()
+    
+    def test_collect_stops_when_cancelled(self, tmp_path):
+        """Test archive extraction stops at the next member once cancelled."""
+        import threading
+        from core.scanner import _collect_file_entries, ScanCancelled
+        from core.hasher import HashCalculator
+        from core.extractor import ArchiveExtractor
+        
+        zip_path = tmp_path / "a.zip"
+        with zipfile.ZipFile(zip_path, 'w') as zf:
+            for j in range(3):
+                zf.writestr(f"file{j}.txt", f"Content {j}")
+        cancel = threading.Event()
+        
+        def cancel_after_first(path_in_archive, files_processed):
+            cancel.set()
+        
+        with pytest.raises(ScanCancelled):
+            _collect_file_entries(ArchiveExtractor(), HashCalculator(), str(zip_path), 0,
+                                  cancel_after_first, cancel)
 
 
 class TestTargetScanner:
@@ -294,9 +458,32 @@ class TestTargetScanner:
         target_file.write_text("unique content")
         
         scanner = TargetScanner(config, db)
-        results = scanner.scan_target_directories()
+        with patch.object(scanner.hasher, 'hash_file') as hash_file, \
+             patch.object(scanner, '_check_file') as check_file:
+            results = scanner.scan_target_directories()
         
         assert results == {}
+        hash_file.assert_not_called()
+        check_file.assert_not_called()
+    
+    def test_scan_stops_when_cancelled(self, config, db, tmp_path):
+        """Test a cancelled target scan checks no files and finds nothing."""
+        import threading
+        from core.models import FileEntry
+        
+        db.add_file(FileEntry("hash", None, "a.txt", "a.txt", "/path/source.zip", 100, False))
+        target_dir = tmp_path / "targets"
+        target_dir.mkdir()
+        (target_dir / "a.txt").write_bytes(b"x" * 100)
+        cancel = threading.Event()
+        cancel.set()
+        
+        scanner = TargetScanner(config, db, cancel_event=cancel)
+        with patch.object(scanner, '_check_file') as check_file:
+            results = scanner.scan_target_directories()
+        
+        assert results == {}
+        check_file.assert_not_called()
     
     def test_scan_respects_min_size(self, config, db, tmp_path):
         """Test that min_file_size is respected in target scan."""
@@ -313,12 +500,57 @@ class TestTargetScanner:
         config.min_file_size = 50
         
         scanner = TargetScanner(config, db)
-        files = scanner._find_files(str(target_dir))
+        files = [filepath for filepath, _ in scanner._iter_files(str(target_dir))]
         
         # Should only find large file
         assert len(files) == 1
         assert str(large_file) in files
     
+    def test_iter_files_walks_nested_and_skips_dir_symlinks(self, config, db, tmp_path):
+        """Test discovery recurses like os.walk and yields stat results."""
+        target_dir = tmp_path / "targets"
+        (target_dir / "a" / "b").mkdir(parents=True)
+        (target_dir / "top.txt").write_text("1")
+        (target_dir / "a" / "b" / "deep.txt").write_text("22")
+        (target_dir / "link").symlink_to(target_dir / "a", target_is_directory=True)
+        
+        scanner = TargetScanner(config, db)
+        found = dict(scanner._iter_files(str(target_dir)))
+        
+        assert set(found) == {str(target_dir / "top.txt"), str(target_dir / "a" / "b" / "deep.txt")}
+        assert found[str(target_dir / "a" / "b" / "deep.txt")].st_size == 2
+    
+    def test_iter_files_parallel_matches_sequential(self, config, db, tmp_path):
+        """Test the threaded directory walk finds the same files as the sequential one."""
+        target_dir = tmp_path / "targets"
+        for i in range(4):
+            for j in range(3):
+                subdir = target_dir / f"d{i}" / f"e{j}"
+                subdir.mkdir(parents=True)
+                (subdir / "file.txt").write_text("x" * (i + j))
+        (target_dir / "top.txt").write_text("top")
+        
+        walks = []
+        for workers in (1, 4):
+            config.parallel_workers = workers
+            scanner = TargetScanner(config, db)
+            walks.append({path: st.st_size for path, st in scanner._iter_files(str(target_dir))})
+        
+        assert walks[0] == walks[1]
+        assert len(walks[1]) == 13
+    
+    def test_scan_reuses_discovery_stat(self, config, db, tmp_path):
+        """Test target files are not stat'ed again after discovery."""
+        target_dir = tmp_path / "targets"
+        target_dir.mkdir()
+        (target_dir / "file.txt").write_text("content")
+        
+        scanner = TargetScanner(config, db)
+        with patch('core.scanner.Path.stat', side_effect=AssertionError):
+            results = scanner.scan_target_directories()
+        
+        assert results == {}
+    
     def test_scan_multiple_targets(self, config, db, tmp_path):
         """Test scanning multiple target directories."""
         from core.models import FileEntry
@@ -350,6 +582,10 @@ class TestTargetScanner:
         with patch('core.scanner.HashCalculator') as mock_hasher_class:
             mock_hasher = Mock()
             mock_hasher.hash_file.return_value = ("shared_hash", None)
+            # Batches are hashed through hash_many, which defers to hash_file
+            mock_hasher.hash_many.side_effect = lambda files, max_workers=None: (
+                (path, *mock_hasher.hash_file(path, size, mtime)) for path, size, mtime in files
+            )
             mock_hasher_class.return_value = mock_hasher
             
             scanner = TargetScanner(config, db)
@@ -358,6 +594,7 @@ class TestTargetScanner:
         # Should find duplicates in all targets
         assert len(results) == 1
         assert len(results["/path/source.zip"]) == 3
+        assert scanner.duplicate_count == 3
     
     def test_scan_progress_callback(self, config, db, tmp_path):
         """Test progress callback during target scan."""
@@ -375,6 +612,33 @@ class TestTargetScanner:
         # Callback should have been called (every 100 files)
         assert callback.called
     
+    def test_scan_progress_is_batched(self, config, db, tmp_path):
+        """Test per-file progress fires once per PROGRESS_INTERVAL checked files."""
+        from core.models import FileEntry
+        from core.scanner import PROGRESS_INTERVAL
+        
+        db.add_file(FileEntry(
+            full_hash="source_hash",
+            quick_hash=None,
+            filename="source.txt",
+            path_in_archive="source.txt",
+            source_archive="/path/source.zip",
+            size=10,
+            is_nested_archive=False
+        ))
+        target_dir = tmp_path / "targets"
+        target_dir.mkdir()
+        for i in range(2 * PROGRESS_INTERVAL + 5):
+            (target_dir / f"file{i:04d}.txt").write_text(f"{i:010d}")
+        
+        callback = Mock()
+        scanner = TargetScanner(config, db, progress_callback=callback)
+        scanner.scan_target_directories()
+        
+        # Start, two interval reports, completion
+        assert callback.call_count == 4
+        assert callback.call_args.args[0].files_processed == 2 * PROGRESS_INTERVAL + 5
+    
     def test_scan_quick_hash_collision(self, config, db, tmp_path):
         """Test handling of quick hash collision."""
         from core.models import FileEntry
@@ -409,6 +673,203 @@ class TestTargetScanner:
         
         # Since full hash doesn't match, no duplicates should be found
         assert results == {}
+    
+    def test_quick_hash_of_other_size_skips_candidates(self, config, db, tmp_path):
+        """Test a quick hash shared only with a source of another size is never queried."""
+        from core.models import FileEntry
+        
+        for size, quick_hash in ((2000000, "shared_quick"), (1000000, "other_quick")):
+            db.add_file(FileEntry(
+                full_hash=None,
+                quick_hash=quick_hash,
+                filename=f"{size}.bin",
+                path_in_archive=f"{size}.bin",
+                source_archive="/path/source.zip",
+                size=size,
+                is_nested_archive=False
+            ))
+        target_dir = tmp_path / "targets"
+        target_dir.mkdir()
+        (target_dir / "target.bin").write_bytes(b"z" * 1000000)
+        
+        with patch('core.scanner.HashCalculator') as mock_hasher_class:
+            mock_hasher = Mock()
+            mock_hasher.hash_file.return_value = (None, "shared_quick")
+            mock_hasher_class.return_value = mock_hasher
+            
+            scanner = TargetScanner(config, db)
+            with patch.object(db, 'find_candidates', wraps=db.find_candidates) as find_candidates:
+                results = scanner.scan_target_directories()
+        
+        assert results == {}
+        find_candidates.assert_not_called()
+        mock_hasher.compute_full_hash_for_quick.assert_not_called()
+    
+    def test_parallel_hashing_matches_sequential(self, config, db, tmp_path):
+        """Test batch hashing on a thread pool finds the same duplicates and caches hashes."""
+        from core.hasher import HashCalculator
+        from core.models import FileEntry
+        
+        target_dir = tmp_path / "targets"
+        target_dir.mkdir()
+        hasher = HashCalculator()
+        for i in range(6):
+            target_file = target_dir / f"file{i}.bin"
+            target_file.write_bytes(bytes([i]) * 64)
+            if i % 2 == 0:
+                full_hash, _ = hasher.hash_file(str(target_file))
+                db.add_file(FileEntry(
+                    full_hash=full_hash,
+                    quick_hash=None,
+                    filename=f"file{i}.bin",
+                    path_in_archive=f"file{i}.bin",
+                    source_archive="/path/source.zip",
+                    size=64,
+                    is_nested_archive=False
+                ))
+        
+        found = []
+        for workers in (1, 4):
+            config.parallel_workers = workers
+            scanner = TargetScanner(config, db)
+            results = scanner.scan_target_directories()
+            found.append(sorted(m.target_path for m in results["/path/source.zip"]))
+        
+        assert found[0] == found[1]
+        assert len(found[1]) == 3
+        assert db.get_target_file_info(str(target_dir / "file1.bin"))[2] is not None
+    
+    def test_target_hashing_oversubscribes_workers(self, config, db, tmp_path):
+        """Test target files are hashed with more threads than workers to overlap reads."""
+        from core.scanner import TARGET_HASH_THREADS_PER_WORKER
+        
+        config.parallel_workers = 3
+        scanner = TargetScanner(config, db)
+        files = []
+        for i in range(2):
+            target_file = tmp_path / f"file{i}.bin"
+            target_file.write_bytes(b"x" * 10)
+            files.append((str(target_file), 10, target_file.stat().st_mtime, None))
+        
+        with patch.object(scanner.hasher, 'hash_many', wraps=scanner.hasher.hash_many) as hash_many:
+            hashes = scanner._prefetch_hashes(files)
+        
+        assert hash_many.call_args.kwargs['max_workers'] == 3 * TARGET_HASH_THREADS_PER_WORKER
+        assert set(hashes) == {path for path, _, _, _ in files}
+    
+    def test_hard_links_hashed_once(self, config, db, tmp_path):
+        """Test several hard links to one file are read once and all matched."""
+        from core.models import FileEntry
+        
+        target_dir = tmp_path / "targets"
+        (target_dir / "a").mkdir(parents=True)
+        (target_dir / "b").mkdir()
+        original = target_dir / "a" / "data.bin"
+        original.write_bytes(b"linked" * 10)
+        os.link(original, target_dir / "a" / "copy.bin")
+        os.link(original, target_dir / "b" / "data.bin")
+        
+        scanner = TargetScanner(config, db)
+        full_hash, _ = scanner.hasher.hash_file(str(original), 60)
+        db.add_file(FileEntry(
+            full_hash=full_hash,
+            quick_hash=None,
+            filename="data.bin",
+            path_in_archive="data.bin",
+            source_archive="/path/source.zip",
+            size=60,
+            is_nested_archive=False
+        ))
+        
+        with patch.object(scanner.hasher, 'hash_file', wraps=scanner.hasher.hash_file) as hash_file:
+            results = scanner.scan_target_directories()
+        
+        assert hash_file.call_count == 1
+        assert len(results["/path/source.zip"]) == 3
+        assert db.get_target_file_info(str(target_dir / "b" / "data.bin"))[2] == full_hash
+    
+    def test_hash_filter_skips_lookup_for_unknown_hash(self, config, db, tmp_path):
+        """Test a same-size target whose hash no source has never queries by hash."""
+        from core.models import FileEntry
+        
+        db.add_file(FileEntry(
+            full_hash="source_hash",
+            quick_hash=None,
+            filename="source.txt",
+            path_in_archive="source.txt",
+            source_archive="/path/source.zip",
+            size=50,
+            is_nested_archive=False
+        ))
+        target_dir = tmp_path / "targets"
+        target_dir.mkdir()
+        (target_dir / "same_size.bin").write_bytes(b"t" * 50)
+        
+        scanner = TargetScanner(config, db)
+        with patch.object(db, 'find_by_full_hash', wraps=db.find_by_full_hash) as lookup:
+            results = scanner.scan_target_directories()
+        
+        assert results == {}
+        lookup.assert_not_called()
+    
+    def test_matches_resolved_per_batch(self, config, db, tmp_path):
+        """Test duplicate targets are resolved by bulk queries, keeping stored selections."""
+        from core.models import FileEntry
+        
+        target_dir = tmp_path / "targets"
+        target_dir.mkdir()
+        for name in ("a.bin", "b.bin", "c.bin"):
+            (target_dir / name).write_bytes(b"dup" * 20)
+        
+        scanner = TargetScanner(config, db)
+        full_hash, _ = scanner.hasher.hash_file(str(target_dir / "a.bin"), 60)
+        db.add_file(FileEntry(
+            full_hash=full_hash,
+            quick_hash=None,
+            filename="dup.bin",
+            path_in_archive="dup.bin",
+            source_archive="/path/source.zip",
+            size=60,
+            is_nested_archive=False
+        ))
+        db.set_selection_state(full_hash, str(target_dir / "b.bin"), not config.auto_select_duplicates)
+        
+        with patch.object(db, 'find_by_full_hash') as lookup, \
+             patch.object(db, 'get_selection_state') as state_lookup:
+            results = scanner.scan_target_directories()
+        
+        lookup.assert_not_called()
+        state_lookup.assert_not_called()
+        selected = {m.target_path: m.selected_for_deletion for m in results["/path/source.zip"]}
+        assert len(selected) == 3
+        assert selected[str(target_dir / "a.bin")] == config.auto_select_duplicates
+        assert selected[str(target_dir / "b.bin")] != config.auto_select_duplicates
+    
+    def test_size_filter_skips_unique(self, config, db, tmp_path):
+        """Test targets whose size matches no source file are never hashed."""
+        from core.models import FileEntry
+        
+        db.add_file(FileEntry(
+            full_hash="source_hash",
+            quick_hash=None,
+            filename="source.txt",
+            path_in_archive="source.txt",
+            source_archive="/path/source.zip",
+            size=50,
+            is_nested_archive=False
+        ))
+        
+        target_dir = tmp_path / "targets"
+        target_dir.mkdir()
+        for size in (10, 20, 30):
+            (target_dir / f"file{size}.bin").write_bytes(b"t" * size)
+        
+        scanner = TargetScanner(config, db)
+        with patch.object(scanner.hasher, 'hash_file') as hash_file:
+            results = scanner.scan_target_directories()
+        
+        assert results == {}
+        hash_file.assert_not_called()
 
 
 class TestScannerIntegration:
@@ -464,6 +925,46 @@ class TestScannerIntegration:
         finally:
             db.close()
     
+    def test_rescan_unchanged_tree_hashes_nothing(self, tmp_path):
+        """Test a second scan of unchanged sources and targets reads no file contents."""
+        source_dir = tmp_path / "sources"
+        target_dir = tmp_path / "targets"
+        source_dir.mkdir()
+        target_dir.mkdir()
+        
+        with zipfile.ZipFile(source_dir / "source.zip", 'w') as zf:
+            zf.writestr("test.txt", "duplicate content here")
+        for i in range(3):
+            (target_dir / f"copy{i}.txt").write_text("duplicate content here")
+        
+        config = AppConfig(
+            source_dirs=[str(source_dir)],
+            target_dirs=[str(target_dir)],
+            min_file_size=0
+        )
+        db = DatabaseManager(str(tmp_path / "test.db"))
+        db.connect()
+        
+        try:
+            SourceScanner(config, db).scan_source_directories()
+            first = TargetScanner(config, db).scan_target_directories()
+            
+            source_scanner = SourceScanner(config, db)
+            target_scanner = TargetScanner(config, db)
+            with patch.object(source_scanner.hasher, 'hash_stream') as hash_stream, \
+                 patch.object(target_scanner.hasher, 'hash_file') as hash_file, \
+                 patch.object(target_scanner.hasher, 'hash_many') as hash_many:
+                source_scanner.scan_source_directories()
+                second = target_scanner.scan_target_directories()
+            
+            hash_stream.assert_not_called()
+            hash_file.assert_not_called()
+            hash_many.assert_not_called()
+            assert len(second[str(source_dir / "source.zip")]) == len(first[str(source_dir / "source.zip")]) == 3
+        
+        finally:
+            db.close()
+    
     def test_scan_with_nested_archives(self, tmp_path):
         """Test scanning with nested archives."""
         source_dir = tmp_path / "sources"
@@ -43,6 +43,25 @@ class TestDirectoryInputScreen:
         # Invalid directory
         invalid_path = tmp_path / "does_not_exist"
         assert invalid_path.exists() is False
+    
+    def test_clean_path(self):
+        """Test pasted paths lose invisible characters and surrounding whitespace."""
+        from tui.app import DirectoryInputScreen
+        
+        assert DirectoryInputScreen._clean_path("\t/data/My\u00a0Files\u200b\n") == "/data/My Files"
+        assert DirectoryInputScreen._clean_path("\ufeff/srv/arch\x00ive ") == "/srv/archive"
+        assert DirectoryInputScreen._clean_path(" \u00a0 ") == ""
+    
+    def test_check_path(self, tmp_path):
+        """Test the off-loop path check reports existence, type and resolved path."""
+        from tui.app import DirectoryInputScreen
+        
+        file_path = tmp_path / "file.txt"
+        file_path.write_text("x")
+        
+        assert DirectoryInputScreen._check_path(str(tmp_path / ".")) == (True, True, str(tmp_path.resolve()))
+        assert DirectoryInputScreen._check_path(str(file_path))[:2] == (True, False)
+        assert DirectoryInputScreen._check_path(str(tmp_path / "missing"))[:2] == (False, False)
 
 
 class TestTUIScreens:
@@ -85,6 +104,26 @@ class TestTUIScreens:
         screen = MessageScreen("Test Title", "Test Message")
         assert screen.title == "Test Title"
         assert screen.message == "Test Message"
+    
+    @pytest.mark.asyncio
+    async def test_show_message_reuses_screen(self):
+        """Test popups share one message screen whose text is swapped in place."""
+        from tui.app import DupCleanerApp, MessageScreen
+        
+        app = DupCleanerApp(AppConfig())
+        async with app.run_test() as pilot:
+            app.show_message("Error", "First")
+            await pilot.pause()
+            first = app.screen
+            assert isinstance(first, MessageScreen)
+            first.action_dismiss_screen()
+            await pilot.pause()
+            
+            app.show_message("Info", "Second")
+            await pilot.pause()
+            assert app.screen is first
+            assert first.message == "Second"
+            assert "Second" in str(first._message_label.render())
 
 
 class TestDirectoryAddFlow:
@@ -121,6 +160,29 @@ class TestDirectoryAddFlow:
             config.target_dirs.append(new_path)
         assert config.target_dirs.count("/path") == 1
 
+    
+    @pytest.mark.asyncio
+    async def test_config_lists_update_in_place(self, tmp_path):
+        """Test adding and removing directories edits only the affected list entries."""
+        from tui.app import DupCleanerApp, ConfigScreen
+        
+        app = DupCleanerApp(AppConfig(target_dirs=["/tgt"]))
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            screen = app.screen
+            assert isinstance(screen, ConfigScreen)
+            source_list = screen.query_one("#source-list", ListView)
+            
+            app.config.add_source_dir(str(tmp_path))
+            await screen._on_directory_added("source", str(tmp_path))
+            assert len(source_list.children) == 1
+            assert "No source" not in str(source_list.children[0].query_one(Label).render())
+            
+            source_list.index = 0
+            await screen._remove_selected("source")
+            assert app.config.source_dirs == []
+            assert "No source" in str(source_list.children[0].query_one(Label).render())
+
 
 class TestNavigationBindings:
     """Tests for navigation bindings."""
@@ -193,6 +255,137 @@ class TestAppIntegration:
         # Config should be accessible
         assert app.config.source_dirs == ["/src1", "/src2"]
         assert app.config.target_dirs == ["/tgt1"]
+    
+    def test_event_loop_policy_falls_back_without_uvloop(self):
+        """Test the default asyncio loop is kept when uvloop is missing."""
+        from tui.app import install_event_loop_policy
+        
+        with patch('tui.app.HAS_UVLOOP', False), \
+             patch('asyncio.set_event_loop_policy') as set_policy:
+            assert install_event_loop_policy() is False
+        
+        set_policy.assert_not_called()
+
+
+class TestReviewScreen:
+    """Tests for the duplicate review screen's selection bookkeeping."""
+    
+    @staticmethod
+    def _match(full_hash, archive, target, selected=True):
+        from core.models import FileEntry, DuplicateMatch
+        
+        source = FileEntry(full_hash, None, "f.bin", "f.bin", archive, 10, False)
+        return DuplicateMatch(source_file=source, target_path=target, target_size=10,
+                              selected_for_deletion=selected)
+    
+    def test_selections_flattened_in_archive_order(self):
+        """Test matches are flattened in archive order with one selection per target."""
+        from tui.app import ReviewScreen
+        
+        duplicates = {
+            "/a.zip": [self._match("h1", "/a.zip", "/t/1"), self._match("h2", "/a.zip", "/t/2", selected=False)],
+            "/b.zip": [self._match("h3", "/b.zip", "/t/3")],
+        }
+        screen = ReviewScreen(AppConfig(), ":memory:", duplicates)
+        
+        assert screen.target_paths == ["/t/1", "/t/2", "/t/3"]
+        assert screen.selected == [True, False, True]
+        assert screen.matches[2] is duplicates["/b.zip"][0]
+        assert screen.target_idx == [0, 1, 2]
+    
+    @pytest.mark.asyncio
+    async def test_select_all_and_deselect_all(self):
+        """Test bulk selection flips every target but only redraws changed rows."""
+        from tui.app import ReviewScreen
+        
+        duplicates = {"/a.zip": [self._match("h1", "/a.zip", "/t/1", selected=False),
+                                 self._match("h2", "/a.zip", "/t/2")]}
+        screen = ReviewScreen(AppConfig(), ":memory:", duplicates)
+        screen._table = Mock()
+        screen.row_map = {1: 0, 2: 1}
+        screen.target_rows = [[1], [2]]
+        
+        await screen.action_select_all()
+        assert screen.selected == [True, True]
+        assert screen._table.update_cell_at.call_count == 1
+        await screen.action_select_all()
+        assert screen._table.update_cell_at.call_count == 1
+        await screen.action_deselect_all()
+        assert screen.selected == [False, False]
+        assert screen._table.update_cell_at.call_count == 3
+    
+    def test_unchecking_one_row_keeps_shared_target(self):
+        """Test unchecking any row of a target matched in several archives spares the file."""
+        from unittest.mock import PropertyMock
+        from tui.app import ReviewScreen
+        
+        duplicates = {
+            "/a.zip": [self._match("h2", "/a.zip", "/t/f2.bin")],
+            "/b.tgz": [self._match("h2", "/b.tgz", "/t/f2.bin"), self._match("h3", "/b.tgz", "/t/f3.bin")],
+        }
+        screen = ReviewScreen(AppConfig(), ":memory:", duplicates)
+        assert screen.target_idx == [0, 0, 1]
+        screen._table = Mock(cursor_row=1)
+        screen.row_map = {1: 0, 3: 1, 4: 2}
+        screen.target_rows = [[1, 3], [4]]
+        
+        screen.action_toggle_selection()
+        assert screen.selected == [False, True]
+        redrawn = [call.args for call in screen._table.update_cell_at.call_args_list]
+        assert [coord.row for coord, _ in redrawn] == [1, 3]
+        assert all(mark == "[ ]" for _, mark in redrawn)
+        
+        app = Mock()
+        with patch.object(ReviewScreen, 'app', new_callable=PropertyMock, return_value=app):
+            screen._continue_to_confirmation()
+        
+        confirmation = app.push_screen.call_args.args[0]
+        assert confirmation.selected_files == ["/t/f3.bin"]
+    
+    def test_continue_lists_each_target_once(self):
+        """Test a target matching several archives is only queued for deletion once."""
+        from unittest.mock import PropertyMock
+        from tui.app import ReviewScreen
+        
+        duplicates = {
+            "/a.zip": [self._match("h1", "/a.zip", "/t/1"), self._match("h2", "/a.zip", "/t/2", selected=False)],
+            "/b.zip": [self._match("h1", "/b.zip", "/t/1")],
+        }
+        screen = ReviewScreen(AppConfig(), ":memory:", duplicates)
+        app = Mock()
+        
+        with patch.object(ReviewScreen, 'app', new_callable=PropertyMock, return_value=app):
+            screen._continue_to_confirmation()
+        
+        confirmation = app.push_screen.call_args.args[0]
+        assert confirmation.selected_files == ["/t/1"]
+        assert confirmation.total_size == 10
+
+
+class TestConfirmationScreen:
+    """Tests for the final confirmation step."""
+    
+    @pytest.mark.asyncio
+    async def test_deletion_runs_off_event_loop(self):
+        """Test files are deleted on a worker thread and the result is reported."""
+        import threading
+        from unittest.mock import PropertyMock
+        from tui.app import ConfirmationScreen
+        
+        screen = ConfirmationScreen(AppConfig(dry_run=True), ":memory:", ["/t/1"], {}, total_size=10)
+        app = Mock()
+        threads = []
+        
+        def fake_delete(filepaths, use_trash=True, dry_run=False):
+            threads.append(threading.current_thread())
+            return filepaths, []
+        
+        with patch.object(ConfirmationScreen, 'app', new_callable=PropertyMock, return_value=app), \
+             patch('tui.app.FileOperations.delete_files', side_effect=fake_delete):
+            await screen._execute_deletion()
+        
+        assert threads and threads[0] is not threading.main_thread()
+        app.show_message.assert_called_once_with("Complete", "[DRY RUN] Would delete 1 files")
 
 
 class TestTUIWidgets:
@@ -275,6 +468,24 @@ class TestSettingsPersistence:
         
         assert config.keep_database is False
         assert config.dry_run is True
+    
+    @pytest.mark.parametrize("entered, expected", [
+        ("2048", 2048), (" 0 ", 0), ("+5", 5), ("1_000", 1000),
+        ("-1", 1024), ("abc", 1024), ("", 1024),
+    ])
+    def test_min_size_saved_when_int_parses(self, entered, expected):
+        """Test the min-size field takes anything int() parses unless it is negative."""
+        from tui.app import SettingsScreen
+        
+        config = AppConfig(min_file_size=1024)
+        screen = SettingsScreen(config)
+        screen._delete_radios = Mock(pressed_button=None)
+        screen._checkboxes = {}
+        screen._min_size_input = Mock(value=entered)
+        with patch.object(SettingsScreen, 'action_go_back'):
+            screen._save_settings()
+        
+        assert config.min_file_size == expected
 
 
 class TestEdgeCases:
@@ -355,6 +566,71 @@ class TestScanningScreenThreading:
         assert retrieved.phase == "source_scan"
         assert retrieved.current_archive == "test.zip"
     
+    @pytest.mark.asyncio
+    async def test_progress_updater_draws_latest_of_burst(self):
+        """Test thread-posted updates wake the updater and a burst is drawn once."""
+        import threading
+        from unittest.mock import AsyncMock
+        from core.models import ScanProgress
+        from tui.app import ScanningScreen
+        
+        screen = ScanningScreen(AppConfig(db_path=":memory:"))
+        screen._loop = asyncio.get_running_loop()
+        screen._update_ui = AsyncMock()
+        
+        def post_burst():
+            for i in range(1, 4):
+                screen._post_from_thread(ScanProgress(phase="target_scan", files_processed=i, total_files=3))
+            screen._post_from_thread(None)
+        
+        poster = threading.Thread(target=post_burst)
+        poster.start()
+        poster.join()
+        await asyncio.wait_for(screen._progress_updater(), timeout=1.0)
+        
+        assert screen._scan_complete.is_set()
+        screen._update_ui.assert_awaited_once()
+        assert screen._update_ui.await_args.args[0].files_processed == 3
+    
+    @pytest.mark.asyncio
+    async def test_progress_updater_coalesces_between_frames(self):
+        """Test updates arriving during the frame interval are drawn as one."""
+        from unittest.mock import AsyncMock
+        from core.models import ScanProgress
+        from tui.app import ScanningScreen
+        
+        screen = ScanningScreen(AppConfig(db_path=":memory:"))
+        screen._update_ui = AsyncMock()
+        queue = screen._progress_queue
+        
+        queue.put_nowait(ScanProgress(phase="target_scan", files_processed=1))
+        updater = asyncio.create_task(screen._progress_updater())
+        await asyncio.sleep(0)  # first redraw, then the frame pause
+        for i in (2, 3):
+            queue.put_nowait(ScanProgress(phase="target_scan", files_processed=i))
+        queue.put_nowait(None)
+        await asyncio.wait_for(updater, timeout=1.0)
+        
+        drawn = [call.args[0].files_processed for call in screen._update_ui.await_args_list]
+        assert drawn == [1, 3]
+    
+    def test_progress_queue_drops_oldest_when_full(self):
+        """Test a burst beyond the queue bound keeps the newest updates and the end marker."""
+        from core.models import ScanProgress
+        from tui.app import ScanningScreen, PROGRESS_QUEUE_SIZE
+        
+        screen = ScanningScreen(AppConfig(db_path=":memory:"))
+        for i in range(PROGRESS_QUEUE_SIZE + 10):
+            screen._enqueue_progress(ScanProgress(phase="target_scan", files_processed=i))
+        screen._enqueue_progress(None)
+        
+        queue = screen._progress_queue
+        assert queue.qsize() == PROGRESS_QUEUE_SIZE
+        assert queue.get_nowait().files_processed == 11
+        items = [queue.get_nowait() for _ in range(PROGRESS_QUEUE_SIZE - 1)]
+        assert items[-2].files_processed == PROGRESS_QUEUE_SIZE + 9
+        assert items[-1] is None
+    
     def test_scanning_screen_creation(self):
         """Test ScanningScreen can be created."""
         from tui.app import ScanningScreen
@@ -5,20 +5,60 @@ from textual.app import App, ComposeResult
 from textual.containers import Container, Horizontal, Vertical, ScrollableContainer
 from textual.widgets import Header, Footer, Button, Static, Input, Label, ListView, ListItem, ProgressBar, Checkbox, Select, RadioSet, RadioButton, DataTable
 from textual.binding import Binding
+from textual.coordinate import Coordinate
 from textual.screen import Screen
 from textual.worker import Worker
 from pathlib import Path
 import logging
 import asyncio
-from typing import List, Dict, Optional
+import os
+import re
+import stat
+import threading
+from functools import partial
+from typing import List, Dict, Optional, Tuple
 
 from core.models import AppConfig, DuplicateMatch, ArchiveInfo, ScanProgress
 from core.database import DatabaseManager
 from core.scanner import SourceScanner, TargetScanner
 from core.file_ops import FileOperations
 
+# Optional faster event loop (libuv based; not available on Windows)
+try:
+    import uvloop
+    HAS_UVLOOP = True
+except ImportError:
+    HAS_UVLOOP = False
+
 logger = logging.getLogger(__name__)
 
+# Invisible characters that sneak into pasted paths: control characters and
+# zero-width spaces/joiners/BOM are dropped, non-breaking spaces become spaces
+_PATH_JUNK_RE = re.compile(r"[\x00-\x1f\x7f\u200b-\u200d\u2060\ufeff]")
+
+# Minimum time between two scan progress redraws (caps them at ~30 per second)
+PROGRESS_FRAME_INTERVAL = 1 / 30
+
+# Most scan progress updates held between redraws; each is a full snapshot,
+# so the oldest are dropped when a burst outruns the screen
+PROGRESS_QUEUE_SIZE = 64
+
+
+def install_event_loop_policy() -> bool:
+    """
+    Make uvloop the asyncio event loop for the app, if it is installed.
+    
+    Must be called before App.run(), which creates the loop. Falls back
+    silently to the default asyncio loop.
+    
+    Returns:
+        True if uvloop was installed
+    """
+    if not HAS_UVLOOP:
+        return False
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
+
 
 class ConfigScreen(Screen):
     """Initial configuration screen."""
@@ -70,12 +110,17 @@ class ConfigScreen(Screen):
     
     async def on_mount(self) -> None:
         """Update the lists and settings summary when screen is mounted."""
+        self._dir_lists = {
+            "source": self.query_one("#source-list", ListView),
+            "target": self.query_one("#target-list", ListView),
+        }
+        self._settings_summary = self.query_one("#settings-summary", Static)
         await self._update_lists()
         self._update_settings_summary()
     
     def _update_settings_summary(self) -> None:
         """Update the settings summary display."""
-        summary = self.query_one("#settings-summary", Static)
+        summary = self._settings_summary
         
         method = "🗑️ Trash" if self.config.delete_method == "trash" else "⚠️ Permanent"
         keep_db = "Yes" if self.config.keep_database else "No"
@@ -91,65 +136,69 @@ class ConfigScreen(Screen):
             f"Min Size: {FileOperations.format_size(self.config.min_file_size)}"
         )
     
+    def _dirs(self, dir_type: str) -> List[str]:
+        """Configured directories of one kind ("source" or "target")."""
+        return self.config.source_dirs if dir_type == "source" else self.config.target_dirs
+    
+    @staticmethod
+    def _dir_item(dir_type: str, path: str) -> ListItem:
+        """List entry showing one configured directory."""
+        return ListItem(Label(f"  • {path}", classes=f"path-{dir_type}"))
+    
+    @staticmethod
+    def _empty_item(dir_type: str) -> ListItem:
+        """Placeholder entry for a list without directories."""
+        return ListItem(Label(f"  (No {dir_type} directories added)", classes="text-muted"))
+    
     async def _update_lists(self) -> None:
-        """Update the source and target lists from config."""
-        # Update source list
-        source_list = self.query_one("#source-list", ListView)
-        await source_list.clear()
-        for idx, src in enumerate(self.config.source_dirs):
-            source_list.append(ListItem(
-                Label(f"  • {src}", classes="path-source"),
-                id=f"source-{idx}"
-            ))
-        if not self.config.source_dirs:
-            source_list.append(ListItem(Label("  (No source directories added)", classes="text-muted")))
+        """Fill the source and target lists from config."""
+        for dir_type, dir_list in self._dir_lists.items():
+            await dir_list.clear()
+            dirs = self._dirs(dir_type)
+            if dirs:
+                await dir_list.extend(self._dir_item(dir_type, path) for path in dirs)
+            else:
+                await dir_list.append(self._empty_item(dir_type))
+    
+    async def _remove_selected(self, dir_type: str) -> None:
+        """Remove the highlighted directory of one kind, updating only its entry."""
+        dir_list = self._dir_lists[dir_type]
+        idx = dir_list.index
+        if idx is None or not 0 <= idx < len(self._dirs(dir_type)):
+            return
         
-        # Update target list
-        target_list = self.query_one("#target-list", ListView)
-        await target_list.clear()
-        for idx, tgt in enumerate(self.config.target_dirs):
-            target_list.append(ListItem(
-                Label(f"  • {tgt}", classes="path-target"),
-                id=f"target-{idx}"
-            ))
-        if not self.config.target_dirs:
-            target_list.append(ListItem(Label("  (No target directories added)", classes="text-muted")))
+        if dir_type == "source":
+            removed = self.config.remove_source_dir(idx)
+        else:
+            removed = self.config.remove_target_dir(idx)
+        await dir_list.pop(idx)
+        if not self._dirs(dir_type):
+            await dir_list.append(self._empty_item(dir_type))
+        self.app.show_message("Removed", f"Removed {dir_type}: {removed}")
     
     async def action_remove_source(self) -> None:
         """Remove selected source directory."""
-        source_list = self.query_one("#source-list", ListView)
-        if source_list.index is not None:
-            idx = source_list.index
-            if 0 <= idx < len(self.config.source_dirs):
-                removed = self.config.source_dirs.pop(idx)
-                await self._update_lists()
-                self.app.push_screen(MessageScreen("Removed", f"Removed source: {removed}"))
+        await self._remove_selected("source")
     
     async def action_remove_target(self) -> None:
         """Remove selected target directory."""
-        target_list = self.query_one("#target-list", ListView)
-        if target_list.index is not None:
-            idx = target_list.index
-            if 0 <= idx < len(self.config.target_dirs):
-                removed = self.config.target_dirs.pop(idx)
-                await self._update_lists()
-                self.app.push_screen(MessageScreen("Removed", f"Removed target: {removed}"))
+        await self._remove_selected("target")
     
-    def on_button_pressed(self, event: Button.Pressed) -> None:
+    async def on_button_pressed(self, event: Button.Pressed) -> None:
         if event.button.id == "add-source":
             self.app.push_screen(
                 DirectoryInputScreen("Add Source Directory", "source"),
-                callback=self._on_directory_added
+                callback=partial(self._on_directory_added, "source")
             )
         elif event.button.id == "add-target":
             self.app.push_screen(
                 DirectoryInputScreen("Add Target Directory", "target"),
-                callback=self._on_directory_added
+                callback=partial(self._on_directory_added, "target")
             )
         elif event.button.id == "remove-source":
-            self.action_remove_source()
+            await self.action_remove_source()
         elif event.button.id == "remove-target":
-            self.action_remove_target()
+            await self.action_remove_target()
         elif event.button.id == "settings-btn":
             self.action_settings()
         elif event.button.id == "start-btn":
@@ -157,10 +206,15 @@ class ConfigScreen(Screen):
         elif event.button.id == "quit-btn":
             self.app.exit()
     
-    async def _on_directory_added(self, result: Optional[str]) -> None:
-        """Callback when directory input screen closes."""
-        if result:
-            await self._update_lists()
+    async def _on_directory_added(self, dir_type: str, result: Optional[str]) -> None:
+        """Callback when directory input screen closes: append the new entry."""
+        if not result:
+            return
+        dir_list = self._dir_lists[dir_type]
+        if len(self._dirs(dir_type)) == 1:
+            # The list only held the placeholder
+            await dir_list.clear()
+        await dir_list.append(self._dir_item(dir_type, result))
     
     def action_settings(self) -> None:
         """Open settings screen."""
@@ -173,7 +227,7 @@ class ConfigScreen(Screen):
     def action_start_scan(self) -> None:
         """Start scanning."""
         if not self.config.source_dirs or not self.config.target_dirs:
-            self.app.push_screen(MessageScreen("Error", "Please add at least one source and one target directory."))
+            self.app.show_message("Error", "Please add at least one source and one target directory.")
             return
         self.app.push_screen(ScanningScreen(self.config))
 
@@ -204,44 +258,58 @@ class DirectoryInputScreen(Screen):
             id="directory-input-container"
         )
     
+    def on_mount(self) -> None:
+        """Look up the path input once; every Add press reads it."""
+        self._dir_input = self.query_one("#dir-input", Input)
+    
     def on_button_pressed(self, event: Button.Pressed) -> None:
         if event.button.id == "add-btn":
-            self._try_add_directory()
+            self.run_worker(self._try_add_directory(), exclusive=True, group="dir_input")
         elif event.button.id == "cancel-btn":
             self.action_go_back()
     
-    def _try_add_directory(self) -> None:
+    @staticmethod
+    def _clean_path(raw: str) -> str:
+        """Strip invisible pasted characters and surrounding whitespace from a path."""
+        return _PATH_JUNK_RE.sub("", raw).replace("\u00a0", " ").strip()
+    
+    @staticmethod
+    def _check_path(path: str) -> Tuple[bool, bool, str]:
+        """Stat and resolve a path; blocking, so run it off the event loop."""
+        path_obj = Path(path)
+        try:
+            is_dir = stat.S_ISDIR(path_obj.stat().st_mode)
+        except OSError:
+            return False, False, path
+        return True, is_dir, str(path_obj.resolve())
+    
+    async def _try_add_directory(self) -> None:
         """Try to add the directory."""
-        input_widget = self.query_one("#dir-input", Input)
-        path = input_widget.value.strip()
+        path = self._clean_path(self._dir_input.value)
         
         if not path:
-            self.app.push_screen(MessageScreen("Error", "Please enter a directory path."))
+            self.app.show_message("Error", "Please enter a directory path.")
             return
         
-        path_obj = Path(path)
-        if not path_obj.exists():
-            self.app.push_screen(MessageScreen("Error", f"Path does not exist: {path}"))
+        # A stat on a network or FUSE mount can take seconds; keep the UI live
+        exists, is_dir, abs_path = await asyncio.to_thread(self._check_path, path)
+        if not exists:
+            self.app.show_message("Error", f"Path does not exist: {path}")
             return
         
-        if not path_obj.is_dir():
-            self.app.push_screen(MessageScreen("Error", f"Path is not a directory: {path}"))
+        if not is_dir:
+            self.app.show_message("Error", f"Path is not a directory: {path}")
             return
         
-        # Resolve to absolute path
-        abs_path = str(path_obj.resolve())
-        
         if self.dir_type == "source":
-            if abs_path in self.app.config.source_dirs:
-                self.app.push_screen(MessageScreen("Info", "Directory already in source list."))
+            if not self.app.config.add_source_dir(abs_path):
+                self.app.show_message("Info", "Directory already in source list.")
                 return
-            self.app.config.source_dirs.append(abs_path)
             self.dismiss(abs_path)
         else:
-            if abs_path in self.app.config.target_dirs:
-                self.app.push_screen(MessageScreen("Info", "Directory already in target list."))
+            if not self.app.config.add_target_dir(abs_path):
+                self.app.show_message("Info", "Directory already in target list.")
                 return
-            self.app.config.target_dirs.append(abs_path)
             self.dismiss(abs_path)
     
     def action_go_back(self) -> None:
@@ -266,26 +334,39 @@ class SettingsScreen(Screen):
         self.config = config
     
     def compose(self) -> ComposeResult:
+        # Keep the inputs as they are built so saving needs no DOM queries;
+        # checkboxes are keyed by the AppConfig attribute they edit
+        self._delete_radios = RadioSet(
+            RadioButton("🗑️  Move to Trash (safer)", id="trash", value=self.config.delete_method == "trash"),
+            RadioButton("⚠️  Permanent Delete (cannot be undone)", id="permanent", value=self.config.delete_method == "permanent"),
+            id="delete-method-radios"
+        )
+        self._checkboxes = {
+            "keep_database": Checkbox("Keep database", value=self.config.keep_database, id="keep-db"),
+            "recheck_archives": Checkbox("Recheck archives", value=self.config.recheck_archives, id="recheck"),
+            "recheck_targets": Checkbox("Recheck already scanned files", value=self.config.recheck_targets, id="recheck-targets"),
+            "auto_select_duplicates": Checkbox("Auto-select duplicates", value=self.config.auto_select_duplicates, id="auto-select"),
+            "dry_run": Checkbox("Dry run mode", value=self.config.dry_run, id="dry-run"),
+        }
+        self._min_size_input = Input(str(self.config.min_file_size), id="min-size")
+        checkboxes = self._checkboxes
+        
         yield Container(
             Static("⚙️  Settings", classes="header"),
             Label(""),
             Label("Delete method:", classes="setting-label"),
-            RadioSet(
-                RadioButton("🗑️  Move to Trash (safer)", id="trash", value=self.config.delete_method == "trash"),
-                RadioButton("⚠️  Permanent Delete (cannot be undone)", id="permanent", value=self.config.delete_method == "permanent"),
-                id="delete-method-radios"
-            ),
+            self._delete_radios,
             Label(""),
-            Checkbox("Keep database", value=self.config.keep_database, id="keep-db"),
-            Checkbox("Recheck archives", value=self.config.recheck_archives, id="recheck"),
-            Checkbox("Recheck already scanned files", value=self.config.recheck_targets, id="recheck-targets"),
+            checkboxes["keep_database"],
+            checkboxes["recheck_archives"],
+            checkboxes["recheck_targets"],
             Label("  (Files are always rechecked if metadata or size changed)", classes="text-muted"),
-            Checkbox("Auto-select duplicates", value=self.config.auto_select_duplicates, id="auto-select"),
-            Checkbox("Dry run mode", value=self.config.dry_run, id="dry-run"),
+            checkboxes["auto_select_duplicates"],
+            checkboxes["dry_run"],
             Label(""),
             Horizontal(
                 Label("Min file size (bytes): "),
-                Input(str(self.config.min_file_size), id="min-size"),
+                self._min_size_input,
             ),
             Label(""),
             Horizontal(
@@ -304,19 +385,19 @@ class SettingsScreen(Screen):
     def _save_settings(self) -> None:
         """Save settings and go back."""
         # Get delete method from RadioSet
-        radios = self.query_one("#delete-method-radios", RadioSet)
+        radios = self._delete_radios
         if radios.pressed_button:
             self.config.delete_method = str(radios.pressed_button.id)
         
-        self.config.keep_database = self.query_one("#keep-db", Checkbox).value
-        self.config.recheck_archives = self.query_one("#recheck", Checkbox).value
-        self.config.recheck_targets = self.query_one("#recheck-targets", Checkbox).value
-        self.config.auto_select_duplicates = self.query_one("#auto-select", Checkbox).value
-        self.config.dry_run = self.query_one("#dry-run", Checkbox).value
+        for attr, checkbox in self._checkboxes.items():
+            setattr(self.config, attr, checkbox.value)
+        # Anything int() rejects, or a negative size, keeps the old value
         try:
-            self.config.min_file_size = int(self.query_one("#min-size", Input).value)
+            min_size = int(self._min_size_input.value)
         except ValueError:
-            pass
+            min_size = -1
+        if min_size >= 0:
+            self.config.min_file_size = min_size
         self.action_go_back()
     
     def action_go_back(self) -> None:
@@ -341,9 +422,14 @@ class ScanningScreen(Screen):
         self.db = None
         self.duplicates_by_archive = {}
         self._cancelled = False
+        # Tells the scanners to stop early; _cancelled alone is only seen
+        # between scan phases
+        self._cancel_event = threading.Event()
         self._is_ui_complete = False
-        self._progress_queue = asyncio.Queue()
+        # ScanProgress, then None when the scan ends
+        self._progress_queue = asyncio.Queue(maxsize=PROGRESS_QUEUE_SIZE)
         self._scan_complete = asyncio.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
     
     def compose(self) -> ComposeResult:
         yield Container(
@@ -360,31 +446,79 @@ class ScanningScreen(Screen):
     
     async def on_mount(self) -> None:
         """Start scanning when screen is mounted."""
+        # The scan thread hands progress to this loop through it
+        self._loop = asyncio.get_running_loop()
+        # Looked up once; every progress redraw touches them
+        self._phase_label = self.query_one("#phase-label", Label)
+        self._status_label = self.query_one("#status-label", Label)
+        self._file_label = self.query_one("#current-file-label", Label)
+        self._progress_bar = self.query_one("#progress", ProgressBar)
+        self._cancel_btn = self.query_one("#cancel-btn", Button)
         # Start progress update handler
         self.run_worker(self._progress_updater(), group="scan_workers")
         # Start scanning in background worker (pass method reference, not result)
         self.run_worker(self._do_scan, thread=True, group="scan_workers")
     
     async def _progress_updater(self) -> None:
-        """Handle progress updates from the scan worker."""
-        while not self._scan_complete.is_set() or not self._progress_queue.empty():
-            try:
-                progress = await asyncio.wait_for(self._progress_queue.get(), timeout=0.1)
-                await self._update_ui(progress)
-            except asyncio.TimeoutError:
-                continue
-            except Exception as e:
-                logger.debug(f"Progress update error: {e}")
+        """
+        Handle progress updates from the scan worker.
+        
+        Sleeps until the scan thread posts something, so an idle scan costs
+        no polling and an update is drawn as soon as it arrives. Every
+        update is a full snapshot, so everything queued since the last
+        redraw is drawn once, from its newest entry, and redraws are at
+        least PROGRESS_FRAME_INTERVAL apart.
+        """
+        queue = self._progress_queue
+        while True:
+            latest = await queue.get()
+            done = latest is None
+            while not done and not queue.empty():
+                item = queue.get_nowait()
+                if item is None:
+                    done = True
+                else:
+                    latest = item
+            
+            if latest is not None:
+                try:
+                    await self._update_ui(latest)
+                except Exception as e:
+                    logger.debug(f"Progress update error: {e}")
+            if done:
+                self._scan_complete.set()
+                return
+            await asyncio.sleep(PROGRESS_FRAME_INTERVAL)
+    
+    def _post_from_thread(self, progress: Optional[ScanProgress]) -> None:
+        """Queue a progress update (None = scan finished) from the scan thread."""
+        try:
+            # Wakes the loop right away; a bare put_nowait from another
+            # thread would wait for the loop's next unrelated wakeup
+            self._loop.call_soon_threadsafe(self._enqueue_progress, progress)
+        except RuntimeError:
+            # The app's loop is already closed
+            pass
+    
+    def _enqueue_progress(self, progress: Optional[ScanProgress]) -> None:
+        """Queue a progress update on the loop, dropping the oldest if full.
+        
+        The end-of-scan None is always posted last, so it is never dropped.
+        """
+        queue = self._progress_queue
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(progress)
     
     async def _update_ui(self, progress: ScanProgress) -> None:
         """Update UI with progress information."""
         if self._cancelled or self._is_ui_complete:
             return
         try:
-            phase_label = self.query_one("#phase-label", Label)
-            status_label = self.query_one("#status-label", Label)
-            file_label = self.query_one("#current-file-label", Label)
-            progress_bar = self.query_one("#progress", ProgressBar)
+            phase_label = self._phase_label
+            status_label = self._status_label
+            file_label = self._file_label
+            progress_bar = self._progress_bar
             
             # Update phase label
             if progress.phase == "source_scan":
@@ -424,16 +558,16 @@ class ScanningScreen(Screen):
                 )
                 file_label.update("")
                 # Update button
-                cancel_btn = self.query_one("#cancel-btn", Button)
+                cancel_btn = self._cancel_btn
                 cancel_btn.label = "Continue →"
                 cancel_btn.variant = "primary"
                 return
             
             # Update current file label
             if progress.current_file:
-                file_label.update(f"Current: {Path(progress.current_file).name}")
+                file_label.update(f"Current: {os.path.basename(progress.current_file)}")
             elif progress.current_archive:
-                file_label.update(f"Archive: {Path(progress.current_archive).name}")
+                file_label.update(f"Archive: {os.path.basename(progress.current_archive)}")
             else:
                 file_label.update("")
                 
@@ -450,31 +584,28 @@ class ScanningScreen(Screen):
             def queue_progress(progress: ScanProgress):
                 if self._cancelled:
                     return
-                try:
-                    # Put directly to queue - asyncio.Queue is thread-safe for put_nowait
-                    self._progress_queue.put_nowait(progress)
-                except Exception as e:
-                    logger.debug(f"Queue progress error: {e}")
+                self._post_from_thread(progress)
             
             # Phase 1: Scan source archives
-            source_scanner = SourceScanner(self.config, self.db, progress_callback=queue_progress)
+            source_scanner = SourceScanner(self.config, self.db, progress_callback=queue_progress,
+                                           cancel_event=self._cancel_event)
             archive_infos = source_scanner.scan_source_directories()
             
             if self._cancelled:
                 return
             
             # Phase 2: Scan target directories
-            target_scanner = TargetScanner(self.config, self.db, progress_callback=queue_progress)
+            target_scanner = TargetScanner(self.config, self.db, progress_callback=queue_progress,
+                                           cancel_event=self._cancel_event)
             self.duplicates_by_archive = target_scanner.scan_target_directories()
             
             if self._cancelled:
                 return
             
             # Signal completion
-            total_dupes = sum(len(v) for v in self.duplicates_by_archive.values())
             completion_progress = ScanProgress(
                 phase="complete",
-                files_processed=total_dupes,
+                files_processed=target_scanner.duplicate_count,
                 archives_processed=len(self.duplicates_by_archive)
             )
             queue_progress(completion_progress)
@@ -497,7 +628,7 @@ class ScanningScreen(Screen):
                 except Exception:
                     pass
                 self.db = None
-            self._scan_complete.set()
+            self._post_from_thread(None)
     
     def on_button_pressed(self, event: Button.Pressed) -> None:
         if event.button.id == "cancel-btn":
@@ -506,10 +637,11 @@ class ScanningScreen(Screen):
                 if self.duplicates_by_archive:
                     self.app.push_screen(ReviewScreen(self.config, self.config.db_path, self.duplicates_by_archive))
                 else:
-                    self.app.push_screen(MessageScreen("No Duplicates", "No duplicate files were found."))
+                    self.app.show_message("No Duplicates", "No duplicate files were found.")
                     self.app.pop_screen()
             else:
                 self._cancelled = True
+                self._cancel_event.set()
                 self._scan_complete.set()
                 # Don't close db here - it will be closed in the worker thread's finally block
                 self.app.pop_screen()
@@ -519,12 +651,13 @@ class ScanningScreen(Screen):
             if self.duplicates_by_archive:
                 self.app.push_screen(ReviewScreen(self.config, self.config.db_path, self.duplicates_by_archive))
             else:
-                self.app.push_screen(MessageScreen("No Duplicates", "No duplicate files were found."))
+                self.app.show_message("No Duplicates", "No duplicate files were found.")
                 self.app.pop_screen()
     
     def action_quit(self) -> None:
         """Quit the application."""
         self._cancelled = True
+        self._cancel_event.set()
         self._scan_complete.set()
         # Don't close db here - it will be closed in the worker thread's finally block
         self.app.exit()
@@ -545,33 +678,42 @@ class ReviewScreen(Screen):
         super().__init__()
         self.config = config
         self.db_path = db_path
-        self.db = None
         self.duplicates_by_archive = duplicates_by_archive
-        self.current_selections = {}
-        self.row_map = {}  # row_index -> (key, match)
+        self.row_map: Dict[int, int] = {}  # table row index -> match index
         self._data_loaded = False
+        self._build_soa()
 
-        # Initialize selections
-        for archive, matches in duplicates_by_archive.items():
+    def _build_soa(self) -> None:
+        """
+        Flatten duplicates_by_archive into parallel lists.
+        
+        Matches are numbered in archive order. A target file matching members
+        of several archives has a row under each, but it is one file: its
+        selection is kept once per target, so unchecking any of its rows
+        keeps it from being deleted. select-all and the continue step are
+        plain passes over the per-target lists.
+        """
+        self.matches: List[DuplicateMatch] = []
+        self.target_idx: List[int] = []  # match index -> target index
+        self.target_paths: List[str] = []
+        self.target_sizes: List[int] = []
+        self.selected: List[bool] = []
+        self.target_rows: List[List[int]] = []  # target index -> table rows
+        index_of: Dict[str, int] = {}
+        for matches in self.duplicates_by_archive.values():
             for match in matches:
-                key = (match.source_file.full_hash or match.source_file.quick_hash, match.target_path)
-                self.current_selections[key] = match.selected_for_deletion
-
-    def _get_db(self) -> DatabaseManager:
-        """Get or create database connection."""
-        if self.db is None:
-            self.db = DatabaseManager(self.db_path)
-            self.db.connect()
-        return self.db
-
-    def _close_db(self) -> None:
-        """Close database connection if open."""
-        if self.db:
-            try:
-                self.db.close()
-            except Exception:
-                pass
-            self.db = None
+                idx = index_of.get(match.target_path)
+                if idx is None:
+                    idx = index_of[match.target_path] = len(self.target_paths)
+                    self.target_paths.append(match.target_path)
+                    self.target_sizes.append(match.target_size)
+                    self.selected.append(match.selected_for_deletion)
+                    self.target_rows.append([])
+                else:
+                    # Like the stored state it comes from, the last match wins
+                    self.selected[idx] = match.selected_for_deletion
+                self.matches.append(match)
+                self.target_idx.append(idx)
 
     def compose(self) -> ComposeResult:
         yield Container(
@@ -589,6 +731,8 @@ class ReviewScreen(Screen):
 
     async def on_mount(self) -> None:
         """Load data into the table when screen is mounted."""
+        # Looked up once; every toggle and select-all uses it
+        self._table = self.query_one("#dup-table", DataTable)
         await self._load_data()
 
     async def _load_data(self) -> None:
@@ -596,7 +740,7 @@ class ReviewScreen(Screen):
         if self._data_loaded:
             return
 
-        table = self.query_one("#dup-table", DataTable)
+        table = self._table
 
         # Configure table
         table.cursor_type = "row"
@@ -606,10 +750,16 @@ class ReviewScreen(Screen):
         table.add_column("Target Path", width=50)
         table.add_column("Size", width=12)
 
-        # Flatten data for table
+        # Flatten data for table. Many matches share a size (one source file
+        # found at several targets), so each distinct size is formatted once.
+        size_labels: Dict[int, str] = {}
+        format_size = FileOperations.format_size
+        selected = self.selected
+        target_idx = self.target_idx
         row_index = 0
+        match_index = 0
         for archive_path, matches in self.duplicates_by_archive.items():
-            archive_name = Path(archive_path).name
+            archive_name = os.path.basename(archive_path)
 
             # Add archive header row
             table.add_row(
@@ -624,10 +774,11 @@ class ReviewScreen(Screen):
 
             # Add duplicate rows
             for match in matches:
-                key = (match.source_file.full_hash or match.source_file.quick_hash, match.target_path)
-                selected = self.current_selections.get(key, True)
-                checkbox = "[X]" if selected else "[ ]"
-                size_str = FileOperations.format_size(match.target_size)
+                target = target_idx[match_index]
+                checkbox = "[X]" if selected[target] else "[ ]"
+                size_str = size_labels.get(match.target_size)
+                if size_str is None:
+                    size_str = size_labels[match.target_size] = format_size(match.target_size)
 
                 table.add_row(
                     checkbox,
@@ -637,8 +788,10 @@ class ReviewScreen(Screen):
                     key=f"row-{row_index}"
                 )
 
-                self.row_map[row_index] = (key, match)
+                self.row_map[row_index] = match_index
+                self.target_rows[target].append(row_index)
                 row_index += 1
+                match_index += 1
 
         self._data_loaded = True
 
@@ -654,77 +807,63 @@ class ReviewScreen(Screen):
 
     def _continue_to_confirmation(self) -> None:
         """Move to confirmation screen."""
+        # One pass over the targets collects the files and their total size
+        # (as recorded by the scan)
         selected_files = []
-        for archive, matches in self.duplicates_by_archive.items():
-            for match in matches:
-                key = (match.source_file.full_hash or match.source_file.quick_hash, match.target_path)
-                if self.current_selections.get(key, True):
-                    selected_files.append(match.target_path)
+        total_size = 0
+        for target_path, size, selected in zip(self.target_paths, self.target_sizes, self.selected):
+            if selected:
+                selected_files.append(target_path)
+                total_size += size
 
         if selected_files:
-            self.app.push_screen(ConfirmationScreen(self.config, self.db_path, selected_files, self.duplicates_by_archive))
+            self.app.push_screen(ConfirmationScreen(self.config, self.db_path, selected_files,
+                                                    self.duplicates_by_archive, total_size=total_size))
         else:
-            self.app.push_screen(MessageScreen("No Selection", "No files selected for deletion."))
+            self.app.show_message("No Selection", "No files selected for deletion.")
 
     def action_toggle_selection(self) -> None:
         """Toggle selection of the current row."""
-        table = self.query_one("#dup-table", DataTable)
-        cursor_row = table.cursor_row
-
-        # Check if this is a data row (not an archive header)
-        row_key = table.get_row_at(cursor_row).key
-        if not row_key or not row_key.startswith("row-"):
-            return  # Archive header row, skip
+        cursor_row = self._table.cursor_row
 
-        # Extract row index from key
-        try:
-            row_idx = int(row_key.split("-")[1])
-        except (ValueError, IndexError):
+        # Archive header rows have no match
+        index = self.row_map.get(cursor_row)
+        if index is None:
             return
 
-        if row_idx in self.row_map:
-            key, match = self.row_map[row_idx]
-            new_state = not self.current_selections.get(key, True)
-            self.current_selections[key] = new_state
-
-            # Update UI
-            checkbox = "[X]" if new_state else "[ ]"
-            table.update_cell(cursor_row, "Select", checkbox)
+        target = self.target_idx[index]
+        new_state = not self.selected[target]
+        self.selected[target] = new_state
+        # Every row of this target shows the same mark
+        checkbox = "[X]" if new_state else "[ ]"
+        for row_idx in self.target_rows[target]:
+            self._table.update_cell_at(Coordinate(row_idx, 0), checkbox)
 
     async def action_select_all(self) -> None:
         """Select all duplicates."""
-        table = self.query_one("#dup-table", DataTable)
-
-        for row_idx, (key, match) in self.row_map.items():
-            self.current_selections[key] = True
-            # Update the table row directly
-            row_key = f"row-{row_idx}"
-            try:
-                table.update_cell(row_key, "Select", "[X]")
-            except Exception:
-                pass
+        self._select_every_row(True)
 
     async def action_deselect_all(self) -> None:
         """Deselect all duplicates."""
-        table = self.query_one("#dup-table", DataTable)
+        self._select_every_row(False)
 
-        for row_idx, (key, match) in self.row_map.items():
-            self.current_selections[key] = False
-            # Update the table row directly
-            row_key = f"row-{row_idx}"
-            try:
-                table.update_cell(row_key, "Select", "[ ]")
-            except Exception:
-                pass
+    def _select_every_row(self, value: bool) -> None:
+        """Set every target's selection, redrawing only the rows that change."""
+        checkbox = "[X]" if value else "[ ]"
+        selected = self.selected
+        update_cell_at = self._table.update_cell_at
+        for target, rows in enumerate(self.target_rows):
+            if selected[target] != value:
+                for row_idx in rows:
+                    update_cell_at(Coordinate(row_idx, 0), checkbox)
+        selected[:] = [value] * len(selected)
 
     def action_go_back(self) -> None:
         """Go back to previous screen."""
-        self._close_db()
         self.app.pop_screen()
 
     def action_quit(self) -> None:
         """Quit the application."""
-        self._close_db()
         self.app.exit()
 
 
@@ -737,32 +876,25 @@ class ConfirmationScreen(Screen):
         Binding("q", "quit", "Quit"),
     ]
     
-    def __init__(self, config: AppConfig, db_path: str, selected_files: List[str], duplicates_by_archive: Dict):
+    def __init__(self, config: AppConfig, db_path: str, selected_files: List[str], duplicates_by_archive: Dict,
+                 total_size: Optional[int] = None):
         super().__init__()
         self.config = config
         self.db_path = db_path
-        self.db = None
         self.selected_files = selected_files
         self.duplicates_by_archive = duplicates_by_archive
-    
-    def _get_db(self) -> DatabaseManager:
-        """Get or create database connection."""
-        if self.db is None:
-            self.db = DatabaseManager(self.db_path)
-            self.db.connect()
-        return self.db
-    
-    def _close_db(self) -> None:
-        """Close database connection if open."""
-        if self.db:
-            try:
-                self.db.close()
-            except Exception:
-                pass
-            self.db = None
+        self.total_size = total_size  # None = work it out in compose
     
     def compose(self) -> ComposeResult:
-        total_size = FileOperations.get_total_size(self.selected_files)
+        total_size = self.total_size
+        if total_size is None:
+            # Reuse the sizes recorded during the target scan where available
+            known_sizes = {
+                match.target_path: match.target_size
+                for matches in self.duplicates_by_archive.values()
+                for match in matches
+            }
+            total_size = FileOperations.get_total_size(self.selected_files, stat_cache=known_sizes)
         size_str = FileOperations.format_size(total_size)
         
         method = "move to trash" if self.config.delete_method == "trash" else "PERMANENTLY DELETE"
@@ -788,12 +920,16 @@ class ConfirmationScreen(Screen):
         if event.button.id == "back-btn":
             self.action_go_back()
         elif event.button.id == "proceed-btn":
-            self._execute_deletion()
+            # Deletion may take a while; a second press must not start it again
+            event.button.disabled = True
+            self.run_worker(self._execute_deletion(), exclusive=True, group="deletion")
     
-    def _execute_deletion(self) -> None:
+    async def _execute_deletion(self) -> None:
         """Execute file deletion."""
         use_trash = self.config.delete_method == "trash"
-        successful, failures = FileOperations.delete_files(
+        # Deleting or trashing thousands of files blocks; keep the UI live
+        successful, failures = await asyncio.to_thread(
+            FileOperations.delete_files,
             self.selected_files,
             use_trash=use_trash,
             dry_run=self.config.dry_run
@@ -804,8 +940,7 @@ class ConfirmationScreen(Screen):
         if failures:
             result_msg += f"\n{len(failures)} files failed"
         
-        self._close_db()
-        self.app.push_screen(MessageScreen("Complete", result_msg))
+        self.app.show_message("Complete", result_msg)
     
     def action_go_back(self) -> None:
         """Go back without deleting."""
@@ -813,7 +948,6 @@ class ConfirmationScreen(Screen):
     
     def action_quit(self) -> None:
         """Quit the application."""
-        self._close_db()
         self.app.exit()
 
 
@@ -830,17 +964,29 @@ class MessageScreen(Screen):
         super().__init__()
         self.title = title
         self.message = message
+        self._title_widget: Optional[Static] = None
+        self._message_label: Optional[Label] = None
     
     def compose(self) -> ComposeResult:
+        self._title_widget = Static(self.title, classes="header")
+        self._message_label = Label(self.message)
         yield Container(
-            Static(self.title, classes="header"),
+            self._title_widget,
             Label(""),
-            Label(self.message),
+            self._message_label,
             Label(""),
             Button("OK", id="ok-btn", variant="primary"),
             id="message-container"
         )
     
+    def set_message(self, title: str, message: str) -> None:
+        """Change the text shown, updating the widgets if already built."""
+        self.title = title
+        self.message = message
+        if self._title_widget is not None:
+            self._title_widget.update(title)
+            self._message_label.update(message)
+    
     def on_button_pressed(self, event: Button.Pressed) -> None:
         self.action_dismiss_screen()
     
@@ -862,6 +1008,26 @@ class DupCleanerApp(App):
     def __init__(self, config: AppConfig):
         super().__init__()
         self.config = config
+        self._message_screen: Optional[MessageScreen] = None
+    
+    def show_message(self, title: str, message: str) -> None:
+        """
+        Show a message over the current screen.
+        
+        One installed MessageScreen is reused, so its widgets are built once
+        rather than for every popup. A fresh screen is only made if the
+        shared one is somehow already showing.
+        """
+        screen = self._message_screen
+        if screen is None:
+            screen = self._message_screen = MessageScreen(title, message)
+            self.install_screen(screen, name="message")
+        elif screen in self.screen_stack:
+            self.push_screen(MessageScreen(title, message))
+            return
+        else:
+            screen.set_message(title, message)
+        self.push_screen(screen)
     
     def on_mount(self) -> None:
         self.push_screen(ConfigScreen(self.config))